@@ -0,0 +1,244 @@
+# agents/core/langgraph/admission.py
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_WAIT_SECONDS
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_admission")
+logger.setLevel(logging.INFO)
+
+DEFAULT_ADMISSION_SETTINGS = {
+    "enabled": True,
+    "max_concurrency": 32,
+    "max_queue": 128,
+    "max_wait_seconds": 15,
+    "default_priority": "interactive",
+    # Lower rank is admitted first.
+    "priorities": {"interactive": 0, "batch": 10},
+    "min_retry_after_seconds": 1,
+    "max_retry_after_seconds": 60,
+}
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted: ``429`` when the wait queue is full (or the
+    request was shed for higher-priority work), ``503`` when it waited longer than
+    ``max_wait_seconds``. ``retry_after`` is a whole number of seconds for the header.
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        self.detail = detail
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class _Waiter:
+    __slots__ = ("agent_name", "lane", "agent_limit", "future", "admitted")
+
+    def __init__(self, agent_name: str, lane: str, agent_limit: int, future: asyncio.Future):
+        self.agent_name = agent_name
+        self.lane = lane
+        self.agent_limit = agent_limit
+        self.future = future
+        self.admitted = False
+
+
+class Ticket:
+    """An admitted request's slot; ``release`` is idempotent."""
+
+    __slots__ = ("_controller", "agent_name", "_started", "_released")
+
+    def __init__(self, controller: "AdmissionController", agent_name: str):
+        self._controller = controller
+        self.agent_name = agent_name
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self.agent_name, time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """
+    Bounds concurrent agent runs globally and per agent, queueing the overflow by priority.
+
+    Limits come from the ``admission`` section of graph_config.json (global) and an
+    optional ``admission`` block on each node in nodes.json (``max_concurrency``,
+    ``max_queue``, ``priority``), read on every request so config reloads apply without a
+    restart. Waiters are held in a heap ordered by (lane rank, arrival), and each released
+    slot goes to the first waiter whose agent has room. When the queue is full, a new
+    request displaces the newest waiter of a lower-priority lane, or is rejected with 429.
+    Waiters that are not admitted within ``max_wait_seconds`` get 503. Both carry a
+    Retry-After estimated from the recent average run time and the queue depth.
+
+    All state is owned by the event loop thread; no locking is needed.
+    """
+
+    def __init__(self):
+        self._running: Dict[str, int] = {}
+        self._total = 0
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._avg_run_seconds: Optional[float] = None
+
+    # -- config ---------------------------------------------------------------------
+
+    @staticmethod
+    def settings(snapshot: ConfigSnapshot = None) -> dict:
+        snapshot = snapshot or get_config()
+        return {**DEFAULT_ADMISSION_SETTINGS, **snapshot.graph.get("admission", {})}
+
+    @staticmethod
+    def agent_settings(agent_name: str, snapshot: ConfigSnapshot = None) -> dict:
+        node = (snapshot or get_config()).node(agent_name) or {}
+        return node.get("admission") or {}
+
+    # -- admission ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        return {"running": self._total, "queued": len(self._waiters), "by_agent": dict(self._running)}
+
+    def _retry_after(self, settings: dict) -> int:
+        average = self._avg_run_seconds or settings["min_retry_after_seconds"]
+        estimate = average * (len(self._waiters) + 1) / max(1, settings["max_concurrency"])
+        return int(min(settings["max_retry_after_seconds"], max(settings["min_retry_after_seconds"], math.ceil(estimate))))
+
+    def _reject(self, agent_name: str, lane: str, status_code: int, reason: str, detail: str, settings: dict) -> AdmissionRejected:
+        ADMISSION_REJECTIONS.labels(agent_name, lane, reason).inc()
+        retry_after = self._retry_after(settings)
+        logger.warning(f"🚦 [admission] {status_code} for {agent_name} ({lane}): {detail}; retry after {retry_after}s")
+        return AdmissionRejected(status_code, reason, retry_after, detail)
+
+    def _has_room(self, agent_name: str, agent_limit: int, max_concurrency: int) -> bool:
+        return self._total < max_concurrency and self._running.get(agent_name, 0) < agent_limit
+
+    def _start(self, agent_name: str) -> None:
+        self._total += 1
+        self._running[agent_name] = self._running.get(agent_name, 0) + 1
+
+    def _remove(self, waiter: _Waiter) -> None:
+        for i, entry in enumerate(self._waiters):
+            if entry[2] is waiter:
+                self._waiters.pop(i)
+                heapq.heapify(self._waiters)
+                ADMISSION_QUEUE_DEPTH.labels(waiter.lane).dec()
+                return
+
+    def _shed_lower_priority(self, rank: int, settings: dict) -> bool:
+        """Reject the newest waiter of the lowest lane ranked below ``rank``; True if one was shed."""
+        if not self._waiters:
+            return False
+        victim = max(self._waiters)
+        if victim[0] <= rank:
+            return False
+        waiter = victim[2]
+        self._remove(waiter)
+        waiter.future.set_exception(self._reject(
+            waiter.agent_name, waiter.lane, 429, "shed", "Displaced by higher-priority requests", settings
+        ))
+        return True
+
+    async def acquire(self, agent_name: str, priority: Optional[str] = None) -> Optional[Ticket]:
+        """
+        Wait for a slot and return its Ticket (None when admission control is disabled).
+        Raises AdmissionRejected when the request cannot be admitted.
+        """
+        snapshot = get_config()
+        settings = self.settings(snapshot)
+        if not settings["enabled"]:
+            return None
+        agent_cfg = self.agent_settings(agent_name, snapshot)
+        lanes = settings["priorities"]
+        lane = priority if priority in lanes else agent_cfg.get("priority", settings["default_priority"])
+        rank = lanes.get(lane, 0)
+        agent_limit = agent_cfg.get("max_concurrency", settings["max_concurrency"])
+
+        if self._has_room(agent_name, agent_limit, settings["max_concurrency"]):
+            self._start(agent_name)
+            ADMISSION_WAIT_SECONDS.labels(agent_name, lane).observe(0)
+            return Ticket(self, agent_name)
+
+        agent_queued = sum(1 for _, _, w in self._waiters if w.agent_name == agent_name)
+        if agent_queued >= agent_cfg.get("max_queue", settings["max_queue"]):
+            raise self._reject(agent_name, lane, 429, "queue_full", f"Too many queued requests for '{agent_name}'", settings)
+        if len(self._waiters) >= settings["max_queue"] and not self._shed_lower_priority(rank, settings):
+            raise self._reject(agent_name, lane, 429, "queue_full", "Too many queued requests", settings)
+
+        waiter = _Waiter(agent_name, lane, agent_limit, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, (rank, next(self._seq), waiter))
+        ADMISSION_QUEUE_DEPTH.labels(lane).inc()
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter.future, settings["max_wait_seconds"])
+        except asyncio.TimeoutError:
+            if not waiter.admitted:
+                self._remove(waiter)
+                raise self._reject(agent_name, lane, 503, "timeout", f"Timed out waiting for '{agent_name}' capacity", settings)
+        except asyncio.CancelledError:
+            # Client went away while queued; hand back a slot that was granted meanwhile.
+            if waiter.admitted:
+                self._release(agent_name, 0.0, record=False)
+            else:
+                self._remove(waiter)
+            raise
+        ADMISSION_WAIT_SECONDS.labels(agent_name, lane).observe(time.monotonic() - start)
+        return Ticket(self, agent_name)
+
+    @asynccontextmanager
+    async def admit(self, agent_name: str, priority: Optional[str] = None):
+        ticket = await self.acquire(agent_name, priority)
+        try:
+            yield ticket
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+    def _release(self, agent_name: str, run_seconds: float, record: bool = True) -> None:
+        self._total -= 1
+        self._running[agent_name] -= 1
+        if record:
+            previous = self._avg_run_seconds
+            self._avg_run_seconds = run_seconds if previous is None else 0.8 * previous + 0.2 * run_seconds
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        max_concurrency = self.settings()["max_concurrency"]
+        admitted = []
+        for entry in sorted(self._waiters):
+            if self._total >= max_concurrency:
+                break
+            waiter = entry[2]
+            if waiter.future.done() or not self._has_room(waiter.agent_name, waiter.agent_limit, max_concurrency):
+                continue
+            self._start(waiter.agent_name)
+            waiter.admitted = True
+            waiter.future.set_result(None)
+            admitted.append(waiter)
+        for waiter in admitted:
+            self._remove(waiter)
+
+
+_controller: Optional[AdmissionController] = None
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide controller (one per event loop process)."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
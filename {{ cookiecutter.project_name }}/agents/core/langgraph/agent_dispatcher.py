@@ -1,78 +1,338 @@
-import json
+import asyncio
+import contextvars
 import os
-from agents.core.langgraph.react_agent_builder import create_configured_react_agent
-from agents.core.langgraph.supervisor_agent_builder import create_supervisor_agent
-from utils.config import load_json_config
-from utils.logger import log_agent_event
-from dotenv import load_dotenv
+from agents.core.langgraph.checkpointing import checkpoint_settings, get_checkpointer, thread_config
+from agents.core.langgraph.graph_cache import GraphCache
+from agents.core.langgraph.output import agent_response
+from agents.core.langgraph.router import get_router
+from agents.core.langgraph.streaming import to_stream_event
+from tools.common.utils.config import get_config, load_env
+from tools.common.utils.logger import log_agent_event
+from tools.common.utils.metrics import AGENT_RESPONSE_PARSE_FAILURES, track_agent_request
+from tools.common.utils.moderation import check_moderation, check_moderation_async, flagged_categories
+from tools.common.utils.tool_loader import MODERATION_GATE
+from tools.common.utils.tracing import get_tracer, span, tracing_callbacks
 from datetime import datetime
 import logging
-
-load_dotenv()
-
-NODES_CONFIG_PATH = "config/nodes.json"
-nodes_config = load_json_config(NODES_CONFIG_PATH).get("nodes", [])
-AGENT_TYPE_MAP = {
-    node["id"]: node["type"]
-    for node in nodes_config
-    if node["type"] in {"react_agent", "supervisor"}
-}
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
 
 logger = logging.getLogger("{{ cookiecutter.project_name }}_agent_dispatch")
 logger.setLevel(logging.INFO)
 
-def agent_dispatch(agent_name: str, message: str, context: dict = {}) -> dict:
+graph_cache = GraphCache()
+
+# Runs sync moderation checks alongside graph fetch in agent_dispatch.
+_moderation_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="moderation")
+
+def build_agent_graph(agent_name: str, snapshot=None, checkpointer=None):
     '''
-    Dispatch an agent based on the agent name and message.
+    Build and compile the graph for an agent without consulting the cache.
     '''
-    start_time = datetime.utcnow()
+    snapshot = snapshot or get_config()
+    agent_type = snapshot.agent_types.get(agent_name)
+    with span("graph.build", root=False, agent=agent_name, agent_type=agent_type, config_version=snapshot.version):
+        # The builders pull in LangGraph's prebuilt agents; import them with the first graph.
+        if agent_type == "react_agent":
+            from agents.core.langgraph.react_agent_builder import create_configured_react_agent
+            return create_configured_react_agent(agent_name, snapshot=snapshot, checkpointer=checkpointer)
+        if agent_type == "supervisor":
+            from agents.core.langgraph.supervisor_agent_builder import create_supervisor_agent
+            return create_supervisor_agent(agent_name, snapshot=snapshot, checkpointer=checkpointer)
+        raise ValueError(f"Unsupported agent type: {agent_type}")
+
+def _graph_key(agent_name: str, checkpointed: bool) -> str:
+    return f"{agent_name}#checkpointed" if checkpointed and checkpoint_settings()["enabled"] else agent_name
+
+def get_agent_graph(agent_name: str, checkpointed: bool = False):
+    '''
+    Return the compiled graph for an agent, building it once per config version.
+
+    With ``checkpointed`` (and checkpointing enabled) the graph is compiled against the
+    shared checkpointer, so a run whose ``configurable`` carries a ``thread_id`` resumes
+    that conversation. Both variants are cached side by side.
+    '''
+    snapshot = get_config()
+    key = _graph_key(agent_name, checkpointed)
+    checkpointer = get_checkpointer() if key != agent_name else None
+    return graph_cache.get(
+        key,
+        snapshot.version,
+        lambda: build_agent_graph(agent_name, snapshot, checkpointer)
+    )
+
+async def get_agent_graph_async(agent_name: str, checkpointed: bool = False):
+    '''
+    Async variant of get_agent_graph; a cache miss is compiled on a worker thread so the
+    event loop keeps serving other requests.
+    '''
+    graph = graph_cache.lookup(_graph_key(agent_name, checkpointed), get_config().version)
+    if graph is not None:
+        return graph
+    return await asyncio.to_thread(get_agent_graph, agent_name, checkpointed)
 
+def _prepare_dispatch(agent_name: str, message: str, context: dict = None):
+    '''
+    Validate the request and build the per-request context and initial state.
+    Returns (context, initial_state, error).
+    '''
     if not agent_name or not message:
-        return {"error": "Missing required field (agent_name, message)"}
+        return None, None, {"error": "Missing required field (agent_name, message)"}
+    load_env()
 
+    context = dict(context or {})
     context.update({
         "message": message,
         "identifier": context.get("identifier"),
     })
+    # Identified callers keep a conversation: the run resumes the checkpointed thread and
+    # the request only carries the new message.
+    if checkpoint_settings()["enabled"]:
+        context.update(thread_config(context))
 
     logger.info(f"[agent_dispatch] Dispatching {agent_name} for identifier: {context.get('identifier')}")
-    agent_type = AGENT_TYPE_MAP.get(agent_name)
 
-    if not agent_type:
-        return {"error": f"Unknown agent or type for '{agent_name}'"}
+    with span("config.load", root=False) as config_span:
+        snapshot = get_config()
+        config_span.set_attribute("config_version", snapshot.version)
+    if not snapshot.agent_types.get(agent_name):
+        return context, None, {"error": f"Unknown agent or type for '{agent_name}'"}
+
+    initial_state = {
+        "messages": [{"role": "user", "content": message}],
+        **context
+    }
+    return context, initial_state, None
+
+def _route(agent_name: str, message: str, root) -> str:
+    '''
+    Return the agent that should run: a supervisor's sub-agent when the intent router is
+    confident (skipping the supervisor's LLM hops), otherwise ``agent_name`` itself.
+    A routed run keeps the caller's thread, so the conversation stays in one place.
+    '''
+    with span("router.route", root=False, agent=agent_name) as route_span:
+        decision = get_router().route(agent_name, message)
+        if decision is None:
+            return agent_name
+        route_span.set_attribute("confidence", decision.confidence)
+        route_span.set_attribute("source", decision.source)
+        route_span.set_attribute("target", decision.agent)
+    root.set_attribute("routed_to", decision.target)
+    return decision.agent
 
+def _moderation_enabled() -> bool:
+    return bool(get_config().graph.get("moderation_enabled", False))
+
+def _flagged(result: dict, root, outcome) -> Optional[dict]:
+    '''
+    Return the error response for a flagged moderation result (None when it passed),
+    recording the verdict on the dispatch span and metrics outcome.
+    '''
+    root.set_attribute("moderation.flagged", bool(result.get("flagged")))
+    if not result.get("flagged"):
+        return None
+    categories = flagged_categories(result)
+    logger.warning(f"🚫 [agent_dispatch] Message flagged by moderation: {categories}")
+    outcome["status"] = "flagged"
+    return {"error": "Message flagged by moderation", "categories": categories}
+
+def _log_dispatch(agent_name: str, message: str, context: dict, initial_state: dict, output, start_time: datetime):
+    end_time = datetime.utcnow()
     try:
-        if agent_type == "react_agent":
-            agent = create_configured_react_agent(agent_name, context)
-        elif agent_type == "supervisor":
-            agent = create_supervisor_agent(agent_name, context)
-        else:
-            return {"error": f"Unsupported agent type: {agent_type}"}
-
-        initial_state = {
-            "messages": [{"role": "user", "content": message}],
-            **context
-        }
-
-        output = agent.invoke(initial_state, config={"configurable": context})
-
-    except Exception as e:
-        output = {"error": str(e)}
-    finally:
-        end_time = datetime.utcnow()
-        try:
-            log_agent_event(
-                agent_name=agent_name,
-                message=message,
-                context=json.loads(json.dumps(context, default=str)),
-                output={
-                    "request": json.loads(json.dumps(initial_state, default=str)),
-                    "response": json.loads(json.dumps(output, default=str))
-                },
-                start_time=start_time,
-                end_time=end_time
-            )
-        except Exception as log_err:
-            logger.error(f"[agent_dispatch] Logging failed: {log_err}")
+        log_agent_event(
+            agent_name=agent_name,
+            message=message,
+            context=context,
+            output={
+                "request": initial_state,
+                "response": output
+            },
+            start_time=start_time,
+            end_time=end_time
+        )
+    except Exception as log_err:
+        logger.error(f"[agent_dispatch] Logging failed: {log_err}")
+
+def agent_dispatch(agent_name: str, message: str, context: dict = None) -> dict:
+    '''
+    Dispatch an agent based on the agent name and message.
+
+    Per-request data (message, identifier) travels through ``configurable`` so the
+    compiled graph can be reused across requests.
+    '''
+    start_time = datetime.utcnow()
+
+    with span("agent.dispatch", agent=agent_name, mode="sync") as root:
+        context, initial_state, error = _prepare_dispatch(agent_name, message, context)
+        if error:
+            return error
+
+        output = None
+        with track_agent_request(agent_name, "sync") as outcome:
+            try:
+                # The check overlaps graph fetch; a flagged message never reaches the model.
+                moderation = None
+                if _moderation_enabled():
+                    moderation = _moderation_executor.submit(contextvars.copy_context().run, check_moderation, message)
+                agent = get_agent_graph(_route(agent_name, message, root), checkpointed="thread_id" in context)
+                if moderation is not None:
+                    output = _flagged(moderation.result(), root, outcome)
+                if output is None:
+                    output = agent.invoke(initial_state, config={"configurable": context, "callbacks": tracing_callbacks()})
+
+            except Exception as e:
+                output = {"error": str(e)}
+                root.set_error(e)
+                outcome["status"] = "error"
+            finally:
+                _log_dispatch(agent_name, message, context, initial_state, output, start_time)
+
+    return output
+
+def _gated(context: dict, moderation: Optional[asyncio.Future]) -> dict:
+    """``configurable`` for a run that starts before its moderation verdict: tools wait for it."""
+    return context if moderation is None else {**context, MODERATION_GATE: moderation}
+
+async def _ainvoke(agent_name: str, initial_state: dict, context: dict, moderation: Optional[asyncio.Future] = None):
+    agent = await get_agent_graph_async(agent_name, checkpointed="thread_id" in context)
+    return await agent.ainvoke(initial_state, config={"configurable": _gated(context, moderation), "callbacks": tracing_callbacks()})
+
+async def agent_dispatch_async(agent_name: str, message: str, context: dict = None) -> dict:
+    '''
+    Async variant of agent_dispatch for use inside the event loop. The graph runs via
+    ``ainvoke`` so a slow LLM round-trip does not block other requests.
+
+    When ``moderation_enabled`` is set, the moderation check runs concurrently with the
+    agent's first model call; tools wait for the verdict and a flagged message cancels
+    the run. Checkpointed runs (those with an
+    identifier) wait for the verdict instead: their first step saves the message to the
+    conversation's thread.
+    '''
+    start_time = datetime.utcnow()
+
+    with span("agent.dispatch", agent=agent_name, mode="async") as root:
+        context, initial_state, error = _prepare_dispatch(agent_name, message, context)
+        if error:
+            return error
+
+        output = None
+        with track_agent_request(agent_name, "async") as outcome:
+            try:
+                target = _route(agent_name, message, root)
+                run = moderation = None
+                try:
+                    if _moderation_enabled():
+                        # An unsaved run starts immediately and moderation only decides whether
+                        # it finishes; a checkpointed one would persist a flagged message.
+                        moderation = asyncio.ensure_future(check_moderation_async(message))
+                        if "thread_id" not in context:
+                            run = asyncio.ensure_future(_ainvoke(target, initial_state, context, moderation))
+                        output = _flagged(await moderation, root, outcome)
+                    if output is None:
+                        output = await (run or _ainvoke(target, initial_state, context))
+                finally:
+                    for task in (run, moderation):
+                        if task is not None:
+                            task.cancel()
+
+            except Exception as e:
+                output = {"error": str(e)}
+                root.set_error(e)
+                outcome["status"] = "error"
+            finally:
+                _log_dispatch(agent_name, message, context, initial_state, output, start_time)
 
     return output
+
+async def agent_dispatch_stream(agent_name: str, message: str, context: dict = None) -> AsyncIterator[dict]:
+    '''
+    Stream an agent run as client-facing events (see agents.core.langgraph.streaming).
+
+    A ``start`` event is yielded before the graph is fetched so clients get their first
+    byte immediately; routing decisions, tool calls, token deltas and the structured
+    response as it fills in (``partial``) follow as they happen, and the run ends with a
+    ``final`` or ``error`` event.
+
+    Moderation runs alongside graph fetch and the first model call; events are held back
+    and tools wait until it passes, and a flagged message stops the run with an ``error``
+    event.
+    Checkpointed runs start only once it has passed, as in agent_dispatch_async.
+    '''
+    start_time = datetime.utcnow()
+    # The span is not made current: an async generator's context changes between yields.
+    root = get_tracer().start_span("agent.dispatch", agent=agent_name, mode="stream")
+
+    context, initial_state, error = _prepare_dispatch(agent_name, message, context)
+    if error:
+        root.end()
+        yield {"event": "error", "data": error}
+        return
+
+    moderation = asyncio.ensure_future(check_moderation_async(message)) if _moderation_enabled() else None
+    yield {"event": "start", "data": {"agent": agent_name, "identifier": context.get("identifier")}}
+    target = _route(agent_name, message, root)
+    if target != agent_name:
+        yield {"event": "route", "data": {"from": agent_name, "to": target, "via": "router"}}
+
+    output = None
+    with track_agent_request(agent_name, "stream") as outcome:
+        events = None
+        try:
+            if moderation is not None and "thread_id" in context:
+                output = _flagged(await moderation, root, outcome)
+                moderation = None
+                if output:
+                    yield {"event": "error", "data": output}
+                    return
+            agent = await get_agent_graph_async(target, checkpointed="thread_id" in context)
+            agent_names = get_config().agent_types
+            run_config = {"configurable": _gated(context, moderation), "callbacks": tracing_callbacks(root)}
+            events = agent.astream_events(initial_state, config=run_config, version="v2")
+            held, blocked, partials = [], None, {}
+            async for event in events:
+                stream_event = to_stream_event(event, target, agent_names, partials)
+                if stream_event is None:
+                    continue
+                if stream_event["event"] == "final":
+                    output = stream_event["data"]
+                    # Validated against the requested agent, as /api/agent does
+                    try:
+                        stream_event["data"] = agent_response(output, agent_name)
+                    except ValueError as e:
+                        logger.error(f"❌ [agent_dispatch] {e}")
+                        AGENT_RESPONSE_PARSE_FAILURES.labels(agent_name).inc()
+                        stream_event = {"event": "error", "data": {"error": "Agent returned an invalid response"}}
+                if moderation is not None:
+                    held.append(stream_event)
+                    if not moderation.done():
+                        continue
+                    blocked = _flagged(moderation.result(), root, outcome)
+                    if blocked:
+                        break
+                    moderation = None
+                    while held:
+                        yield held.pop(0)
+                    continue
+                yield stream_event
+
+            if moderation is not None and blocked is None:
+                blocked = _flagged(await moderation, root, outcome)
+                if not blocked:
+                    for stream_event in held:
+                        yield stream_event
+            if blocked:
+                output = blocked
+                yield {"event": "error", "data": blocked}
+
+        except Exception as e:
+            output = {"error": str(e)}
+            root.set_error(e)
+            outcome["status"] = "error"
+            yield {"event": "error", "data": output}
+        finally:
+            if moderation is not None:
+                moderation.cancel()
+            if events is not None:
+                await events.aclose()
+            root.end()
+            _log_dispatch(agent_name, message, context, initial_state, output, start_time)
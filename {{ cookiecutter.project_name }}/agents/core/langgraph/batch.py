@@ -0,0 +1,240 @@
+# agents/core/langgraph/batch.py
+
+"""
+Run many agent requests at once.
+
+Online (``run_batch``, served as ``POST /api/agent/batch``): items run concurrently over
+the shared graph cache, bounded by ``max_concurrency`` and admitted in the ``batch``
+lane, and results are yielded as they finish.
+
+Offline: ``write_batch_file`` turns the same items into an OpenAI Batch API input file
+and ``read_batch_results`` maps the provider's output file back to results of the same
+shape. Offline items get a single model response to the agent's rendered prompt; tools
+are not available, so use it for agents that can answer in one call.
+
+    python -m agents.core.langgraph.batch write items.jsonl batch_input.jsonl
+    python -m agents.core.langgraph.batch ingest batch_output.jsonl results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, Iterable, List, Optional
+from agents.core.langgraph.admission import AdmissionRejected, get_admission_controller
+from agents.core.langgraph.agent_dispatcher import agent_dispatch_async
+from agents.core.langgraph.output import agent_response
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.metrics import AGENT_RESPONSE_PARSE_FAILURES, BATCH_ITEMS
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_batch")
+logger.setLevel(logging.INFO)
+
+DEFAULT_BATCH_SETTINGS = {
+    "max_concurrency": 8,
+    "item_timeout_seconds": 120,
+    "max_items": 1000,
+    # Admission lane for batch items unless an item sets its own priority.
+    "priority": "batch",
+    # Offline mode: Batch API endpoint the request lines target.
+    "endpoint": "/v1/responses",
+}
+
+
+def batch_settings(snapshot: ConfigSnapshot = None) -> dict:
+    return {**DEFAULT_BATCH_SETTINGS, **(snapshot or get_config()).graph.get("batch", {})}
+
+
+def _result(index: int, item: dict, status: str, start: float, **fields) -> dict:
+    BATCH_ITEMS.labels(item.get("agent_name") or "unknown", status).inc()
+    return {
+        "index": index,
+        "agent_name": item.get("agent_name"),
+        "identifier": item.get("identifier"),
+        "status": status,
+        **fields,
+        "ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+async def _run_item(index: int, item: dict, settings: dict, semaphore: asyncio.Semaphore) -> dict:
+    """Run one item; every failure is reported in its result rather than raised."""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            async with get_admission_controller().admit(item["agent_name"], item.get("priority") or settings["priority"]):
+                output = await asyncio.wait_for(
+                    agent_dispatch_async(item["agent_name"], item["message"], {"identifier": item.get("identifier")}),
+                    settings["item_timeout_seconds"],
+                )
+        except AdmissionRejected as e:
+            return _result(index, item, "rejected", start, error=e.detail, retry_after=e.retry_after)
+        except asyncio.TimeoutError:
+            return _result(index, item, "timeout", start, error=f"No answer within {settings['item_timeout_seconds']}s")
+        except Exception as e:
+            logger.error(f"❌ [batch] Item {index} ({item.get('agent_name')}) failed: {e}")
+            return _result(index, item, "error", start, error=str(e))
+        if isinstance(output, dict) and output.get("error"):
+            details = {"categories": output["categories"]} if output.get("categories") else {}
+            return _result(index, item, "error", start, error=output["error"], **details)
+        try:
+            response = agent_response(output, item["agent_name"])
+        except ValueError as e:
+            logger.error(f"❌ [batch] Item {index} ({item.get('agent_name')}): {e}")
+            AGENT_RESPONSE_PARSE_FAILURES.labels(item["agent_name"]).inc()
+            return _result(index, item, "error", start, error="Agent returned an invalid response")
+        return _result(index, item, "ok", start, output=response)
+
+
+async def run_batch(items: List[dict], max_concurrency: Optional[int] = None, timeout_seconds: Optional[float] = None) -> AsyncIterator[dict]:
+    """
+    Run ``{agent_name, message, identifier[, priority]}`` items concurrently and yield
+    one result per item in completion order; ``index`` ties a result to its item.
+    Closing the generator early cancels the items still running.
+    """
+    settings = batch_settings()
+    if max_concurrency:
+        settings["max_concurrency"] = min(max_concurrency, settings["max_concurrency"])
+    if timeout_seconds:
+        settings["item_timeout_seconds"] = timeout_seconds
+    semaphore = asyncio.Semaphore(settings["max_concurrency"])
+    tasks = [asyncio.ensure_future(_run_item(i, item, settings, semaphore)) for i, item in enumerate(items)]
+    start = time.perf_counter()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        logger.info(f"📦 [batch] {len(items)} items in {(time.perf_counter() - start) * 1000:.1f} ms (concurrency {settings['max_concurrency']})")
+
+
+# -- offline (provider Batch API files) ---------------------------------------------
+
+def batch_request_line(index: int, item: dict, snapshot: ConfigSnapshot = None, settings: dict = None) -> dict:
+    """One Batch API input line: the agent's rendered system prompt plus the user message."""
+    # Output-schema helpers live with the builders; import them only when writing files.
+    from agents.core.langgraph.react_agent_builder import extract_output_schema
+    from tools.common.utils.templates import compile_prompt
+
+    snapshot = snapshot or get_config()
+    settings = settings or batch_settings(snapshot)
+    agent_name = item["agent_name"]
+    node = snapshot.node(agent_name)
+    prompt_cfg = snapshot.prompt(agent_name)
+    if not node or not prompt_cfg:
+        raise ValueError(f"Unknown agent '{agent_name}'")
+
+    raw_prompt = prompt_cfg.get("prompt") or prompt_cfg.get("input_template", "You are a helpful assistant.")
+    system_prompt = compile_prompt(raw_prompt, snapshot).render(
+        message=item["message"],
+        identifier=item.get("identifier"),
+        expected_output_schema=extract_output_schema(node.get("tools", []), snapshot),
+        agent_output_schema=extract_output_schema([agent_name], snapshot),
+    )
+    return {
+        "custom_id": f"{index}:{agent_name}",
+        "method": "POST",
+        "url": settings["endpoint"],
+        "body": {
+            "model": os.path.expandvars(prompt_cfg.get("model", "gpt-4o-mini")),
+            "temperature": prompt_cfg.get("temperature", 0.3),
+            "input": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": item["message"]},
+            ],
+            # Echoed back in the result, so ingesting needs only the output file.
+            "metadata": {"agent_name": agent_name, "identifier": str(item.get("identifier") or "")},
+        },
+    }
+
+
+def write_batch_file(items: Iterable[dict], path: str, snapshot: ConfigSnapshot = None) -> int:
+    """Write a Batch API input file for ``items``; returns the number of lines written."""
+    snapshot = snapshot or get_config()
+    settings = batch_settings(snapshot)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for index, item in enumerate(items):
+            f.write(json.dumps(batch_request_line(index, item, snapshot, settings), ensure_ascii=False) + "\n")
+            count += 1
+    logger.info(f"📦 [batch] Wrote {count} requests to {path}")
+    return count
+
+
+def _response_text(body: dict) -> str:
+    parts = []
+    for output in body.get("output") or []:
+        if output.get("type") != "message":
+            continue
+        for content in output.get("content") or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    if parts:
+        return "".join(parts)
+    # Chat Completions results
+    choices = body.get("choices") or []
+    if choices:
+        return (choices[0].get("message") or {}).get("content") or ""
+    return ""
+
+
+def parse_batch_result(line: dict) -> dict:
+    """Map one Batch API output line to a result shaped like ``run_batch``'s."""
+    index, _, agent_name = line.get("custom_id", "").partition(":")
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    metadata = body.get("metadata") or {}
+    result = {
+        "index": int(index) if index.isdigit() else None,
+        "agent_name": metadata.get("agent_name") or agent_name or None,
+        "identifier": metadata.get("identifier") or None,
+    }
+    error = line.get("error") or body.get("error")
+    if error or response.get("status_code", 200) >= 400:
+        return {**result, "status": "error", "error": (error or {}).get("message") if isinstance(error, dict) else str(error)}
+    return {**result, "status": "ok", "output": {"message": _response_text(body)}}
+
+
+def read_batch_results(path: str) -> List[dict]:
+    """Read a Batch API output file into results ordered by item index."""
+    with open(path, encoding="utf-8") as f:
+        results = [parse_batch_result(json.loads(line)) for line in f if line.strip()]
+    return sorted(results, key=lambda r: (r["index"] is None, r["index"] or 0))
+
+
+def _read_jsonl(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write or ingest OpenAI Batch API files for agent requests")
+    commands = parser.add_subparsers(dest="command", required=True)
+    write = commands.add_parser("write", help="items JSONL -> Batch API input JSONL")
+    write.add_argument("items")
+    write.add_argument("output")
+    ingest = commands.add_parser("ingest", help="Batch API output JSONL -> results JSONL")
+    ingest.add_argument("results")
+    ingest.add_argument("output")
+    args = parser.parse_args(argv)
+
+    if args.command == "write":
+        write_batch_file(_read_jsonl(args.items), args.output)
+    else:
+        results = read_batch_results(args.results)
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        failed = sum(1 for r in results if r["status"] != "ok")
+        logger.info(f"📦 [batch] Ingested {len(results)} results ({failed} failed) into {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
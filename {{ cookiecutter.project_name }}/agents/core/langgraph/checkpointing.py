@@ -0,0 +1,142 @@
+# agents/core/langgraph/checkpointing.py
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Protocol
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from tools.common.utils.config import get_config
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_checkpointing")
+logger.setLevel(logging.INFO)
+
+DEFAULT_CHECKPOINT_SETTINGS = {
+    "enabled": True,
+    # "sqlite" (local file, WAL) or "memory" (per process, lost on restart)
+    "backend": "sqlite",
+    "sqlite_path": "database/checkpoints.sqlite3",
+    # Conversations idle for longer than this are deleted by the sweeper.
+    "ttl_seconds": 86400,
+    "sweep_interval_seconds": 600,
+}
+
+
+class ActivityTracking(Protocol):
+    """
+    A checkpointer that records the last write per thread, so idle threads can be swept.
+    Implementations call their own ``_touch`` from ``put``.
+    """
+
+    def idle_threads(self, older_than: float) -> List[str]: ...
+
+    def forget(self, thread_id: str) -> None: ...
+
+    def delete_thread(self, thread_id: str) -> None: ...
+
+
+def sweep(checkpointer: ActivityTracking, ttl_seconds: float) -> int:
+    """Delete every thread with no writes for ``ttl_seconds``; return how many."""
+    expired = checkpointer.idle_threads(time.time() - ttl_seconds)
+    for thread_id in expired:
+        checkpointer.delete_thread(thread_id)
+        checkpointer.forget(thread_id)
+    return len(expired)
+
+
+class MemoryCheckpointer(InMemorySaver):
+    """InMemorySaver with per-thread activity tracking for the TTL sweeper."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._activity: Dict[str, float] = {}
+
+    def _touch(self, config) -> None:
+        self._activity[str(config["configurable"]["thread_id"])] = time.time()
+
+    def idle_threads(self, older_than: float) -> List[str]:
+        return [thread_id for thread_id, updated in list(self._activity.items()) if updated < older_than]
+
+    def forget(self, thread_id: str) -> None:
+        self._activity.pop(thread_id, None)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        self._touch(config)
+        return saved
+
+
+def checkpoint_settings() -> dict:
+    return {**DEFAULT_CHECKPOINT_SETTINGS, **get_config().graph.get("checkpointing", {})}
+
+
+def create_checkpointer(settings: dict) -> BaseCheckpointSaver:
+    if settings["backend"] == "memory":
+        return MemoryCheckpointer()
+    if settings["backend"] != "sqlite":
+        raise ValueError(f"Unsupported checkpoint backend: {settings['backend']}")
+    # langgraph-checkpoint-sqlite is only needed (and imported) for the sqlite backend.
+    import sqlite3
+    from agents.core.langgraph.sqlite_checkpointer import SqliteCheckpointer
+
+    path = settings["sqlite_path"]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return SqliteCheckpointer(conn)
+
+
+class _Sweeper:
+    """Daemon thread that deletes idle conversations every ``sweep_interval_seconds``."""
+
+    def __init__(self, checkpointer: ActivityTracking, settings: dict):
+        self.checkpointer = checkpointer
+        self.settings = settings
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-sweeper", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.settings["sweep_interval_seconds"]):
+            try:
+                removed = sweep(self.checkpointer, self.settings["ttl_seconds"])
+                if removed:
+                    logger.info(f"🧹 [checkpointing] Swept {removed} conversations idle for more than {self.settings['ttl_seconds']}s")
+            except Exception as e:
+                logger.error(f"[checkpointing] Sweep failed: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_sweeper: Optional[_Sweeper] = None
+_checkpointer_lock = threading.Lock()
+
+def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """
+    Return the process-wide checkpointer (graph_config.json "checkpointing"), starting its
+    TTL sweeper on first use; None when checkpointing is disabled.
+    """
+    global _checkpointer, _sweeper
+    settings = checkpoint_settings()
+    if not settings["enabled"]:
+        return None
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                _checkpointer = create_checkpointer(settings)
+                if settings.get("ttl_seconds"):
+                    _sweeper = _Sweeper(_checkpointer, settings)
+                logger.info(f"💾 [checkpointing] Using {settings['backend']} checkpoints (ttl={settings['ttl_seconds']}s)")
+    return _checkpointer
+
+
+def thread_config(context: dict) -> Dict[str, Any]:
+    """``configurable`` entries that attach a run to the caller's conversation."""
+    identifier = context.get("identifier")
+    return {"thread_id": str(identifier)} if identifier else {}
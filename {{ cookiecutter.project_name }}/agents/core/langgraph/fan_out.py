@@ -0,0 +1,187 @@
+# agents/core/langgraph/fan_out.py
+
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+from agents.core.langgraph.history import message_text
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.metrics import FAN_OUT_BRANCH_SECONDS
+from tools.common.utils.tracing import span
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_fan_out")
+logger.setLevel(logging.INFO)
+
+DEFAULT_FAN_OUT_SETTINGS = {
+    "enabled": True,
+    "tool_name": "dispatch_parallel",
+    "branch_timeout_seconds": 30,
+    "max_branches": 4,
+}
+
+# Keys that tie a run to its parent graph's task and checkpoint; branches run as standalone graphs.
+_PARENT_KEYS = {"thread_id", "checkpoint_ns", "checkpoint_id", "checkpoint_map"}
+
+_branch_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fan-out")
+
+
+class FanOutTask(BaseModel):
+    agent: str = Field(description="Name of the sub-agent to run")
+    request: str = Field(description="Self-contained instruction for that agent; it does not see the conversation")
+
+
+class FanOutArgs(BaseModel):
+    tasks: List[FanOutTask] = Field(description="Independent tasks to run at the same time, one per agent")
+
+
+def fan_out_settings(supervisor_name: str, snapshot: ConfigSnapshot = None) -> dict:
+    """Defaults from graph_config.json "fan_out", overridden by the supervisor's "fan_out" block in nodes.json."""
+    snapshot = snapshot or get_config()
+    node = snapshot.node(supervisor_name) or {}
+    return {**DEFAULT_FAN_OUT_SETTINGS, **snapshot.graph.get("fan_out", {}), **(node.get("fan_out") or {})}
+
+
+def _branch_config(config: Optional[RunnableConfig]) -> RunnableConfig:
+    configurable = (config or {}).get("configurable") or {}
+    return {
+        "configurable": {
+            key: value for key, value in configurable.items()
+            if not key.startswith("__") and key not in _PARENT_KEYS
+        },
+    }
+
+
+class FanOut:
+    """
+    Runs independent sub-agent tasks concurrently on behalf of a supervisor.
+
+    Exposed to the supervisor model as one tool next to the handoff tools: a single call
+    lists ``{"agent", "request"}`` tasks, each runs as a standalone invocation of that
+    sub-agent's graph, and the tool returns every branch's outcome as JSON in the order
+    the tasks were given, so the merged result does not depend on which branch finished
+    first. Each branch gets ``branch_timeout_seconds`` from the moment of dispatch; a
+    branch that runs over is reported with status ``"timeout"`` instead of failing the
+    whole call. In sync runs an expired branch cannot be interrupted and finishes in the
+    background; its result is discarded.
+    """
+
+    def __init__(self, supervisor_name: str, agents: Dict[str, Runnable], settings: dict):
+        self.supervisor_name = supervisor_name
+        self.agents = agents
+        self.settings = settings
+
+    def _plan(self, tasks: List[FanOutTask]) -> List[Optional[dict]]:
+        """Outcome for tasks that will not run (unknown agent, over max_branches); None for the rest."""
+        planned, running = [], 0
+        for task in tasks:
+            if task.agent not in self.agents:
+                planned.append({"agent": task.agent, "status": "error", "error": f"Unknown agent '{task.agent}'"})
+            elif running >= self.settings["max_branches"]:
+                planned.append({"agent": task.agent, "status": "skipped", "error": f"More than {self.settings['max_branches']} branches"})
+            else:
+                planned.append(None)
+                running += 1
+        return planned
+
+    @staticmethod
+    def _ok(task: FanOutTask, result: dict, start: float) -> dict:
+        messages = result.get("messages") or []
+        output = message_text(messages[-1]) if messages else ""
+        return {"agent": task.agent, "status": "ok", "output": output, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    def _failed(self, task: FanOutTask, status: str, error: str, start: float) -> dict:
+        if status == "timeout":
+            error = f"No answer within {self.settings['branch_timeout_seconds']}s"
+        logger.warning(f"⚠️ [fan_out] {self.supervisor_name} -> {task.agent}: {status} ({error})")
+        return {"agent": task.agent, "status": status, "error": error, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    def _run_branch(self, task: FanOutTask, config: RunnableConfig, start: float) -> dict:
+        with span("fan_out.branch", root=False, agent=task.agent):
+            result = self.agents[task.agent].invoke({"messages": [HumanMessage(content=task.request)]}, config)
+        return self._ok(task, result, start)
+
+    async def _arun_branch(self, task: FanOutTask, config: RunnableConfig, start: float) -> dict:
+        try:
+            with span("fan_out.branch", root=False, agent=task.agent):
+                result = await asyncio.wait_for(
+                    self.agents[task.agent].ainvoke({"messages": [HumanMessage(content=task.request)]}, config),
+                    self.settings["branch_timeout_seconds"],
+                )
+        except asyncio.TimeoutError:
+            return self._failed(task, "timeout", "", start)
+        except Exception as e:
+            return self._failed(task, "error", str(e), start)
+        return self._ok(task, result, start)
+
+    def _merge(self, planned: List[Optional[dict]], outcomes: List[dict]) -> str:
+        ran = iter(outcomes)
+        results = [outcome or next(ran) for outcome in planned]
+        for result in results:
+            FAN_OUT_BRANCH_SECONDS.labels(result["agent"], result["status"]).observe(result.get("ms", 0) / 1000)
+        logger.info(f"🔀 [fan_out] {self.supervisor_name}: {[(r['agent'], r['status'], r.get('ms')) for r in results]}")
+        return json.dumps({"results": results}, ensure_ascii=False, default=str)
+
+    def run(self, tasks: List[FanOutTask], config: RunnableConfig = None) -> str:
+        planned = self._plan(tasks)
+        branch_config = _branch_config(config)
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.settings["branch_timeout_seconds"]
+        with span("fan_out", root=False, supervisor=self.supervisor_name, branches=planned.count(None)):
+            futures = [
+                (task, _branch_executor.submit(contextvars.copy_context().run, self._run_branch, task, branch_config, start))
+                for task, outcome in zip(tasks, planned) if outcome is None
+            ]
+            outcomes = []
+            for task, future in futures:
+                try:
+                    outcomes.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+                except FutureTimeout:
+                    outcomes.append(self._failed(task, "timeout", "", start))
+                except Exception as e:
+                    outcomes.append(self._failed(task, "error", str(e), start))
+            return self._merge(planned, outcomes)
+
+    async def arun(self, tasks: List[FanOutTask], config: RunnableConfig = None) -> str:
+        planned = self._plan(tasks)
+        branch_config = _branch_config(config)
+        start = time.perf_counter()
+        with span("fan_out", root=False, supervisor=self.supervisor_name, branches=planned.count(None)):
+            outcomes = await asyncio.gather(*(
+                self._arun_branch(task, branch_config, start)
+                for task, outcome in zip(tasks, planned) if outcome is None
+            ))
+            return self._merge(planned, list(outcomes))
+
+    def as_tool(self) -> StructuredTool:
+        def dispatch(tasks: List[FanOutTask], config: RunnableConfig) -> str:
+            return self.run(tasks, config)
+
+        async def adispatch(tasks: List[FanOutTask], config: RunnableConfig) -> str:
+            return await self.arun(tasks, config)
+
+        return StructuredTool.from_function(
+            func=dispatch,
+            coroutine=adispatch,
+            name=self.settings["tool_name"],
+            description=(
+                f"Run several of these agents at the same time and get all their answers back: "
+                f"{', '.join(self.agents)}. Use this instead of transferring to each agent in turn "
+                f"when the request has parts that do not depend on each other."
+            ),
+            args_schema=FanOutArgs,
+        )
+
+
+def make_fan_out_tool(supervisor_name: str, agents: Dict[str, Runnable], snapshot: ConfigSnapshot = None) -> Optional[StructuredTool]:
+    """The supervisor's fan-out tool, or None when disabled or there is only one sub-agent."""
+    settings = fan_out_settings(supervisor_name, snapshot)
+    if not settings["enabled"] or len(agents) < 2:
+        return None
+    return FanOut(supervisor_name, agents, settings).as_tool()
@@ -0,0 +1,59 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_graph_cache")
+logger.setLevel(logging.INFO)
+
+
+class GraphCache:
+    """
+    Process-wide cache of compiled agent graphs keyed by agent id and config version.
+
+    Graphs are built at most once per (agent, version): concurrent first requests for the
+    same agent wait on a per-agent lock instead of compiling the graph several times, and a
+    new config version replaces the stale graph on the next lookup.
+    """
+
+    def __init__(self):
+        self._graphs: Dict[str, Tuple[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, agent_name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(agent_name, threading.Lock())
+
+    def lookup(self, agent_name: str, version: str) -> Any:
+        """Return the cached graph for this version, or None without building."""
+        cached = self._graphs.get(agent_name)
+        if cached and cached[0] == version:
+            return cached[1]
+        return None
+
+    def get(self, agent_name: str, version: str, builder: Callable[[], Any]) -> Any:
+        graph = self.lookup(agent_name, version)
+        if graph is not None:
+            return graph
+
+        with self._lock_for(agent_name):
+            cached = self._graphs.get(agent_name)
+            if cached and cached[0] == version:
+                return cached[1]
+
+            start = time.perf_counter()
+            graph = builder()
+            self._graphs[agent_name] = (version, graph)
+            logger.info(
+                f"[graph_cache] Built {agent_name} (config {version}) in "
+                f"{(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+            return graph
+
+    def invalidate(self, agent_name: str = None) -> None:
+        with self._guard:
+            if agent_name is None:
+                self._graphs.clear()
+            else:
+                self._graphs.pop(agent_name, None)
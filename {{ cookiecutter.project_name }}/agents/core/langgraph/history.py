@@ -0,0 +1,135 @@
+# agents/core/langgraph/history.py
+
+import json
+import logging
+from typing import Callable, List, Optional, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.tracing import span
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_history")
+
+DEFAULT_HISTORY_SETTINGS = {
+    "enabled": True,
+    # Budget for the conversation history sent to the model (the system prompt comes on top).
+    "max_tokens": 4000,
+    "collapse_tool_calls": True,
+    "tool_summary_chars": 200,
+}
+
+
+def history_settings(node_id: str, snapshot: ConfigSnapshot = None) -> dict:
+    """Defaults from graph_config.json "history", overridden by the node's "history" block in nodes.json."""
+    snapshot = snapshot or get_config()
+    node = snapshot.node(node_id) or {}
+    return {**DEFAULT_HISTORY_SETTINGS, **snapshot.graph.get("history", {}), **(node.get("history") or {})}
+
+
+def message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content or []
+    ).strip()
+
+
+def _shorten(value, max_chars: int) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    return text if len(text) <= max_chars else f"{text[:max_chars]}…"
+
+
+def split_turns(messages: List[BaseMessage]) -> Tuple[List[BaseMessage], List[List[BaseMessage]]]:
+    """Split into (leading system messages, turns); each turn starts at a user message."""
+    leading, turns = [], []
+    for message in messages:
+        if isinstance(message, SystemMessage) and not turns:
+            leading.append(message)
+        elif isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return leading, turns
+
+
+def collapse_tool_calls(turn: List[BaseMessage], max_chars: int) -> List[BaseMessage]:
+    """
+    Replace each AI tool-call message whose results all follow it with one plain AI message
+    summarising the calls and (truncated) results. Handoffs are tool calls too, so their
+    transfer/transfer-back pairs collapse the same way.
+    """
+    collapsed, i = [], 0
+    while i < len(turn):
+        message = turn[i]
+        if isinstance(message, AIMessage) and message.tool_calls:
+            pending = {call["id"] for call in message.tool_calls}
+            results, j = {}, i + 1
+            while j < len(turn) and isinstance(turn[j], ToolMessage) and turn[j].tool_call_id in pending:
+                results[turn[j].tool_call_id] = turn[j]
+                j += 1
+            if len(results) == len(pending):
+                calls = "; ".join(
+                    f"{call['name']}({_shorten(call['args'], max_chars)}) -> {_shorten(message_text(results[call['id']]), max_chars)}"
+                    for call in message.tool_calls
+                )
+                text = message_text(message)
+                summary = f"{text}\n[tool calls] {calls}" if text else f"[tool calls] {calls}"
+                collapsed.append(AIMessage(content=summary, name=message.name, id=message.id))
+                i = j
+                continue
+        collapsed.append(message)
+        i += 1
+    return collapsed
+
+
+def trim_history(messages: List[BaseMessage], settings: dict) -> Tuple[List[BaseMessage], dict]:
+    """
+    Fit ``messages`` into ``settings["max_tokens"]``: collapse completed tool calls in older
+    turns, then drop whole turns oldest first. Leading system messages and the latest turn
+    are always kept as they are. Returns the trimmed list and its before/after stats.
+    """
+    tokens_before = count_tokens_approximately(messages)
+    leading, turns = split_turns(messages)
+    if len(turns) <= 1:
+        return list(messages), {"tokens_before": tokens_before, "tokens_after": tokens_before, "turns_dropped": 0}
+
+    older, latest = turns[:-1], turns[-1]
+    if settings["collapse_tool_calls"]:
+        older = [collapse_tool_calls(turn, settings["tool_summary_chars"]) for turn in older]
+
+    sizes = [count_tokens_approximately(turn) for turn in older]
+    total = count_tokens_approximately(leading) + count_tokens_approximately(latest) + sum(sizes)
+    dropped = 0
+    while total > settings["max_tokens"] and dropped < len(older):
+        total -= sizes[dropped]
+        dropped += 1
+
+    trimmed = leading + [m for turn in older[dropped:] for m in turn] + latest
+    return trimmed, {"tokens_before": tokens_before, "tokens_after": total, "turns_dropped": dropped}
+
+
+def make_history_hook(node_id: str, snapshot: ConfigSnapshot = None) -> Optional[Callable]:
+    """
+    Return a ``pre_model_hook`` that trims the node's history to its token budget, or None
+    when trimming is disabled for the node. The hook only sets ``llm_input_messages``, so
+    the stored conversation is untouched; the trim is recorded as a ``history.trim`` span.
+    """
+    settings = history_settings(node_id, snapshot)
+    if not settings["enabled"]:
+        return None
+
+    def pre_model_hook(state):
+        messages = state["messages"] if isinstance(state, dict) else state.messages
+        with span("history.trim", root=False, node=node_id, max_tokens=settings["max_tokens"]) as trim_span:
+            trimmed, stats = trim_history(messages, settings)
+            trim_span.set_attribute("messages_before", len(messages))
+            trim_span.set_attribute("messages_after", len(trimmed))
+            for key, value in stats.items():
+                trim_span.set_attribute(key, value)
+        if stats["turns_dropped"]:
+            logger.info(f"✂️ [history] {node_id}: {stats['tokens_before']} -> {stats['tokens_after']} tokens ({stats['turns_dropped']} turns dropped)")
+        return {"llm_input_messages": trimmed}
+
+    return pre_model_hook
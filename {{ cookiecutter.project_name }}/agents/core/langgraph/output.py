@@ -0,0 +1,69 @@
+# agents/core/langgraph/output.py
+
+import json
+from typing import Any, Optional, Type
+from pydantic import BaseModel, ValidationError
+from agents.core.langgraph.streaming import final_payload
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.schema_cache import model_from_json_schema, model_from_type_map
+
+
+def agent_output_model(agent_name: str, snapshot: ConfigSnapshot = None) -> Optional[Type[BaseModel]]:
+    """
+    The validated output model for an agent, from ``output_schema.structure`` of its
+    tools.json entry (a JSON schema with ``properties`` or a flat ``{"field": "type"}``
+    map). None when the agent declares no output structure.
+    """
+    tool_def = (snapshot or get_config()).tool(agent_name) or {}
+    structure = tool_def.get("output_schema", {}).get("structure")
+    if not structure:
+        return None
+    if isinstance(structure, dict) and "properties" in structure:
+        return model_from_json_schema(f"{agent_name}Output", structure)
+    return model_from_type_map(f"{agent_name}Output", structure)
+
+
+def _validated_response(output: Any, agent_name: str, snapshot: ConfigSnapshot = None) -> Optional[BaseModel]:
+    """
+    The final state's ``structured_response``, validated against the requested agent's
+    model (so a routed sub-agent has to share its supervisor's structure). None when the
+    agent has no output model; raises ValueError when it is missing or does not validate.
+    """
+    model = agent_output_model(agent_name, snapshot)
+    if model is None:
+        return None
+
+    structured = output.get("structured_response") if isinstance(output, dict) else None
+    if structured is None:
+        raise ValueError(f"'{agent_name}' returned no structured response")
+    if not isinstance(structured, model):
+        try:
+            structured = model.model_validate(structured.model_dump() if isinstance(structured, BaseModel) else structured)
+        except ValidationError as e:
+            raise ValueError(f"'{agent_name}' structured response does not match its output schema: {e}") from e
+    return structured
+
+
+def agent_response(output: Any, agent_name: str, snapshot: ConfigSnapshot = None) -> Any:
+    """
+    The client payload for a final graph state, as JSON-ready data: the validated
+    structured response, or ``final_payload`` for agents without an output model.
+    Used for batch results and the stream's ``final`` event; raises ValueError like
+    agent_response_json.
+    """
+    structured = _validated_response(output, agent_name, snapshot)
+    return final_payload(output) if structured is None else structured.model_dump(mode="json")
+
+
+def agent_response_json(output: Any, agent_name: str, snapshot: ConfigSnapshot = None) -> str:
+    """
+    Serialize a final graph state to the JSON body returned to clients.
+
+    Agents with an output model must have produced a ``structured_response``; it is
+    validated and serialized once. Raises ValueError when it is missing or does not
+    validate.
+    """
+    structured = _validated_response(output, agent_name, snapshot)
+    if structured is None:
+        return json.dumps(final_payload(output), default=str, ensure_ascii=False)
+    return structured.model_dump_json()
@@ -1,15 +1,19 @@
 import json
 import logging
 from typing import Any
-from jinja2 import Template
 from pydantic import create_model, BaseModel, Field
+from langchain_core.messages import SystemMessage
 from langchain_core.runnables import Runnable
 from langchain_core.runnables.base import RunnableConfig
-from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
-from tools.common.utils.config import load_json_config
-from tools.common.utils.tool_loader import load_native_tools_from_config
-from tools.common.utils.tool_wrappers import parse_type
+from agents.core.langgraph.history import make_history_hook
+from agents.core.langgraph.output import agent_output_model
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.llm_clients import get_chat_model
+from tools.common.utils.tool_loader import tool_registry
+from tools.common.utils.schema_cache import memoized_model, parse_type
+from tools.common.utils.templates import compile_prompt
+from tools.common.utils.tracing import log_sampled, span
 
 logger = logging.getLogger("{{ cookiecutter.project_name }}_react_agent")
 logging.basicConfig(level=logging.INFO)
@@ -20,64 +24,110 @@ class LoggingWrapper(Runnable):
 
     def invoke(self, input: Any, config: RunnableConfig = None) -> Any:
         response = self.wrapped.invoke(input, config)
-        logger.info("🧠 [OpenAI] Raw model output:")
-        try:
-            logger.info(json.dumps(response.model_dump(), indent=2))
-        except Exception:
-            logger.info(str(response))
+        self._log_response(response)
         return response
 
+    async def ainvoke(self, input: Any, config: RunnableConfig = None, **kwargs) -> Any:
+        response = await self.wrapped.ainvoke(input, config, **kwargs)
+        self._log_response(response)
+        return response
+
+    def _log_response(self, response: Any) -> None:
+        log_sampled(logger, "🧠 [OpenAI] Raw model output:\n%s", lambda: json.dumps(response.model_dump(), indent=2, default=str))
+
     def __getattr__(self, name):
         return getattr(self.wrapped, name)
 
-def build_dynamic_state_schema(tool_names, tools_config):
-    all_fields = {
-        "messages": (list, Field(default_factory=list)),
-        "remaining_steps": (int, Field(default=5))
-    }
-    for tool_def in tools_config["tools"]:
-        if tool_def["name"] in tool_names:
+def build_dynamic_state_schema(tool_names, config: ConfigSnapshot):
+    input_fields = {}
+    for tool_name in dict.fromkeys(tool_names):
+        tool_def = config.tool(tool_name)
+        if tool_def:
             for field, typ in tool_def.get("input_schema", {}).items():
-                if field not in all_fields:
-                    all_fields[field] = (parse_type(typ), Field(...))
-    return create_model("AgentState", **all_fields, __base__=BaseModel)
+                input_fields.setdefault(field, typ)
+
+    def factory():
+        all_fields = {
+            "messages": (list, Field(default_factory=list)),
+            "remaining_steps": (int, Field(default=5))
+        }
+        for field, typ in input_fields.items():
+            all_fields.setdefault(field, (parse_type(typ), Field(...)))
+        return create_model("AgentState", **all_fields, __base__=BaseModel)
+
+    # Agents whose tools share the same inputs share one compiled state model.
+    return memoized_model("AgentState", input_fields, factory)
 
-def extract_output_schema(tool_names, tools_config):
+def extract_output_schema(tool_names, config: ConfigSnapshot):
     merged_structure = {}
-    for tool_def in tools_config["tools"]:
-        if tool_def["name"] in tool_names:
-            structure = tool_def.get("output_schema", {}).get("structure", {})
-            merged_structure[tool_def["name"]] = structure
+    for tool_name in dict.fromkeys(tool_names):
+        tool_def = config.tool(tool_name)
+        if tool_def:
+            merged_structure[tool_name] = tool_def.get("output_schema", {}).get("structure", {})
     return json.dumps(merged_structure, indent=2)
 
-def create_configured_react_agent(agent_name: str, context: dict = None):
-    tools_config = load_json_config("config/tools.json")
-    openai_config = load_json_config("config/openai_config.json")
-    nodes_config = load_json_config("config/nodes.json").get("nodes", [])
+def make_dynamic_prompt(raw_prompt: str, static_context: dict = None, aliases: dict = None, snapshot: ConfigSnapshot = None):
+    """
+    Build a prompt callable that renders the system prompt per run.
+
+    Build-time values (output schemas) come from ``static_context``; per-request values
+    (message, identifier, ...) are read from ``config["configurable"]`` so the compiled
+    graph can be cached and shared across requests. ``aliases`` maps extra template
+    variable names to configurable keys (e.g. ``{"user_input": "message"}``).
+    """
+    template = compile_prompt(raw_prompt, snapshot)
+    static_context = dict(static_context or {})
+    aliases = aliases or {}
+
+    def prompt(state, config: RunnableConfig):
+        variables = {**static_context, **((config or {}).get("configurable") or {})}
+        for alias, source in aliases.items():
+            if source in variables:
+                variables[alias] = variables[source]
+        messages = state["messages"] if isinstance(state, dict) else state.messages
+        with span("template.render", root=False, template=template.name):
+            content = template.render(**variables)
+        return [SystemMessage(content=content)] + list(messages)
+
+    return prompt
+
+def create_configured_react_agent(agent_name: str, context: dict = None, snapshot: ConfigSnapshot = None, checkpointer=None, structured: bool = True):
+    """
+    Build the react agent for ``agent_name``. With ``structured`` (agents dispatched
+    directly) an agent that declares an output structure in tools.json ends its run with
+    a validated ``structured_response``.
+    """
+    config = snapshot or get_config()
 
-    agent_node = next((n for n in nodes_config if n["id"] == agent_name), None)
+    agent_node = config.node(agent_name)
     if not agent_node or agent_node.get("type") != "react_agent":
         raise ValueError(f"'{agent_name}' is not a valid react_agent in nodes.json")
 
     agent_cfg = agent_node
-    prompt_cfg = openai_config.get(agent_name)
+    prompt_cfg = config.prompt(agent_name)
     if not prompt_cfg:
         raise ValueError(f"No config found for agent '{agent_name}' in openai_config.json")
 
     tool_names = agent_cfg.get("tools", [])
-    output_schema = extract_output_schema(tool_names, tools_config)
-    agent_output_schema = extract_output_schema([agent_name], tools_config)
+    output_schema = extract_output_schema(tool_names, config)
+    agent_output_schema = extract_output_schema([agent_name], config)
 
-    context = context or {}
+    context = dict(context or {})
     context["expected_output_schema"] = output_schema
     context["agent_output_schema"] = agent_output_schema
 
     raw_prompt = prompt_cfg.get("prompt") or prompt_cfg.get("input_template", "You are a helpful assistant.")
-    rendered_prompt = Template(raw_prompt).render(**context)
+    prompt = make_dynamic_prompt(raw_prompt, context, snapshot=config)
 
-    model = LoggingWrapper(ChatOpenAI(model=prompt_cfg.get("model", "gpt-4o-mini"), temperature=prompt_cfg.get("temperature", 0.3), use_responses_api=True))
+    model = LoggingWrapper(get_chat_model(prompt_cfg.get("model", "gpt-4o-mini"), temperature=prompt_cfg.get("temperature", 0.3)))
 
-    native_tools = load_native_tools_from_config("config/tools.json")
-    tools = [native_tools[t] for t in tool_names if t in native_tools]
+    tools = tool_registry.get_tools(tool_names, config)
 
-    return create_react_agent(model=model, tools=tools, prompt=rendered_prompt)
+    return create_react_agent(
+        model=model,
+        tools=tools,
+        prompt=prompt,
+        pre_model_hook=make_history_hook(agent_name, config),
+        response_format=agent_output_model(agent_name, config) if structured else None,
+        checkpointer=checkpointer,
+    )
@@ -0,0 +1,175 @@
+# agents/core/langgraph/router.py
+
+import logging
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.metrics import ROUTER_CONFIDENCE, ROUTER_DECISIONS
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_router")
+logger.setLevel(logging.INFO)
+
+DEFAULT_ROUTER_SETTINGS = {
+    "enabled": True,
+    # Route only when the best sub-agent scores at least this, and beats the runner-up by min_margin.
+    "min_confidence": 0.8,
+    "min_margin": 0.3,
+    # Score per distinct keyword hit (capped at 1.0); a pattern match scores 1.0.
+    "keyword_weight": 0.4,
+    # Optional "package.module.function" called as fn(message, candidates) -> {agent: probability}.
+    "classifier": None,
+}
+
+
+class RouteDecision:
+    """Outcome of routing one message: ``target`` is the sub-agent to run, or None to use the supervisor."""
+
+    __slots__ = ("supervisor", "target", "confidence", "scores", "source")
+
+    def __init__(self, supervisor: str, target: Optional[str], confidence: float, scores: Dict[str, float], source: str):
+        self.supervisor = supervisor
+        self.target = target
+        self.confidence = confidence
+        self.scores = scores
+        self.source = source
+
+    @property
+    def agent(self) -> str:
+        """The agent that should handle the message."""
+        return self.target or self.supervisor
+
+
+class _CompiledRules:
+    """Per-candidate keyword and pattern regexes for one supervisor at one config version."""
+
+    def __init__(self, candidates: List[Tuple[str, dict]]):
+        self.rules = []
+        for agent_id, routing in candidates:
+            keywords = [k.lower() for k in routing.get("keywords", [])]
+            keyword_re = re.compile(r"\b(" + "|".join(map(re.escape, keywords)) + r")\b", re.IGNORECASE) if keywords else None
+            patterns = [re.compile(p, re.IGNORECASE) for p in routing.get("patterns", [])]
+            self.rules.append((agent_id, keyword_re, patterns))
+
+    def scores(self, message: str, keyword_weight: float) -> Dict[str, float]:
+        scores = {}
+        for agent_id, keyword_re, patterns in self.rules:
+            if any(p.search(message) for p in patterns):
+                scores[agent_id] = 1.0
+                continue
+            hits = {m.lower() for m in keyword_re.findall(message)} if keyword_re else set()
+            scores[agent_id] = min(1.0, len(hits) * keyword_weight)
+        return scores
+
+
+class IntentRouter:
+    """
+    Fast-path router in front of supervisors.
+
+    Each sub-agent listed under a supervisor may declare a ``routing`` block in
+    nodes.json (``keywords`` and regex ``patterns``); the supervisor's own ``router``
+    block overrides the graph_config.json ``router`` defaults. A message is scored
+    against every sub-agent, optionally blended with a local classifier (the higher of
+    the two scores wins), and sent straight to the best sub-agent when it is confident
+    and clearly ahead of the runner-up. Anything else falls back to the supervisor, so
+    a rule set that never matches costs a few regex searches per request.
+
+    Compiled rules are cached per supervisor and config version.
+    """
+
+    def __init__(self):
+        self._rules: Dict[Tuple[str, str], _CompiledRules] = {}
+        self._classifiers: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._routed = 0
+
+    @staticmethod
+    def settings(supervisor_name: str, snapshot: ConfigSnapshot = None) -> dict:
+        snapshot = snapshot or get_config()
+        node = snapshot.node(supervisor_name) or {}
+        return {**DEFAULT_ROUTER_SETTINGS, **snapshot.graph.get("router", {}), **(node.get("router") or {})}
+
+    def _compiled(self, supervisor_name: str, snapshot: ConfigSnapshot) -> _CompiledRules:
+        key = (supervisor_name, snapshot.version)
+        rules = self._rules.get(key)
+        if rules is None:
+            candidates = []
+            for agent_id in snapshot.node(supervisor_name).get("agents", []):
+                node = snapshot.node(agent_id) or {}
+                if agent_id in snapshot.agent_types:
+                    candidates.append((agent_id, node.get("routing") or {}))
+            rules = _CompiledRules(candidates)
+            with self._lock:
+                self._rules = {k: v for k, v in self._rules.items() if k[1] == snapshot.version}
+                self._rules[key] = rules
+        return rules
+
+    def _classify(self, path: str, message: str, candidates: List[str]) -> Dict[str, float]:
+        classifier = self._classifiers.get(path)
+        try:
+            if classifier is None:
+                # Only needed when a classifier is configured; keeps this module cheap to import.
+                from tools.common.utils.tool_loader import import_from_path
+                classifier = self._classifiers.setdefault(path, import_from_path(path))
+            probabilities = classifier(message, candidates) or {}
+            return {agent: float(p) for agent, p in probabilities.items() if agent in candidates}
+        except Exception as e:
+            logger.error(f"❌ [router] Classifier {path} failed: {e}")
+            return {}
+
+    def stats(self) -> dict:
+        return {
+            "requests": self._requests,
+            "routed": self._routed,
+            "hit_rate": self._routed / self._requests if self._requests else 0.0,
+        }
+
+    def route(self, agent_name: str, message: str, snapshot: ConfigSnapshot = None) -> Optional[RouteDecision]:
+        """Route a message addressed to ``agent_name``; None unless it is a supervisor with routing enabled."""
+        snapshot = snapshot or get_config()
+        if snapshot.agent_types.get(agent_name) != "supervisor":
+            return None
+        settings = self.settings(agent_name, snapshot)
+        if not settings["enabled"]:
+            return None
+
+        scores = self._compiled(agent_name, snapshot).scores(message, settings["keyword_weight"])
+        sources = dict.fromkeys(scores, "rules")
+        if settings["classifier"]:
+            for agent_id, probability in self._classify(settings["classifier"], message, list(scores)).items():
+                if probability > scores[agent_id]:
+                    scores[agent_id] = probability
+                    sources[agent_id] = "classifier"
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best, confidence = ranked[0] if ranked else (None, 0.0)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        routed = confidence >= settings["min_confidence"] and confidence - runner_up >= settings["min_margin"]
+        source = sources.get(best, "rules")
+        decision = RouteDecision(agent_name, best if routed else None, confidence, scores, source)
+
+        outcome = "routed" if routed else "fallback"
+        with self._lock:
+            self._requests += 1
+            self._routed += routed
+        ROUTER_DECISIONS.labels(agent_name, decision.agent, outcome).inc()
+        ROUTER_CONFIDENCE.labels(agent_name, outcome).observe(confidence)
+        logger.info(
+            f"🧭 [router] {agent_name} -> {decision.agent} ({outcome}, confidence {confidence:.2f} via {source}; "
+            f"hit rate {self.stats()['hit_rate']:.0%})"
+        )
+        return decision
+
+
+_router: Optional[IntentRouter] = None
+_router_lock = threading.Lock()
+
+def get_router() -> IntentRouter:
+    """Return the process-wide intent router."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = IntentRouter()
+    return _router
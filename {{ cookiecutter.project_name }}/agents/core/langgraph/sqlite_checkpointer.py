@@ -0,0 +1,68 @@
+# agents/core/langgraph/sqlite_checkpointer.py
+
+import asyncio
+import time
+from typing import AsyncIterator, List
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+class SqliteCheckpointer(SqliteSaver):
+    """
+    SqliteSaver (WAL journal) that also serves the async graph APIs.
+
+    The stock SqliteSaver is sync-only; here each async method runs its sync counterpart
+    on a worker thread, which the saver's own lock already makes safe. A
+    ``thread_activity`` table tracks the last write per thread for the TTL sweeper.
+    """
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS thread_activity_updated_at ON thread_activity (updated_at);
+            """
+        )
+
+    def _touch(self, config) -> None:
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_activity (thread_id, updated_at) VALUES (?, ?)",
+                (str(config["configurable"]["thread_id"]), time.time()),
+            )
+
+    def idle_threads(self, older_than: float) -> List[str]:
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT thread_id FROM thread_activity WHERE updated_at < ?", (older_than,))
+            return [row[0] for row in cur.fetchall()]
+
+    def forget(self, thread_id: str) -> None:
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        self._touch(config)
+        return saved
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
@@ -0,0 +1,176 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+HANDOFF_PREFIXES = ("transfer_to_", "transfer_back_to_")
+MAX_EVENT_PAYLOAD_CHARS = 4000
+# LangGraph's node that asks the model for the agent's structured response.
+STRUCTURED_RESPONSE_NODE = "generate_structured_response"
+
+
+def _text_from_chunk(content: Any) -> str:
+    """Extract plain text from a chat-model chunk (string or Responses-API content blocks)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if isinstance(part, str):
+                parts.append(part)
+            elif isinstance(part, dict) and part.get("type") in ("text", "output_text"):
+                parts.append(part.get("text", ""))
+        return "".join(parts)
+    return ""
+
+
+def _compact(value: Any) -> Any:
+    """Make a tool payload JSON-safe and bounded in size for the event stream."""
+    try:
+        text = json.dumps(value, default=str, ensure_ascii=False)
+    except Exception:
+        text = str(value)
+    if len(text) <= MAX_EVENT_PAYLOAD_CHARS:
+        return json.loads(text)
+    return {"truncated": True, "preview": text[:MAX_EVENT_PAYLOAD_CHARS]}
+
+
+def _agent_from_event(event: dict, root_agent: str) -> str:
+    """Name of the (sub-)agent that produced an event, derived from the checkpoint namespace."""
+    namespace = (event.get("metadata") or {}).get("langgraph_checkpoint_ns", "")
+    if namespace:
+        head = namespace.split("|", 1)[0].split(":", 1)[0]
+        if head and head not in ("agent", "tools", STRUCTURED_RESPONSE_NODE):
+            return head
+    return root_agent
+
+
+def final_payload(output: Any) -> dict:
+    """Reduce a final graph state to the payload returned to clients."""
+    if not isinstance(output, dict):
+        return {"message": str(output)}
+    if output.get("structured_response") is not None:
+        structured = output["structured_response"]
+        return structured.model_dump() if hasattr(structured, "model_dump") else _compact(structured)
+    messages = output.get("messages") or []
+    if messages:
+        last = messages[-1]
+        content = getattr(last, "content", None)
+        if content is None and isinstance(last, dict):
+            content = last.get("content")
+        return {"message": _text_from_chunk(content)}
+    return _compact(output)
+
+
+class PartialJSON:
+    """
+    Incremental parser for a JSON object that arrives in chunks.
+
+    Each chunk is scanned once, tracking nesting and string state. Whenever a value
+    completes, the text up to it is closed off and parsed, so ``feed`` returns the object
+    with every field known so far, or None when no new field completed.
+    """
+
+    __slots__ = ("text", "_stack", "_expect_key", "_in_string", "_in_key", "_escape", "_complete", "_closers", "_last")
+
+    def __init__(self):
+        self.text = ""
+        self._stack: List[str] = []         # open containers, "{" or "["
+        self._expect_key: List[bool] = []   # per container: an object waiting for a key
+        self._in_string = self._in_key = self._escape = False
+        self._complete = 0                  # length of the prefix ending at the last completed value
+        self._closers = ""                  # brackets that close that prefix
+        self._last = None
+
+    def _mark(self, end: int) -> None:
+        self._complete = end
+        self._closers = "".join("}" if c == "{" else "]" for c in reversed(self._stack))
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        start, completed = len(self.text), self._complete
+        self.text += chunk
+        for i, ch in enumerate(chunk, start):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._stack and not self._in_key:
+                        self._mark(i + 1)
+            elif ch == '"':
+                self._in_string = True
+                self._in_key = bool(self._expect_key) and self._expect_key[-1]
+            elif ch in "{[":
+                self._stack.append(ch)
+                self._expect_key.append(ch == "{")
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                    self._expect_key.pop()
+                self._mark(i + 1)
+            elif ch == ":" and self._expect_key:
+                self._expect_key[-1] = False
+            elif ch == "," and self._stack:
+                self._mark(i)
+                self._expect_key[-1] = self._stack[-1] == "{"
+
+        if self._complete == completed:
+            return None
+        try:
+            value = json.loads(self.text[:self._complete] + self._closers)
+        except ValueError:
+            return None
+        if value == self._last:
+            return None
+        self._last = value
+        return value
+
+
+def to_stream_event(event: dict, root_agent: str, agent_names: Iterable[str] = (), partials: Optional[Dict[str, PartialJSON]] = None) -> Optional[dict]:
+    """
+    Translate one ``astream_events`` (v2) event into a client-facing stream event.
+
+    Returns ``{"event": <type>, "data": {...}}`` or None for events the client does not need.
+    Event types: ``route`` (handoffs and sub-agent starts), ``tool_start``, ``tool_end``,
+    ``token``, ``partial`` and ``final``. ``final`` carries the run's final state;
+    agent_dispatch_stream turns it into the validated client payload.
+
+    The structured response is streamed as ``partial`` events, each carrying the object
+    with the fields completed so far, instead of raw JSON tokens; ``partials`` holds the
+    per-run parsers for one stream.
+    """
+    kind = event.get("event")
+    name = event.get("name", "")
+    data = event.get("data") or {}
+
+    if kind == "on_chat_model_stream":
+        chunk = data.get("chunk")
+        text = _text_from_chunk(getattr(chunk, "content", None))
+        if not text:
+            return None
+        agent = _agent_from_event(event, root_agent)
+        if partials is not None and (event.get("metadata") or {}).get("langgraph_node") == STRUCTURED_RESPONSE_NODE:
+            value = partials.setdefault(event.get("run_id"), PartialJSON()).feed(text)
+            return {"event": "partial", "data": {"agent": agent, "output": value}} if value is not None else None
+        return {"event": "token", "data": {"agent": agent, "text": text}}
+
+    if kind == "on_tool_start":
+        for prefix in HANDOFF_PREFIXES:
+            if name.startswith(prefix):
+                return {"event": "route", "data": {"from": _agent_from_event(event, root_agent), "to": name[len(prefix):], "via": name}}
+        return {"event": "tool_start", "data": {"agent": _agent_from_event(event, root_agent), "tool": name, "input": _compact(data.get("input"))}}
+
+    if kind == "on_tool_end":
+        if name.startswith(HANDOFF_PREFIXES):
+            return None
+        output = data.get("output")
+        output = getattr(output, "content", output)
+        return {"event": "tool_end", "data": {"agent": _agent_from_event(event, root_agent), "tool": name, "output": _compact(output)}}
+
+    if kind == "on_chain_start" and name in agent_names and name != root_agent:
+        return {"event": "route", "data": {"from": root_agent, "to": name, "via": "agent_start"}}
+
+    if kind == "on_chain_end" and not event.get("parent_ids"):
+        return {"event": "final", "data": data.get("output")}
+
+    return None
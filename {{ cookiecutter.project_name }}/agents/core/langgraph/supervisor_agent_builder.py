@@ -1,14 +1,17 @@
 import json
 import logging
 from typing import Any, Dict
-from jinja2 import Template
-from pydantic import create_model
-from langchain_openai import ChatOpenAI
 from langchain_core.runnables import Runnable
 from langgraph_supervisor import create_supervisor
-from tools.common.utils.config import load_json_config
-from tools.common.utils.tool_loader import load_native_tools_from_config
-from agents.core.langgraph.react_agent_builder import create_configured_react_agent
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.llm_clients import get_chat_model
+from tools.common.utils.templates import compile_prompt
+from tools.common.utils.tool_loader import tool_registry
+from tools.common.utils.tracing import log_sampled
+from agents.core.langgraph.fan_out import make_fan_out_tool
+from agents.core.langgraph.history import make_history_hook
+from agents.core.langgraph.output import agent_output_model
+from agents.core.langgraph.react_agent_builder import create_configured_react_agent, make_dynamic_prompt
 
 logger = logging.getLogger("{{ cookiecutter.project_name }}_supervisor_builder")
 logging.basicConfig(level=logging.INFO)
@@ -19,43 +22,45 @@ class LoggingWrapper(Runnable):
 
     def invoke(self, input: Any, config=None) -> Any:
         response = self.wrapped.invoke(input, config)
-        logger.info("🧠 [OpenAI] Raw model output:")
-        try:
-            logger.info(json.dumps(response.model_dump(), indent=2))
-        except Exception:
-            logger.info(str(response))
+        self._log_response(response)
         return response
 
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        response = await self.wrapped.ainvoke(input, config, **kwargs)
+        self._log_response(response)
+        return response
+
+    def _log_response(self, response: Any) -> None:
+        log_sampled(logger, "🧠 [OpenAI] Raw model output:\n%s", lambda: json.dumps(response.model_dump(), indent=2, default=str))
+
     def __getattr__(self, name):
         return getattr(self.wrapped, name)
 
 
-def extract_output_schema(tool_names, tools_config) -> str:
+def extract_output_schema(tool_names, config: ConfigSnapshot) -> str:
     merged: Dict[str, dict] = {}
-    for tool_def in tools_config["tools"]:
-        name = tool_def["name"]
-        if name not in tool_names:
+    for name in dict.fromkeys(tool_names):
+        tool_def = config.tool(name)
+        if not tool_def:
             continue
         struct = tool_def.get("output_schema", {}).get("structure", {})
         merged[name] = struct
     return json.dumps(merged, indent=2)
 
 
-def create_supervisor_agent(agent_name: str, context: dict = None):
-    tools_config = load_json_config("config/tools.json")
-    openai_config = load_json_config("config/openai_config.json")
-    nodes_config = load_json_config("config/nodes.json").get("nodes", [])
+def create_supervisor_agent(agent_name: str, context: dict = None, snapshot: ConfigSnapshot = None, checkpointer=None):
+    config = snapshot or get_config()
 
-    agent_node = next((n for n in nodes_config if n["id"] == agent_name), None)
+    agent_node = config.node(agent_name)
     if not agent_node or agent_node.get("type") != "supervisor":
         raise ValueError(f"'{agent_name}' is not a valid supervisor in nodes.json")
 
-    prompt_cfg = openai_config.get(agent_name)
+    prompt_cfg = config.prompt(agent_name)
     tool_names = agent_node.get("tools", [])
-    agent_output_schema = extract_output_schema([agent_name], tools_config)
-    output_schema = extract_output_schema(tool_names, tools_config)
+    agent_output_schema = extract_output_schema([agent_name], config)
+    output_schema = extract_output_schema(tool_names, config)
 
-    context = context or {}
+    context = dict(context or {})
     if "message" in context:
         context["user_input"] = context["message"]
     if "customer_id" in context:
@@ -63,51 +68,49 @@ def create_supervisor_agent(agent_name: str, context: dict = None):
     context["expected_output_schema"] = output_schema
     context["agent_output_schema"] = agent_output_schema
 
-    rendered_prompt = Template(prompt_cfg.get("prompt") or prompt_cfg.get("input_template", "")).render(**context)
+    raw_prompt = prompt_cfg.get("prompt") or prompt_cfg.get("input_template", "")
+    prompt = make_dynamic_prompt(raw_prompt, context, aliases={"user_input": "message", "user_id": "customer_id"}, snapshot=config)
+    # The structured-response step only sees build-time values; the user's message is
+    # already part of the conversation it summarises.
+    rendered_prompt = compile_prompt(raw_prompt, config).render(**context)
 
-    native_tools = load_native_tools_from_config("config/tools.json")
-    tools = [native_tools[t] for t in tool_names if t in native_tools]
+    tools = tool_registry.get_tools(tool_names, config)
 
-    model = LoggingWrapper(ChatOpenAI(
-        model=prompt_cfg.get("model", "gpt-4o-mini"),
+    model = LoggingWrapper(get_chat_model(
+        prompt_cfg.get("model", "gpt-4o-mini"),
         temperature=prompt_cfg.get("temperature", 0.3),
-        use_responses_api=True
     ))
 
-    from pydantic import create_model
-    agent_schema_map = json.loads(agent_output_schema)
-    json_schema_obj = agent_schema_map.get(agent_name, {})
-    props = json_schema_obj.get("properties", {})
-    required_fields = set(json_schema_obj.get("required", []))
-    from typing import Any as _Any
-    pydantic_fields = {}
-    for field_name, subschema in props.items():
-        ttype = subschema.get("type")
-        pytype = str if ttype == "string" else bool if ttype == "boolean" else int if ttype == "integer" else list if ttype == "array" else dict if ttype == "object" else _Any
-        default = ... if field_name in required_fields else None
-        pydantic_fields[field_name] = (pytype, default)
-
-    SupervisorOutput = create_model(f"{agent_name}Output", **pydantic_fields)
-    full_agent_schema = SupervisorOutput.schema()
+    # A model class (rather than its JSON schema) makes structured_response a validated
+    # instance that the API serializes as is.
+    output_model = agent_output_model(agent_name, config)
 
     sub_agents = []
     for sub_agent_id in agent_node.get("agents", []):
-        sub_agent = create_configured_react_agent(sub_agent_id, context)
+        # Sub-agents answer the supervisor, which produces the one structured response.
+        sub_agent = create_configured_react_agent(sub_agent_id, context, snapshot=config, structured=False)
         sub_agent.name = sub_agent_id
         sub_agents.append(sub_agent)
 
+    # With parallel handoffs langgraph_supervisor only runs one of the branches, so independent
+    # sub-agent work goes through the fan-out tool instead (see fan_out.FanOut).
+    fan_out_tool = make_fan_out_tool(agent_name, {sub_agent.name: sub_agent for sub_agent in sub_agents}, config)
+    if fan_out_tool is not None:
+        tools = tools + [fan_out_tool]
+
     from langgraph.prebuilt.chat_agent_executor import AgentStateWithStructuredResponse
 
     return create_supervisor(
         agents=sub_agents,
         model=model,
         tools=tools,
-        prompt=rendered_prompt,
-        response_format=(rendered_prompt, full_agent_schema),
+        prompt=prompt,
+        pre_model_hook=make_history_hook(agent_name, config),
+        response_format=(rendered_prompt, output_model) if output_model else None,
         parallel_tool_calls=True,
         supervisor_name=agent_name,
         output_mode="last_message",
         add_handoff_messages=True,
         add_handoff_back_messages=True,
         state_schema=AgentStateWithStructuredResponse
-    ).compile()
+    ).compile(checkpointer=checkpointer)  # sub-agents inherit it as subgraphs
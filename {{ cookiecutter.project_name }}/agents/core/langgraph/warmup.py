@@ -0,0 +1,157 @@
+# agents/core/langgraph/warmup.py
+
+import asyncio
+import logging
+import time
+from typing import Dict, List
+from jinja2 import UndefinedError
+from agents.core.langgraph.agent_dispatcher import get_agent_graph
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.llm_clients import get_async_openai_client
+from tools.common.utils.templates import PROMPT_FIELDS, get_prompt_templates
+
+logger = logging.getLogger("{{ cookiecutter.project_name }}_warmup")
+logger.setLevel(logging.INFO)
+
+DEFAULT_WARMUP_SETTINGS = {
+    "enabled": True,
+    "import_tools": True,
+    "build_graphs": True,
+    "render_templates": True,
+    # Opens the pooled HTTPS connection with one authenticated models.list() call.
+    "connect_llm": False,
+}
+
+
+def warmup_nodes(snapshot: ConfigSnapshot) -> List[dict]:
+    """Nodes to warm: every node in nodes.json unless it sets ``"warmup": false``."""
+    return [node for node in snapshot.nodes if node.get("warmup", True)]
+
+
+class Warmup:
+    """
+    Preloads everything the first request would otherwise pay for, one timed stage at a
+    time: config snapshot, tool imports, prompt templates, agent graphs and (optionally)
+    the LLM connection. ``ready`` flips once every stage has run; a failing stage is
+    logged and reported in ``stages`` but does not hold readiness back, since the same
+    failure would surface on the request path anyway.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.stages: Dict[str, dict] = {}
+
+    def _record(self, name: str, start: float, status: str, detail: str) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stages[name] = {"status": status, "ms": round(elapsed_ms, 1), "detail": detail}
+        logger.info(f"🔥 [warmup] {name}: {status} in {elapsed_ms:.1f} ms ({detail})")
+
+    def _stage(self, name: str, fn) -> None:
+        start = time.perf_counter()
+        try:
+            self._record(name, start, "ok", fn())
+        except Exception as e:
+            logger.error(f"❌ [warmup] {name} failed: {e}", exc_info=True)
+            self._record(name, start, "error", str(e))
+
+    async def _astage(self, name: str, fn) -> None:
+        start = time.perf_counter()
+        try:
+            self._record(name, start, "ok", await fn())
+        except Exception as e:
+            logger.error(f"❌ [warmup] {name} failed: {e}")
+            self._record(name, start, "error", str(e))
+
+    # -- stages ---------------------------------------------------------------------
+
+    @staticmethod
+    def _config() -> str:
+        return f"version {get_config().version}"
+
+    @staticmethod
+    def _tools() -> str:
+        # Imported here so that importing web.main stays cheap (see benchmarks/bench_import_time.py)
+        from tools.common.utils.tool_loader import get_tool_registry, tool_function_path
+
+        snapshot = get_config()
+        registry = get_tool_registry()
+        paths = {
+            tool_function_path(snapshot.tool(name) or {})
+            for node in warmup_nodes(snapshot)
+            for name in node.get("tools", [])
+        }
+        paths.discard(None)
+        failed = []
+        for path in sorted(paths):
+            try:
+                registry.resolve(path)
+            except Exception as e:
+                logger.error(f"❌ [warmup] Could not import {path}: {e}")
+                failed.append(path)
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(paths)} tool imports failed: {failed}")
+        return f"{len(paths)} tool functions"
+
+    @staticmethod
+    def _templates() -> str:
+        snapshot = get_config()
+        templates = get_prompt_templates()
+        templates.precompile(snapshot)
+        rendered = 0
+        failed = []
+        for name, prompt_cfg in snapshot.prompt_by_name.items():
+            for field in PROMPT_FIELDS:
+                source = prompt_cfg.get(field)
+                if not isinstance(source, str):
+                    continue
+                try:
+                    templates.render(source)
+                    rendered += 1
+                except UndefinedError:
+                    pass  # strict templates need real variables; compiling them is enough
+                except Exception as e:
+                    logger.error(f"❌ [warmup] Could not render {name}.{field}: {e}")
+                    failed.append(f"{name}.{field}")
+        if failed:
+            raise RuntimeError(f"{len(failed)} templates failed to render: {failed}")
+        return f"{rendered} templates rendered"
+
+    @staticmethod
+    def _graphs() -> str:
+        snapshot = get_config()
+        names = [node["id"] for node in warmup_nodes(snapshot) if node["id"] in snapshot.agent_types]
+        for name in names:
+            get_agent_graph(name)
+            get_agent_graph(name, checkpointed=True)
+        return f"{len(names)} agents compiled"
+
+    @staticmethod
+    async def _connect() -> str:
+        await get_async_openai_client().models.list()
+        return "connection pool warm"
+
+    # -- entry points ---------------------------------------------------------------
+
+    def run(self) -> Dict[str, dict]:
+        """Run the synchronous stages in order (call from a worker thread in async code)."""
+        settings = {**DEFAULT_WARMUP_SETTINGS, **get_config().graph.get("warmup", {})}
+        self._stage("config", self._config)
+        if settings["import_tools"]:
+            self._stage("tools", self._tools)
+        if settings["render_templates"]:
+            self._stage("templates", self._templates)
+        if settings["build_graphs"]:
+            self._stage("graphs", self._graphs)
+        return self.stages
+
+    async def arun(self) -> Dict[str, dict]:
+        """Run every enabled stage, then mark the process ready."""
+        settings = {**DEFAULT_WARMUP_SETTINGS, **get_config().graph.get("warmup", {})}
+        start = time.perf_counter()
+        if settings["enabled"]:
+            await asyncio.to_thread(self.run)
+            if settings["connect_llm"]:
+                await self._astage("llm_connection", self._connect)
+        self.ready = True
+        logger.info(f"✅ [warmup] Ready after {(time.perf_counter() - start) * 1000:.1f} ms")
+        return self.stages
@@ -0,0 +1,54 @@
+"""
+Benchmark graph acquisition overhead in agent_dispatch with and without the graph cache.
+
+Run from the project root:
+
+    python -m benchmarks.bench_graph_cache --iterations 20
+
+No LLM calls are made: the benchmark measures only the work done before the first
+token is requested (config loading, tool wrapping, graph compilation).
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+logging.disable(logging.WARNING)
+
+from agents.core.langgraph.agent_dispatcher import build_agent_graph, get_agent_graph
+from tools.common.utils.config import get_config
+
+
+def _time_calls(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--agent", action="append", help="Agent id to benchmark (default: all agents in nodes.json)")
+    args = parser.parse_args()
+
+    agents = args.agent or list(get_config().agent_types)
+    print(f"{'agent':<30} {'uncached ms (p50)':>18} {'cached ms (p50)':>16} {'speedup':>10}")
+    for agent_name in agents:
+        uncached = _time_calls(lambda: build_agent_graph(agent_name), args.iterations)
+        get_agent_graph(agent_name)  # warm the cache once
+        cached = _time_calls(lambda: get_agent_graph(agent_name), args.iterations)
+
+        uncached_p50 = statistics.median(uncached)
+        cached_p50 = statistics.median(cached)
+        speedup = uncached_p50 / cached_p50 if cached_p50 else float("inf")
+        print(f"{agent_name:<30} {uncached_p50:>18.3f} {cached_p50:>16.4f} {speedup:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark cold import time of the entry-point modules against the budgets tracked in
+benchmarks/import_budget.json (milliseconds).
+
+Run from the project root:
+
+    python -m benchmarks.bench_import_time --runs 5
+
+Each module is imported in a fresh interpreter with ``python -X importtime``; the median
+cumulative time over the runs is compared with its budget, and the slowest imports are
+listed for modules over budget. Exits with status 1 when any module is over budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BUDGET_PATH = Path(__file__).with_name("import_budget.json")
+
+
+def import_times(module: str) -> dict:
+    """Return cumulative import time in microseconds per imported module for one cold run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list for modules over budget")
+    args = parser.parse_args()
+
+    budgets = json.loads(BUDGET_PATH.read_text())
+    over_budget = False
+    print(f"{'module':<42} {'median ms':>10} {'budget ms':>10}")
+    for module, budget_ms in budgets.items():
+        runs = [import_times(module) for _ in range(args.runs)]
+        median_ms = statistics.median(run[module] for run in runs) / 1000
+        status = "ok" if median_ms <= budget_ms else "OVER"
+        print(f"{module:<42} {median_ms:>10.1f} {budget_ms:>10} {status}")
+        if median_ms > budget_ms:
+            over_budget = True
+            slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[1:args.top + 1]
+            for name, cumulative in slowest:
+                print(f"    {name:<50} {cumulative / 1000:>8.1f} ms")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
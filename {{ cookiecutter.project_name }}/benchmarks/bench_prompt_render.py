@@ -0,0 +1,60 @@
+"""
+Benchmark per-request prompt rendering: compiling with jinja2.Template on every call
+versus rendering the precompiled template from the shared environment.
+
+Run from the project root:
+
+    python -m benchmarks.bench_prompt_render --iterations 2000
+
+Every prompt/input_template in openai_config.json is rendered with placeholder values
+for the variables it references.
+"""
+
+import argparse
+import logging
+import statistics
+import time
+
+logging.disable(logging.WARNING)
+
+from jinja2 import Template
+from tools.common.utils.config import get_config
+from tools.common.utils.templates import PROMPT_FIELDS, compile_prompt, get_prompt_templates
+
+
+def _time_calls(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    snapshot = get_config()
+    templates = get_prompt_templates()
+    print(f"{'prompt':<40} {'Template() us (p50)':>20} {'precompiled us (p50)':>21} {'speedup':>9}")
+    for name, prompt_cfg in snapshot.prompt_by_name.items():
+        for field in PROMPT_FIELDS:
+            source = prompt_cfg.get(field)
+            if not isinstance(source, str):
+                continue
+            variables = {var: f"<{var}>" for var in templates.undeclared_variables(source)}
+
+            uncached = _time_calls(lambda: Template(source).render(**variables), args.iterations)
+            compile_prompt(source, snapshot)  # compile once, as the first request would
+            cached = _time_calls(lambda: compile_prompt(source, snapshot).render(**variables), args.iterations)
+
+            uncached_p50 = statistics.median(uncached)
+            cached_p50 = statistics.median(cached)
+            speedup = uncached_p50 / cached_p50 if cached_p50 else float("inf")
+            print(f"{name[:40]:<40} {uncached_p50:>20.1f} {cached_p50:>21.1f} {speedup:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+HTTP load test: web/main.py under uvicorn against the local mock OpenAI server.
+
+Run from the project root:
+
+    python -m benchmarks.load_test --workers 4 --concurrency 64 --duration 60 --output load.json
+    python -m benchmarks.load_test --rate 20 --endpoint agent --endpoint stream --duration 120
+
+Starts benchmarks.mock_openai_server and ``uvicorn web.main:app --workers N`` with
+``OPENAI_BASE_URL`` pointing at the mock, waits for every worker's /ready, then drives the
+chosen endpoints (``agent``, ``stream``, ``batch``) for ``--duration`` seconds or
+``--requests`` requests. Without ``--rate`` the load is closed-loop (``--concurrency``
+clients sending back to back); with it, requests arrive as a Poisson process at that
+rate, still capped at ``--concurrency`` in flight. Requests spread over
+``--conversations`` identifiers, so checkpointed histories grow as they would in use.
+
+The JSON report has p50/p95/p99 latency, throughput and error rate per endpoint (time to
+first event as well for ``stream``) and peak RSS per uvicorn worker, for CI trend
+tracking. Point ``--base-url`` at a running server to skip starting one.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_MESSAGES = [
+    {"agent_name": "{{ cookiecutter.supervisor_name }}", "message": "I'd like two burgers and a lemonade, please"},
+    {"agent_name": "{{ cookiecutter.supervisor_name }}", "message": "What goes into the house salad?"},
+    {"agent_name": "{{ cookiecutter.agent_one_name }}", "message": "Add a large fries to my order"},
+    {"agent_name": "{{ cookiecutter.agent_two_name }}", "message": "How do you cook the mushroom risotto?"},
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# -- processes ------------------------------------------------------------------------
+
+def _children(pid: int) -> List[int]:
+    """Direct child processes (Linux /proc; empty elsewhere)."""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _cmdline(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class Servers:
+    """The mock OpenAI server and the app under test, as child processes."""
+
+    def __init__(self, args):
+        self.args = args
+        self.mock_port = _free_port()
+        self.app_port = _free_port()
+        self.processes: List[subprocess.Popen] = []
+        self.app: Optional[subprocess.Popen] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.app_port}"
+
+    def start(self) -> None:
+        mock_cmd = [
+            sys.executable, "-m", "benchmarks.mock_openai_server", "--port", str(self.mock_port),
+            "--latency-ms", str(self.args.mock_latency_ms),
+            "--latency-sigma", str(self.args.mock_latency_sigma),
+            "--stream-interval-ms", str(self.args.mock_stream_interval_ms),
+            "--tool-call-rate", str(self.args.mock_tool_call_rate),
+            "--error-rate", str(self.args.mock_error_rate),
+            "--rate-limit-rate", str(self.args.mock_rate_limit_rate),
+        ]
+        self.processes.append(subprocess.Popen(mock_cmd))
+        env = {
+            **os.environ,
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.mock_port}/v1",
+            "OPENAI_API_BASE": f"http://127.0.0.1:{self.mock_port}/v1",
+            "OPENAI_API_KEY": "sk-mock",
+            "LLM_BACKEND": "openai",
+        }
+        app_cmd = [
+            sys.executable, "-m", "uvicorn", "web.main:app",
+            "--host", "127.0.0.1", "--port", str(self.app_port),
+            "--workers", str(self.args.workers), "--log-level", "warning",
+        ]
+        self.app = subprocess.Popen(app_cmd, env=env)
+        self.processes.append(self.app)
+
+    def workers(self) -> List[int]:
+        if self.app is None:
+            return []
+        # Workers are spawned processes; skip multiprocessing's resource tracker. With a
+        # single worker uvicorn serves from the main process.
+        return [pid for pid in _children(self.app.pid) if "spawn_main" in _cmdline(pid)] or [self.app.pid]
+
+    def stop(self) -> None:
+        for process in reversed(self.processes):
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+        for process in self.processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def wait_ready(client: httpx.AsyncClient, workers: int, timeout: float) -> None:
+    """Wait until /ready answers 200 on enough consecutive requests to cover every worker."""
+    deadline = time.monotonic() + timeout
+    ready_in_a_row = 0
+    while ready_in_a_row < workers * 4:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Server not ready after {timeout}s")
+        try:
+            ok = (await client.get("/ready")).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        ready_in_a_row = ready_in_a_row + 1 if ok else 0
+        if not ok:
+            await asyncio.sleep(0.5)
+
+
+# -- load -----------------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.first_event: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.error_samples: Dict[str, List[str]] = defaultdict(list)
+
+    def record(self, endpoint: str, start: float, ok: bool, status, error: Optional[str] = None) -> None:
+        self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+        self.statuses[endpoint][str(status)] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+            samples = self.error_samples[endpoint]
+            if error and error not in samples and len(samples) < 5:
+                samples.append(error)
+
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, args, messages: List[dict]):
+        self.client = client
+        self.args = args
+        self.messages = messages
+        self.rng = random.Random(args.seed)
+        self.recorder = Recorder()
+        self.sent = 0
+
+    def _item(self) -> dict:
+        message = self.rng.choice(self.messages)
+        return {**message, "identifier": f"load-{self.rng.randrange(self.args.conversations)}"}
+
+    async def _agent(self) -> None:
+        start = time.perf_counter()
+        status, error = "exception", None
+        try:
+            response = await self.client.post("/api/agent", json=self._item())
+            status = response.status_code
+            error = response.json().get("error")
+            ok = status < 400 and not error
+        except (httpx.HTTPError, ValueError) as e:
+            ok, error = False, repr(e)
+        self.recorder.record("agent", start, ok, status, error)
+
+    async def _stream(self) -> None:
+        start = time.perf_counter()
+        status, ok, first, error = "exception", False, None, None
+        try:
+            async with self.client.stream("POST", "/api/agent/stream", json=self._item()) as response:
+                status = response.status_code
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                        if first is None:
+                            first = (time.perf_counter() - start) * 1000
+                        ok = event == "final" or (ok and event != "error")
+                    elif line.startswith("data:") and event == "error":
+                        error = line[5:].strip()
+        except httpx.HTTPError as e:
+            ok, error = False, repr(e)
+        if first is not None:
+            self.recorder.first_event["stream"].append(first)
+        self.recorder.record("stream", start, ok and status < 400, status, error)
+
+    async def _batch(self) -> None:
+        start = time.perf_counter()
+        status, ok, error = "exception", False, None
+        items = [self._item() for _ in range(self.args.batch_size)]
+        try:
+            async with self.client.stream("POST", "/api/agent/batch", json={"items": items}) as response:
+                status = response.status_code
+                results = [json.loads(line) async for line in response.aiter_lines() if line.strip()]
+                failed = [r for r in results if r.get("status") != "ok"]
+                ok = status < 400 and len(results) == len(items) and not failed
+                error = failed[0].get("error") if failed else None
+        except (httpx.HTTPError, ValueError) as e:
+            ok, error = False, repr(e)
+        self.recorder.record("batch", start, ok, status, error)
+
+    def _next_request(self):
+        return {"agent": self._agent, "stream": self._stream, "batch": self._batch}[self.rng.choice(self.args.endpoint)]()
+
+    def _more(self, deadline: float) -> bool:
+        if self.args.requests:
+            return self.sent < self.args.requests
+        return time.monotonic() < deadline
+
+    async def run(self) -> float:
+        deadline = time.monotonic() + self.args.duration
+        start = time.perf_counter()
+        if self.args.rate:
+            await self._open_loop(deadline)
+        else:
+            await self._closed_loop(deadline)
+        return time.perf_counter() - start
+
+    async def _closed_loop(self, deadline: float) -> None:
+        async def client_loop():
+            while self._more(deadline):
+                self.sent += 1
+                await self._next_request()
+
+        await asyncio.gather(*(client_loop() for _ in range(self.args.concurrency)))
+
+    async def _open_loop(self, deadline: float) -> None:
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        in_flight = set()
+
+        async def send():
+            async with semaphore:
+                await self._next_request()
+
+        while self._more(deadline):
+            self.sent += 1
+            task = asyncio.ensure_future(send())
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            await asyncio.sleep(self.rng.expovariate(self.args.rate))
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+
+async def sample_rss(servers: Optional[Servers], peaks: Dict[int, float], interval: float = 0.5) -> None:
+    while servers is not None:
+        for pid in servers.workers():
+            rss = _rss_mb(pid)
+            if rss is not None:
+                peaks[pid] = max(peaks.get(pid, 0.0), rss)
+        await asyncio.sleep(interval)
+
+
+def build_report(args, recorder: Recorder, wall_seconds: float, rss: Dict[int, float]) -> dict:
+    endpoints = {}
+    for endpoint, latencies in recorder.latencies.items():
+        count = len(latencies)
+        endpoints[endpoint] = {
+            "requests": count,
+            "errors": recorder.errors[endpoint],
+            "error_rate": round(recorder.errors[endpoint] / count, 4) if count else 0.0,
+            "throughput_rps": round(count / wall_seconds, 2) if wall_seconds else 0.0,
+            "latency_ms": {q: round(_percentile(latencies, p), 1) for q, p in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "status_codes": dict(recorder.statuses[endpoint]),
+            "error_samples": recorder.error_samples[endpoint],
+        }
+        if recorder.first_event.get(endpoint):
+            first = recorder.first_event[endpoint]
+            endpoints[endpoint]["first_event_ms"] = {q: round(_percentile(first, p), 1) for q, p in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+    total = sum(len(l) for l in recorder.latencies.values())
+    errors = sum(recorder.errors.values())
+    return {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "conversations": args.conversations,
+            "endpoints": args.endpoint,
+            "mock_latency_ms": args.mock_latency_ms,
+            "mock_error_rate": args.mock_error_rate,
+        },
+        "wall_seconds": round(wall_seconds, 2),
+        "requests": total,
+        "throughput_rps": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "endpoints": endpoints,
+        "rss_mb_per_worker": {str(pid): round(mb, 1) for pid, mb in sorted(rss.items())},
+    }
+
+
+async def run(args) -> dict:
+    messages = DEFAULT_MESSAGES
+    if args.messages:
+        with open(args.messages, encoding="utf-8") as f:
+            messages = [json.loads(line) for line in f if line.strip()]
+
+    servers = None
+    if not args.base_url:
+        servers = Servers(args)
+        servers.start()
+    base_url = args.base_url or servers.base_url
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    rss: Dict[int, float] = {}
+    sampler = None
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await wait_ready(client, args.workers if servers else 1, args.ready_timeout)
+            sampler = asyncio.ensure_future(sample_rss(servers, rss))
+            generator = LoadGenerator(client, args, messages)
+            wall_seconds = await generator.run()
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+        if servers is not None:
+            servers.stop()
+    return build_report(args, generator.recorder, wall_seconds, rss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients (closed loop) or in-flight cap (open loop)")
+    parser.add_argument("--rate", type=float, default=None, help="Poisson arrival rate in requests/s (open loop)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests instead")
+    parser.add_argument("--endpoint", action="append", choices=["agent", "stream", "batch"], help="Endpoint mix (repeatable, default agent)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--conversations", type=int, default=100, help="Distinct identifiers to spread requests over")
+    parser.add_argument("--messages", help="JSONL of {agent_name, message} to sample from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--ready-timeout", type=float, default=120)
+    parser.add_argument("--base-url", help="Load an already running server instead of starting one")
+    parser.add_argument("--mock-latency-ms", type=float, default=600)
+    parser.add_argument("--mock-latency-sigma", type=float, default=0.4)
+    parser.add_argument("--mock-stream-interval-ms", type=float, default=15)
+    parser.add_argument("--mock-tool-call-rate", type=float, default=0.5)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+    args.endpoint = args.endpoint or ["agent"]
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Local stand-in for the OpenAI API, for load tests that exercise the real HTTP client path.
+
+Run from the project root:
+
+    python -m benchmarks.mock_openai_server --port 8100 --latency-ms 600 --error-rate 0.01
+
+and point the app at it with ``OPENAI_BASE_URL=http://127.0.0.1:8100/v1``.
+
+Implements ``POST /v1/responses``, ``POST /v1/chat/completions`` (both with ``stream``),
+``POST /v1/moderations`` and ``GET /v1/models``. Requests with function tools get a call
+to one of them (placeholder arguments from its schema) with probability
+``tool_call_rate``, once per user turn; requests asking for a JSON schema get a value of
+that shape; everything else gets ``response``. Latency, streaming pace and injected
+failures (HTTP 500 and 429) are set by the flags below.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from tools.common.utils.fake_llm import DEFAULT_FAKE_SETTINGS, placeholder, sample_latency
+
+DEFAULT_MOCK_SETTINGS = {
+    "seed": None,
+    # Time to first byte, as in llm_backend.fake (see tools.common.utils.fake_llm).
+    "latency": {"distribution": "lognormal", "median_ms": 600, "sigma": 0.4},
+    "stream_chunk_chars": 16,
+    "stream_interval_ms": 15,
+    "tool_call_rate": 0.5,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "response": DEFAULT_FAKE_SETTINGS["response"],
+    "chars_per_token": 4,
+    # Moderation: inputs matching this regex are flagged.
+    "flag_pattern": None,
+}
+
+
+class MockOpenAI:
+    """Builds OpenAI-shaped responses; one instance backs the server app."""
+
+    def __init__(self, settings: Optional[dict] = None):
+        self.settings = {**DEFAULT_MOCK_SETTINGS, **(settings or {})}
+        self.rng = random.Random(self.settings["seed"])
+        pattern = self.settings["flag_pattern"]
+        self._flag = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    # -- behaviour ------------------------------------------------------------------
+
+    async def delay(self) -> None:
+        await asyncio.sleep(sample_latency(self.settings["latency"], self.rng))
+
+    def injected_failure(self) -> Optional[JSONResponse]:
+        self.stats["requests"] += 1
+        roll = self.rng.random()
+        if roll < self.settings["rate_limit_rate"]:
+            self.stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached (mock)", "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after": "1"},
+            )
+        if roll < self.settings["rate_limit_rate"] + self.settings["error_rate"]:
+            self.stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "Injected failure (mock)", "type": "server_error"}})
+        return None
+
+    def choose_tool(self, tools: List[Tuple[str, dict]], answered: bool) -> Optional[Tuple[str, dict]]:
+        if not tools or answered or self.rng.random() >= self.settings["tool_call_rate"]:
+            return None
+        name, schema = self.rng.choice(tools)
+        return name, placeholder(schema) or {}
+
+    def answer(self, schema: Optional[dict]) -> str:
+        if schema:
+            return json.dumps(placeholder(schema))
+        return self.settings["response"]
+
+    def tokens(self, payload) -> int:
+        return max(1, len(json.dumps(payload, ensure_ascii=False)) // self.settings["chars_per_token"])
+
+    def chunks(self, text: str) -> List[str]:
+        size = self.settings["stream_chunk_chars"]
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    # -- /v1/responses --------------------------------------------------------------
+
+    def responses_plan(self, body: dict) -> Tuple[dict, List[dict]]:
+        items = body.get("input") or []
+        if isinstance(items, str):
+            items = [{"role": "user", "content": items}]
+        last_user = max((i for i, item in enumerate(items) if item.get("role") == "user"), default=-1)
+        answered = any(item.get("type") == "function_call_output" for item in items[last_user + 1:])
+        tools = [(t["name"], t.get("parameters") or {}) for t in body.get("tools") or [] if t.get("type") == "function"]
+        call = self.choose_tool(tools, answered)
+        if call:
+            output = [{
+                "type": "function_call",
+                "id": f"fc_{uuid.uuid4().hex[:24]}",
+                "call_id": f"call_{uuid.uuid4().hex[:24]}",
+                "name": call[0],
+                "arguments": json.dumps(call[1]),
+                "status": "completed",
+            }]
+        else:
+            text_format = (body.get("text") or {}).get("format") or {}
+            text = self.answer(text_format.get("schema") if text_format.get("type") == "json_schema" else None)
+            output = [{
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }]
+        input_tokens, output_tokens = self.tokens(items), self.tokens(output)
+        response = {
+            "id": f"resp_{uuid.uuid4().hex[:24]}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model", "mock"),
+            "status": "completed",
+            "output": output,
+            "error": None,
+            "incomplete_details": None,
+            "instructions": None,
+            "metadata": body.get("metadata") or {},
+            "parallel_tool_calls": True,
+            "temperature": body.get("temperature"),
+            # Echoed like the real API; clients read the requested format back from it.
+            "text": body.get("text") or {"format": {"type": "text"}},
+            "tool_choice": body.get("tool_choice") or "auto",
+            "tools": body.get("tools") or [],
+            "top_p": None,
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+        return response, output
+
+    async def responses_stream(self, response: dict, output: List[dict]) -> AsyncIterator[str]:
+        sequence = 0
+
+        def event(kind: str, **data) -> str:
+            nonlocal sequence
+            sequence += 1
+            return f"event: {kind}\ndata: {json.dumps({'type': kind, 'sequence_number': sequence, **data})}\n\n"
+
+        interval = self.settings["stream_interval_ms"] / 1000
+        yield event("response.created", response={**response, "status": "in_progress", "output": [], "usage": None})
+        for index, item in enumerate(output):
+            if item["type"] == "function_call":
+                yield event("response.output_item.added", output_index=index, item={**item, "arguments": "", "status": "in_progress"})
+                yield event("response.function_call_arguments.delta", item_id=item["id"], output_index=index, delta=item["arguments"])
+                yield event("response.function_call_arguments.done", item_id=item["id"], output_index=index, arguments=item["arguments"])
+            else:
+                text = item["content"][0]["text"]
+                part = {"type": "output_text", "text": "", "annotations": []}
+                yield event("response.output_item.added", output_index=index, item={**item, "content": [], "status": "in_progress"})
+                yield event("response.content_part.added", item_id=item["id"], output_index=index, content_index=0, part=part)
+                for delta in self.chunks(text):
+                    await asyncio.sleep(interval)
+                    yield event("response.output_text.delta", item_id=item["id"], output_index=index, content_index=0, delta=delta, logprobs=[])
+                yield event("response.output_text.done", item_id=item["id"], output_index=index, content_index=0, text=text, logprobs=[])
+                yield event("response.content_part.done", item_id=item["id"], output_index=index, content_index=0, part={**part, "text": text})
+            yield event("response.output_item.done", output_index=index, item=item)
+        yield event("response.completed", response=response)
+
+    # -- /v1/chat/completions -------------------------------------------------------
+
+    def chat_plan(self, body: dict) -> dict:
+        messages = body.get("messages") or []
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        answered = any(m.get("role") == "tool" for m in messages[last_user + 1:])
+        tools = [(t["function"]["name"], t["function"].get("parameters") or {}) for t in body.get("tools") or [] if t.get("type") == "function"]
+        call = self.choose_tool(tools, answered)
+        if call:
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {"name": call[0], "arguments": json.dumps(call[1])},
+            }]}
+            finish_reason = "tool_calls"
+        else:
+            response_format = body.get("response_format") or {}
+            schema = (response_format.get("json_schema") or {}).get("schema") if response_format.get("type") == "json_schema" else None
+            message = {"role": "assistant", "content": self.answer(schema)}
+            finish_reason = "stop"
+        prompt_tokens, completion_tokens = self.tokens(messages), self.tokens(message)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    async def chat_stream(self, completion: dict) -> AsyncIterator[str]:
+        base = {key: completion[key] for key in ("id", "created", "model")}
+        choice = completion["choices"][0]
+        message = choice["message"]
+
+        def chunk(delta: dict, finish_reason=None, **extra) -> str:
+            data = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+            return f"data: {json.dumps(data)}\n\n"
+
+        interval = self.settings["stream_interval_ms"] / 1000
+        yield chunk({"role": "assistant", "content": ""})
+        if message.get("tool_calls"):
+            yield chunk({"tool_calls": [{"index": 0, **message["tool_calls"][0]}]})
+        else:
+            for delta in self.chunks(message["content"]):
+                await asyncio.sleep(interval)
+                yield chunk({"content": delta})
+        yield chunk({}, choice["finish_reason"])
+        yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': completion['usage']})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    # -- /v1/moderations ------------------------------------------------------------
+
+    def moderation(self, body: dict) -> dict:
+        texts = body.get("input") or []
+        if isinstance(texts, str):
+            texts = [texts]
+        results = []
+        for text in texts:
+            flagged = bool(self._flag and self._flag.search(text if isinstance(text, str) else json.dumps(text)))
+            results.append({
+                "flagged": flagged,
+                "categories": {"harassment": flagged, "violence": False},
+                "category_scores": {"harassment": 1.0 if flagged else 0.0, "violence": 0.0},
+            })
+        return {"id": f"modr-{uuid.uuid4().hex[:24]}", "model": body.get("model", "omni-moderation-latest"), "results": results}
+
+
+def create_app(settings: Optional[dict] = None) -> FastAPI:
+    mock = MockOpenAI(settings)
+    app = FastAPI()
+    app.state.mock = mock
+
+    def sse(events: AsyncIterator[str]) -> StreamingResponse:
+        return StreamingResponse(events, media_type="text/event-stream")
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        await mock.delay()
+        failure = mock.injected_failure()
+        if failure is not None:
+            return failure
+        response, output = mock.responses_plan(body)
+        return sse(mock.responses_stream(response, output)) if body.get("stream") else response
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await mock.delay()
+        failure = mock.injected_failure()
+        if failure is not None:
+            return failure
+        completion = mock.chat_plan(body)
+        return sse(mock.chat_stream(completion)) if body.get("stream") else completion
+
+    @app.post("/v1/moderations")
+    async def moderations(request: Request):
+        body = await request.json()
+        failure = mock.injected_failure()
+        if failure is not None:
+            return failure
+        return mock.moderation(body)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "created": 0, "owned_by": "mock"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return mock.stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=None, help="Median time to first byte")
+    parser.add_argument("--latency-sigma", type=float, default=None, help="Lognormal spread (0 for constant latency)")
+    parser.add_argument("--stream-interval-ms", type=float, default=None)
+    parser.add_argument("--tool-call-rate", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=None, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=None, help="Share of requests answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--settings", default=None, help="JSON object merged over the defaults")
+    args = parser.parse_args()
+
+    settings = json.loads(args.settings) if args.settings else {}
+    latency = dict(settings.get("latency") or DEFAULT_MOCK_SETTINGS["latency"])
+    if args.latency_ms is not None:
+        latency["median_ms"] = args.latency_ms
+    if args.latency_sigma is not None:
+        latency["sigma"] = args.latency_sigma
+    settings["latency"] = latency
+    for name in ("stream_interval_ms", "tool_call_rate", "error_rate", "rate_limit_rate", "seed"):
+        if getattr(args, name) is not None:
+            settings[name] = getattr(args, name)
+
+    import uvicorn
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Replay recorded agent requests against the fake LLM backend and report framework overhead.
+
+Run from the project root:
+
+    python -m benchmarks.replay_agent_logs --limit 200 --concurrency 8 --output replay.json
+    python -m benchmarks.replay_agent_logs --limit 200 --concurrency 8 --compare replay.json
+
+Requests are read from logs/agent_logs.jsonl (the dispatcher's own request log) and sent
+through agent_dispatch / agent_dispatch_async with ``LLM_BACKEND=fake``, so no request
+reaches OpenAI and model latency comes from the ``llm_backend.fake`` settings in
+graph_config.json. Every run is traced; the report gives throughput, end-to-end latency,
+the mean time per span name, and the overhead left once model time is subtracted. Save a
+report with ``--output`` on one commit and pass it to ``--compare`` on another.
+
+Replayed requests keep their conversations apart from real ones (identifiers are prefixed
+with ``replay:``), and their own log entries are skipped by later replays.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["LLM_BACKEND"] = "fake"
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+logging.disable(logging.WARNING)
+
+from agents.core.langgraph.agent_dispatcher import agent_dispatch, agent_dispatch_async
+from tools.common.utils.tracing import get_tracer
+
+REPLAY_PREFIX = "replay:"
+
+
+def load_requests(path: str, limit: int = None, agents: list = None) -> list:
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("type") != "agent" or not entry.get("message"):
+                continue
+            identifier = (entry.get("context") or {}).get("identifier")
+            if str(identifier or "").startswith(REPLAY_PREFIX):
+                continue
+            if agents and entry["agent_name"] not in agents:
+                continue
+            requests.append({
+                "agent_name": entry["agent_name"],
+                "message": entry["message"],
+                "identifier": f"{REPLAY_PREFIX}{identifier}" if identifier is not None else None,
+            })
+            if limit and len(requests) >= limit:
+                break
+    return requests
+
+
+class SpanCollector:
+    """Keeps every finished span in memory instead of exporting it."""
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def install(self) -> None:
+        tracer = get_tracer()
+        tracer.enabled = True
+        tracer.settings["sample_rate"] = 1.0
+        tracer.export = self.export
+
+
+def _percentile(samples: list, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _replay_sync(requests: list, concurrency: int) -> list:
+    def run(request):
+        start = time.perf_counter()
+        output = agent_dispatch(request["agent_name"], request["message"], {"identifier": request["identifier"]})
+        return (time.perf_counter() - start) * 1000, isinstance(output, dict) and "error" in output
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, requests))
+
+
+async def _replay_async(requests: list, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(request):
+        async with semaphore:
+            start = time.perf_counter()
+            output = await agent_dispatch_async(request["agent_name"], request["message"], {"identifier": request["identifier"]})
+            return (time.perf_counter() - start) * 1000, isinstance(output, dict) and "error" in output
+
+    return await asyncio.gather(*(run(request) for request in requests))
+
+
+def build_report(results: list, spans: list, wall_seconds: float, mode: str, concurrency: int) -> dict:
+    latencies = [ms for ms, _ in results]
+    by_name = defaultdict(list)
+    llm_ms_by_trace = defaultdict(float)
+    for s in spans:
+        ms = (s.end_ns - s.start_ns) / 1e6
+        by_name[s.name].append(ms)
+        if s.name == "llm.call":
+            llm_ms_by_trace[s.trace.trace_id] += ms
+    overhead = [
+        (s.end_ns - s.start_ns) / 1e6 - llm_ms_by_trace[s.trace.trace_id]
+        for s in spans if s.name == "agent.dispatch"
+    ]
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": sum(1 for _, failed in results if failed),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(results) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.5), 2),
+            "p95": round(_percentile(latencies, 0.95), 2),
+        },
+        "overhead_ms": {
+            "mean": round(statistics.mean(overhead), 2) if overhead else 0.0,
+            "p95": round(_percentile(overhead, 0.95), 2),
+        },
+        "stages": {
+            name: {"count": len(samples), "mean_ms": round(statistics.mean(samples), 3)}
+            for name, samples in sorted(by_name.items())
+        },
+    }
+
+
+def _delta(current: float, baseline: float) -> str:
+    if not baseline:
+        return ""
+    return f"{(current - baseline) / baseline:+.1%}"
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    baseline = baseline or {}
+    base_stages = baseline.get("stages", {})
+    print(f"{report['requests']} requests ({report['errors']} errors), {report['mode']} x{report['concurrency']}, {report['wall_seconds']} s")
+    rows = [
+        ("throughput (req/s)", report["throughput_rps"], baseline.get("throughput_rps")),
+        ("latency p50 (ms)", report["latency_ms"]["p50"], baseline.get("latency_ms", {}).get("p50")),
+        ("latency p95 (ms)", report["latency_ms"]["p95"], baseline.get("latency_ms", {}).get("p95")),
+        ("overhead mean (ms)", report["overhead_ms"]["mean"], baseline.get("overhead_ms", {}).get("mean")),
+        ("overhead p95 (ms)", report["overhead_ms"]["p95"], baseline.get("overhead_ms", {}).get("p95")),
+    ]
+    for label, value, base in rows:
+        print(f"{label:<24} {value:>12.2f} {_delta(value, base):>9}")
+    print(f"\n{'stage':<24} {'count':>8} {'mean ms':>12}")
+    for name, stage in report["stages"].items():
+        base = base_stages.get(name, {}).get("mean_ms")
+        print(f"{name:<24} {stage['count']:>8} {stage['mean_ms']:>12.3f} {_delta(stage['mean_ms'], base):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=os.path.join("logs", "agent_logs.jsonl"))
+    parser.add_argument("--limit", type=int, default=None, help="Replay at most this many requests")
+    parser.add_argument("--agent", action="append", help="Only replay requests for this agent (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--mode", choices=["sync", "async"], default="async")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--compare", help="Baseline report (from --output) to compare against")
+    args = parser.parse_args()
+
+    requests = load_requests(args.log, args.limit, args.agent)
+    if not requests:
+        parser.error(f"No agent requests found in {args.log}")
+
+    collector = SpanCollector()
+    collector.install()
+    start = time.perf_counter()
+    if args.mode == "sync":
+        results = _replay_sync(requests, args.concurrency)
+    else:
+        results = asyncio.run(_replay_async(requests, args.concurrency))
+    report = build_report(results, collector.spans, time.perf_counter() - start, args.mode, args.concurrency)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
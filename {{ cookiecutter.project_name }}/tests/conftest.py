@@ -0,0 +1,32 @@
+import pytest
+
+from agents.core.langgraph import agent_dispatcher
+from agents.core.langgraph.checkpointing import MemoryCheckpointer
+from agents.core.langgraph.graph_cache import GraphCache
+from tools.common.utils import llm_clients, moderation
+from tools.common.utils.moderation import ModerationBatcher
+
+
+@pytest.fixture
+def fake_llm(request, monkeypatch):
+    """
+    Run agents against the fake LLM backend with fresh graphs, in-memory checkpoints and
+    an empty moderation cache. Parametrize indirectly with a dict to override
+    ``llm_backend.fake`` settings for one test.
+    """
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-placeholder")
+    monkeypatch.setattr(llm_clients, "_pool", None)
+    monkeypatch.setattr(agent_dispatcher, "graph_cache", GraphCache())
+    checkpointer = MemoryCheckpointer()
+    monkeypatch.setattr(agent_dispatcher, "get_checkpointer", lambda: checkpointer)
+    monkeypatch.setattr(moderation, "_batcher", ModerationBatcher())
+    pool = llm_clients.get_llm_pool()
+    # Clients are created on first use, so they pick up these settings.
+    pool.backend["fake"] = {
+        **pool.backend["fake"],
+        "latency": {"distribution": "constant", "ms": 0},
+        **getattr(request, "param", {}),
+    }
+    yield pool
+    llm_clients._pool = None
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from agents.core.langgraph import admission
+from agents.core.langgraph.admission import AdmissionController, AdmissionRejected
+from tools.common.utils.config import ConfigSnapshot
+
+
+def _config(monkeypatch, **settings):
+    snapshot = ConfigSnapshot({
+        "graph": {"admission": {"max_concurrency": 1, "max_queue": 2, "max_wait_seconds": 1, **settings}},
+        "nodes": {"nodes": [
+            {"id": "order_agent", "type": "react_agent", "admission": {"priority": "interactive"}},
+            {"id": "report_agent", "type": "react_agent", "admission": {"priority": "batch", "max_concurrency": 1}},
+        ]},
+    }, "test")
+    monkeypatch.setattr(admission, "get_config", lambda: snapshot)
+
+
+def test_released_slot_goes_to_higher_priority_lane(monkeypatch):
+    _config(monkeypatch)
+    controller = AdmissionController()
+    order = []
+
+    async def run(agent_name, label):
+        async with controller.admit(agent_name):
+            order.append(label)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        first = asyncio.create_task(run("order_agent", "first"))
+        await asyncio.sleep(0)
+        batch = asyncio.create_task(run("report_agent", "batch"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(run("order_agent", "interactive"))
+        await asyncio.gather(first, batch, interactive)
+
+    asyncio.run(main())
+    assert order == ["first", "interactive", "batch"]
+    assert controller.stats()["running"] == 0
+
+
+def test_full_queue_sheds_batch_work_then_rejects_with_429(monkeypatch):
+    _config(monkeypatch, max_queue=1)
+    controller = AdmissionController()
+
+    async def main():
+        ticket = await controller.acquire("order_agent")
+        batch = asyncio.create_task(controller.acquire("report_agent"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(controller.acquire("order_agent"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as shed:
+            await batch
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire("order_agent")
+        ticket.release()
+        (await interactive).release()
+        return shed.value, full.value
+
+    shed, full = asyncio.run(main())
+    assert (shed.status_code, shed.reason) == (429, "shed")
+    assert (full.status_code, full.reason) == (429, "queue_full")
+    assert int(full.headers["Retry-After"]) >= 1
+
+
+def test_wait_timeout_returns_503(monkeypatch):
+    _config(monkeypatch, max_wait_seconds=0.01)
+    controller = AdmissionController()
+
+    async def main():
+        await controller.acquire("order_agent")
+        with pytest.raises(AdmissionRejected) as timeout:
+            await controller.acquire("order_agent")
+        return timeout.value
+
+    assert asyncio.run(main()).status_code == 503
+    assert controller.stats()["queued"] == 0
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import time
+
+from agents.core.langgraph import batch
+from agents.core.langgraph.batch import read_batch_results, run_batch, write_batch_file
+from tools.common.utils.config import ConfigSnapshot
+
+
+async def _fake_dispatch(agent_name, message, context):
+    if message == "boom":
+        raise RuntimeError("boom")
+    if message == "refuse":
+        return {"error": "Message flagged by moderation", "categories": ["violence"]}
+    await asyncio.sleep(float(message))
+    return {"messages": [{"role": "assistant", "content": f"done {message}"}]}
+
+
+def test_items_run_concurrently_with_isolated_failures(monkeypatch):
+    monkeypatch.setattr(batch, "agent_dispatch_async", _fake_dispatch)
+    items = [{"agent_name": "orders", "message": m, "identifier": str(i)} for i, m in enumerate(["0.2", "0.05", "boom", "5", "refuse"])]
+    # Declares an output structure, so a reply without a structured_response is an error
+    items.append({"agent_name": "{{ cookiecutter.agent_two_name }}", "message": "0.01", "identifier": "5"})
+
+    async def collect():
+        return [r async for r in run_batch(items, max_concurrency=8, timeout_seconds=0.3)]
+
+    start = time.perf_counter()
+    results = asyncio.run(collect())
+
+    assert time.perf_counter() - start < 1
+    assert results[-1]["index"] == 3  # finished last (timed out), results stream in completion order
+    by_index = {r["index"]: r for r in results}
+    assert [by_index[i]["status"] for i in range(6)] == ["ok", "ok", "error", "timeout", "error", "error"]
+    assert by_index[0]["output"] == {"message": "done 0.2"}
+    assert by_index[4]["categories"] == ["violence"]
+    assert by_index[5]["error"] == "Agent returned an invalid response"
+
+
+def test_offline_batch_file_round_trip(tmp_path):
+    snapshot = ConfigSnapshot({
+        "nodes": {"nodes": [{"id": "orders", "type": "react_agent", "tools": []}]},
+        "openai": {"orders": {"model": "gpt-4o-mini", "input_template": "Help {{ identifier }} with: {{ message }}"}},
+    }, "test")
+    requests_path = tmp_path / "batch_input.jsonl"
+
+    assert write_batch_file([{"agent_name": "orders", "message": "two burgers", "identifier": "7"}], str(requests_path), snapshot) == 1
+    line = json.loads(requests_path.read_text())
+    assert (line["custom_id"], line["url"]) == ("0:orders", "/v1/responses")
+    assert line["body"]["input"][0]["content"] == "Help 7 with: two burgers"
+
+    output_path = tmp_path / "batch_output.jsonl"
+    output_path.write_text("\n".join(json.dumps(l) for l in [
+        {"custom_id": "1:orders", "response": {"status_code": 500, "body": {"error": {"message": "server error"}}}},
+        {"custom_id": "0:orders", "response": {"status_code": 200, "body": {
+            "metadata": line["body"]["metadata"],
+            "output": [{"type": "message", "content": [{"type": "output_text", "text": "Added."}]}],
+        }}},
+    ]))
+
+    ok, failed = read_batch_results(str(output_path))
+    assert ok == {"index": 0, "agent_name": "orders", "identifier": "7", "status": "ok", "output": {"message": "Added."}}
+    assert (failed["index"], failed["status"], failed["error"]) == (1, "error", "server error")
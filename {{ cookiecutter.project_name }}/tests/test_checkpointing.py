@@ -0,0 +1,49 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from agents.core.langgraph.checkpointing import MemoryCheckpointer, sweep, thread_config
+from agents.core.langgraph.sqlite_checkpointer import SqliteCheckpointer
+
+
+def _echo_graph(checkpointer):
+    def reply(state: MessagesState):
+        return {"messages": [("ai", f"seen {len(state['messages'])}")]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("reply", reply)
+    graph.add_edge(START, "reply")
+    graph.add_edge("reply", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def checkpointer(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCheckpointer()
+    return SqliteCheckpointer(sqlite3.connect(str(tmp_path / "checkpoints.sqlite3"), check_same_thread=False))
+
+
+def test_conversation_resumes_by_identifier(checkpointer):
+    graph = _echo_graph(checkpointer)
+    config = {"configurable": thread_config({"identifier": 42})}
+
+    graph.invoke({"messages": [("user", "hi")]}, config)
+    result = asyncio.run(graph.ainvoke({"messages": [("user", "again")]}, config))
+
+    assert [m.content for m in result["messages"]] == ["hi", "seen 1", "again", "seen 3"]
+    assert thread_config({"identifier": None}) == {}
+
+
+def test_sweep_deletes_idle_threads(checkpointer):
+    graph = _echo_graph(checkpointer)
+    graph.invoke({"messages": [("user", "hi")]}, {"configurable": {"thread_id": "old"}})
+    time.sleep(0.05)
+    graph.invoke({"messages": [("user", "hi")]}, {"configurable": {"thread_id": "new"}})
+
+    assert sweep(checkpointer, ttl_seconds=0.03) == 1
+    assert checkpointer.get_tuple({"configurable": {"thread_id": "old"}}) is None
+    assert checkpointer.get_tuple({"configurable": {"thread_id": "new"}}) is not None
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from tools.common.utils.config import ConfigRegistry
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    paths = {
+        "nodes": tmp_path / "nodes.json",
+        "tools": tmp_path / "tools.json",
+        "openai": tmp_path / "openai_config.json",
+        "graph": tmp_path / "graph_config.json",
+    }
+    _write(paths["nodes"], {"nodes": [
+        {"id": "supervisor", "type": "supervisor", "agents": ["worker"]},
+        {"id": "worker", "type": "react_agent", "tools": ["lookup"]},
+    ]})
+    _write(paths["tools"], {"tools": [
+        {"name": "lookup", "function_path": "tools.demo.lookup.lookup", "output_schema": {"structure": {"output": "string"}}},
+    ]})
+    _write(paths["openai"], {"version": "1.0", "worker": {"input_template": "Hi {{ message }}"}})
+    _write(paths["graph"], {"config_reload_interval_seconds": 0})
+    return ConfigRegistry({key: str(path) for key, path in paths.items()}), paths
+
+
+def test_snapshot_indexes(registry):
+    reg, _ = registry
+    snapshot = reg.current()
+
+    assert snapshot.node("worker")["tools"] == ("lookup",)
+    assert snapshot.agent_types == {"supervisor": "supervisor", "worker": "react_agent"}
+    assert snapshot.tool("lookup") is snapshot.tool_by_function["tools.demo.lookup.lookup"]
+    assert snapshot.tool_by_function["lookup"]["name"] == "lookup"
+    assert snapshot.prompt("worker")["input_template"] == "Hi {{ message }}"
+    assert "version" not in snapshot.prompt_by_name
+
+
+def test_snapshot_is_read_only(registry):
+    reg, _ = registry
+    snapshot = reg.current()
+
+    with pytest.raises(TypeError):
+        snapshot.prompt("worker")["model"] = "other"
+    with pytest.raises(AttributeError):
+        snapshot.version = "x"
+    assert json.loads(json.dumps(snapshot.tool("lookup")))["name"] == "lookup"
+
+
+def test_reload_on_change_keeps_last_good_snapshot(registry):
+    reg, paths = registry
+    first = reg.current()
+    assert reg.current() is first
+
+    _write(paths["openai"], {"worker": {"input_template": "Hello {{ message }}"}})
+    os.utime(paths["openai"], ns=(0, os.stat(paths["openai"]).st_mtime_ns + 1_000_000))
+    second = reg.current()
+    assert second.version != first.version
+    assert second.prompt("worker")["input_template"] == "Hello {{ message }}"
+
+    paths["openai"].write_text("{not json", encoding="utf-8")
+    os.utime(paths["openai"], ns=(0, os.stat(paths["openai"]).st_mtime_ns + 2_000_000))
+    assert reg.current() is second
@@ -0,0 +1,55 @@
+import asyncio
+import json
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from agents.core.langgraph.fan_out import DEFAULT_FAN_OUT_SETTINGS, FanOut, FanOutTask
+
+
+def _agent(delay: float, answer: str):
+    def reply(state):
+        time.sleep(delay)
+        return {"messages": state["messages"] + [AIMessage(answer)]}
+
+    async def areply(state):
+        await asyncio.sleep(delay)
+        return {"messages": state["messages"] + [AIMessage(answer)]}
+
+    return RunnableLambda(reply, afunc=areply)
+
+
+def _fan_out(**settings):
+    agents = {"slow": _agent(0.3, "slow done"), "fast": _agent(0.05, "fast done"), "stuck": _agent(5, "never")}
+    return FanOut("supervisor", agents, {**DEFAULT_FAN_OUT_SETTINGS, **settings})
+
+
+TASKS = [
+    FanOutTask(agent="slow", request="a"),
+    FanOutTask(agent="fast", request="b"),
+    FanOutTask(agent="missing", request="c"),
+]
+
+
+def test_branches_run_concurrently_and_merge_in_task_order():
+    fan_out = _fan_out()
+    for run in (lambda: fan_out.run(TASKS), lambda: asyncio.run(fan_out.arun(TASKS))):
+        start = time.perf_counter()
+        results = json.loads(run())["results"]
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3 + 0.05 + 0.2  # max(latencies), not the sum
+        assert [(r["agent"], r["status"]) for r in results] == [("slow", "ok"), ("fast", "ok"), ("missing", "error")]
+        assert [r.get("output") for r in results[:2]] == ["slow done", "fast done"]
+
+
+def test_branch_timeout_and_limit_are_reported_per_branch():
+    fan_out = _fan_out(branch_timeout_seconds=0.2, max_branches=2)
+    tasks = [FanOutTask(agent="stuck", request="a"), FanOutTask(agent="fast", request="b"), FanOutTask(agent="slow", request="c")]
+    for run in (lambda: fan_out.run(tasks), lambda: asyncio.run(fan_out.arun(tasks))):
+        start = time.perf_counter()
+        results = json.loads(run())["results"]
+
+        assert time.perf_counter() - start < 1
+        assert [r["status"] for r in results] == ["timeout", "ok", "skipped"]
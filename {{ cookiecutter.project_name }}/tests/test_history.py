@@ -0,0 +1,47 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from agents.core.langgraph.history import DEFAULT_HISTORY_SETTINGS, collapse_tool_calls, trim_history
+
+
+def _tool_turn(n: int):
+    call = {"id": f"call-{n}", "name": "lookup_menu", "args": {"query": f"dish {n}"}}
+    return [
+        HumanMessage(f"question {n} " + "padding " * 50),
+        AIMessage("", tool_calls=[call]),
+        ToolMessage("result " * 100, tool_call_id=f"call-{n}"),
+        AIMessage(f"answer {n}"),
+    ]
+
+
+def test_completed_tool_calls_collapse_to_one_summary():
+    turn = _tool_turn(1)
+    collapsed = collapse_tool_calls(turn, max_chars=20)
+
+    assert len(collapsed) == 3
+    summary = collapsed[1]
+    assert isinstance(summary, AIMessage) and not summary.tool_calls
+    assert summary.content.startswith('[tool calls] lookup_menu({"query": "dish 1"}) -> result')
+    assert len(summary.content) < 100
+
+    # A call still waiting for its result is left alone.
+    pending = turn[:2]
+    assert collapse_tool_calls(pending, max_chars=20) == pending
+
+
+def test_trim_keeps_system_prompt_and_latest_turn():
+    system = SystemMessage("You are a waiter.")
+    messages = [system] + _tool_turn(1) + _tool_turn(2) + _tool_turn(3)
+    settings = {**DEFAULT_HISTORY_SETTINGS, "max_tokens": 400}
+
+    trimmed, stats = trim_history(messages, settings)
+
+    assert trimmed[0] is system
+    assert trimmed[-4:] == messages[-4:]  # latest turn untouched, tool call included
+    assert stats["turns_dropped"] >= 1
+    assert stats["tokens_after"] <= settings["max_tokens"] < stats["tokens_before"]
+    assert not any(isinstance(m, ToolMessage) for m in trimmed[1:-4])
+
+    # Under budget nothing is dropped, but older tool calls are still collapsed.
+    roomy, stats = trim_history(messages, {**settings, "max_tokens": 100000})
+    assert stats["turns_dropped"] == 0
+    assert len(roomy) == len(messages) - 2
@@ -0,0 +1,77 @@
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+from tools.common.utils.logger import JsonlWriter, encode_event
+
+
+def _read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_writer_batches_events_in_order(tmp_path):
+    writer = JsonlWriter(tmp_path / "events.jsonl", {"batch_size": 4})
+    for i in range(10):
+        writer.write({"type": "tool", "seq": i, "request": {"n": i}})
+    writer.close()
+
+    assert [e["seq"] for e in _read_lines(tmp_path / "events.jsonl")] == list(range(10))
+
+
+def test_large_payloads_are_capped_unless_sampled(tmp_path):
+    writer = JsonlWriter(tmp_path / "events.jsonl", {
+        "max_event_bytes": 200, "max_field_chars": 10, "large_payload_sample_rate": 0,
+    })
+    writer.write({"type": "agent", "message": "m" * 50, "output": {"response": "x" * 500}})
+    writer.close()
+
+    (event,) = _read_lines(tmp_path / "events.jsonl")
+    assert event["message"] == "m" * 50
+    assert event["output"]["response"].startswith("x" * 10 + "…[truncated 490")
+
+
+def test_size_rotation_keeps_backups(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = JsonlWriter(path, {"max_bytes": 100, "backup_count": 2, "batch_size": 1})
+    for i in range(6):
+        writer.write({"seq": i, "request": "r" * 40})
+        writer.flush()
+    writer.close()
+
+    assert (tmp_path / "events.jsonl.1").exists()
+    assert (tmp_path / "events.jsonl.2").exists()
+    assert not (tmp_path / "events.jsonl.3").exists()
+    assert _read_lines(path)[-1]["seq"] == 5
+
+
+def test_events_are_encoded_before_the_caller_reuses_them(tmp_path):
+    writer = JsonlWriter(tmp_path / "events.jsonl")
+    context = {"identifier": "7"}
+    writer.write({"type": "agent", "context": context})
+    context["identifier"] = "changed"
+    writer.close()
+
+    assert _read_lines(tmp_path / "events.jsonl")[0]["context"] == {"identifier": "7"}
+
+
+def test_encoding_matches_json_default_str():
+    @dataclass
+    class Cache:
+        status: str
+
+    entry = {"when": datetime(2026, 1, 2, 3, 4, 5), "cache": Cache("hit"), "counts": {1: "one"}}
+
+    assert json.loads(encode_event(entry)) == json.loads(json.dumps(entry, default=str))
+
+
+def test_writer_follows_a_file_rotated_by_another_process(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = JsonlWriter(path, {"batch_size": 1})
+    writer.write({"seq": 0})
+    writer.flush()
+    os.replace(path, tmp_path / "events.jsonl.1")  # another worker rotated the file
+    writer.write({"seq": 1})
+    writer.close()
+
+    assert [e["seq"] for e in _read_lines(path)] == [1]
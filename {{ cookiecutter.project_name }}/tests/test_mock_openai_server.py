@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+from langchain_core.tools import tool
+from langchain_openai import ChatOpenAI
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import create_app
+
+
+@tool
+def fetch_recipe(dish: str) -> str:
+    """Look up a recipe."""
+    return dish
+
+
+def _client(**settings):
+    settings = {"latency": {"distribution": "constant", "ms": 0}, "stream_interval_ms": 0, **settings}
+    return TestClient(create_app(settings))
+
+
+def test_responses_api_round_trip_through_chat_openai():
+    client = _client(tool_call_rate=1.0)
+    llm = ChatOpenAI(model="gpt-4o-mini", api_key="sk-mock", base_url="http://testserver/v1", http_client=client, use_responses_api=True)
+
+    message = llm.bind_tools([fetch_recipe]).invoke("How do I cook risotto?")
+    assert [(c["name"], c["args"]) for c in message.tool_calls] == [("fetch_recipe", {"dish": "fake"})]
+    assert message.usage_metadata["total_tokens"] > 0
+
+    chunks = list(llm.stream("hello"))
+    streamed = chunks[0]
+    for chunk in chunks[1:]:
+        streamed += chunk
+    assert len(chunks) > 3
+    assert streamed.text == '{"output": "ok", "explanation": "", "summary": ""}'
+
+
+def test_moderation_flags_and_injected_failures():
+    flagging = OpenAI(api_key="sk-mock", base_url="http://testserver/v1", http_client=_client(flag_pattern="overwhelmed"))
+    results = flagging.moderations.create(model="omni-moderation-latest", input=["I'm overwhelmed", "hello"]).results
+    assert [r.flagged for r in results] == [True, False]
+
+    failing = _client(error_rate=1.0)
+    response = failing.post("/v1/chat/completions", json={"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]})
+    assert response.status_code == 500
+    assert failing.get("/stats").json() == {"requests": 1, "errors": 1, "rate_limited": 0}
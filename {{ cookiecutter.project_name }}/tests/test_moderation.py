@@ -0,0 +1,109 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.tools import ToolException
+
+from tools.common.utils import moderation, tool_loader
+from tools.common.utils.moderation import ModerationBatcher, flagged_categories
+from tools.common.utils.tool_loader import MODERATION_GATE, ToolRegistry
+
+
+class FakeModerations:
+    def __init__(self):
+        self.calls = []
+
+    def _response(self, model, input):
+        self.calls.append(list(input))
+        return SimpleNamespace(results=[
+            SimpleNamespace(
+                flagged="bad" in text,
+                categories={"violence": "bad" in text},
+                category_scores={"violence": 0.9 if "bad" in text else 0.0},
+            )
+            for text in input
+        ])
+
+    def create(self, model, input):
+        return self._response(model, input)
+
+    async def acreate(self, model, input):
+        return self._response(model, input)
+
+
+def _fake_client(monkeypatch):
+    fake = FakeModerations()
+    async_client = SimpleNamespace(moderations=SimpleNamespace(create=fake.acreate))
+    sync_client = SimpleNamespace(moderations=SimpleNamespace(create=fake.create))
+    monkeypatch.setattr(moderation, "get_async_openai_client", lambda: async_client)
+    monkeypatch.setattr(moderation, "get_openai_client", lambda: sync_client)
+    return fake
+
+
+def test_concurrent_checks_share_one_batched_request(monkeypatch):
+    fake = _fake_client(monkeypatch)
+    batcher = ModerationBatcher({"batch_window_ms": 10})
+
+    async def run():
+        return await asyncio.gather(*(batcher.check(t) for t in ["hello", "bad news", "hello", "menu"]))
+
+    results = asyncio.run(run())
+
+    assert fake.calls == [["hello", "bad news", "menu"]]
+    assert [r["flagged"] for r in results] == [False, True, False, False]
+    assert flagged_categories(results[1]) == ["violence"]
+
+
+def test_results_are_cached_by_content(monkeypatch):
+    fake = _fake_client(monkeypatch)
+    batcher = ModerationBatcher({"batch_window_ms": 0})
+
+    assert batcher.check_sync("bad news")["flagged"] is True
+    assert asyncio.run(batcher.check("bad news"))["flagged"] is True
+    assert len(fake.calls) == 1
+
+
+def test_a_lone_sync_check_does_not_wait_for_the_batch_window(monkeypatch):
+    fake = _fake_client(monkeypatch)
+    batcher = ModerationBatcher({"batch_window_ms": 500})
+
+    start = time.perf_counter()
+    assert batcher.check_sync("menu")["flagged"] is False
+    assert time.perf_counter() - start < 0.25
+    assert fake.calls == [["menu"]]
+
+
+def test_errors_fail_open_and_are_not_cached(monkeypatch):
+    def broken():
+        raise RuntimeError("moderation unavailable")
+
+    monkeypatch.setattr(moderation, "get_openai_client", broken)
+    batcher = ModerationBatcher({"batch_window_ms": 0})
+
+    failed_open = batcher.check_sync("bad news")
+    assert failed_open["flagged"] is False
+    failed_open["flagged"] = True  # results are the caller's own, not a shared default
+    assert batcher.check_sync("bad news")["flagged"] is False
+    fake = _fake_client(monkeypatch)
+    assert batcher.check_sync("bad news")["flagged"] is True
+    assert len(fake.calls) == 1
+
+
+def test_tools_wait_for_the_moderation_verdict(monkeypatch):
+    sent = []
+    monkeypatch.setattr(tool_loader, "import_from_path", lambda path: lambda **kwargs: sent.append(kwargs) or "sent")
+    tool = ToolRegistry().get_tool({"name": "send_email", "function_path": "tools.email.send_email", "input_schema": {"to": "string"}})
+
+    async def run(flagged: bool):
+        verdict = asyncio.get_running_loop().create_future()
+        call = asyncio.ensure_future(tool.ainvoke({"to": "guest@example.com"}, config={"configurable": {MODERATION_GATE: verdict}}))
+        await asyncio.sleep(0.01)
+        assert sent == []
+        verdict.set_result({"flagged": flagged})
+        return await call
+
+    with pytest.raises(ToolException):
+        asyncio.run(run(flagged=True))
+    assert asyncio.run(run(flagged=False)) == "sent"
+    assert sent == [{"to": "guest@example.com"}]
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import httpx
+
+from tools.common.utils.rate_limiter import RateLimitedTransport, RateLimiter
+
+
+def test_rpm_and_tpm_buckets_are_debited_together():
+    limiter = RateLimiter({"models": {"default": {"rpm": 2, "tpm": 100}}})
+
+    assert limiter.try_acquire("gpt-4o-mini", 60) == 0
+    assert limiter.try_acquire("gpt-4o-mini", 60) > 0  # tpm exhausted, rpm left untouched
+    assert limiter.try_acquire("gpt-4o-mini", 10) == 0
+    assert limiter.try_acquire("gpt-4o-mini", 10) > 0  # rpm exhausted
+
+
+def test_file_mode_shares_one_budget_between_limiters(tmp_path):
+    settings = {"models": {"default": {"rpm": 1}}, "shared": "file", "state_file": str(tmp_path / "limits.json")}
+    worker_a, worker_b = RateLimiter(settings), RateLimiter(settings)
+
+    assert worker_a.try_acquire("gpt-4o", 1) == 0
+    assert worker_b.try_acquire("gpt-4o", 1) > 0
+
+
+def test_file_mode_keeps_locks_off_the_event_loop(tmp_path):
+    limiter = RateLimiter({"models": {"default": {"rpm": 10}}, "shared": "file", "state_file": str(tmp_path / "limits.json")})
+    transaction, threads = limiter._state.transaction, []
+
+    def recording_transaction():
+        threads.append(threading.get_ident())
+        return transaction()
+
+    limiter._state.transaction = recording_transaction
+
+    async def main():
+        await limiter.aacquire("gpt-4o", 1)
+        await limiter.apause("gpt-4o", 0)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_429_is_retried_after_retry_after():
+    calls = []
+
+    def upstream(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "20"})
+        return httpx.Response(200, json={"ok": True})
+
+    limiter = RateLimiter({"backoff_base_seconds": 0.01})
+    client = httpx.Client(transport=RateLimitedTransport(httpx.MockTransport(upstream), limiter))
+    response = client.post("https://api.openai.com/v1/responses", json={"model": "gpt-4o", "input": "hi"})
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert 0.02 <= limiter.backoff(0, httpx.Response(429, headers={"retry-after": "0.02"})) <= 0.03
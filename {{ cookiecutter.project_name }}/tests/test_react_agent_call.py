@@ -1,12 +1,40 @@
-from agents.core.langgraph.agent_dispatcher import agent_dispatch
-import logging
-logging.basicConfig(level=logging.DEBUG)
+import asyncio
 
-response = agent_dispatch(
-    agent_name="{{ cookiecutter.agent_one_name }}",
-    message="give me some resources for my interview preparation",
-    identifier=2
- )
+import pytest
 
-print("\n✅ Final Output:\n", response)
+from agents.core.langgraph.agent_dispatcher import agent_dispatch, agent_dispatch_async, agent_dispatch_stream
 
+
+def test_react_agent_runs_scripted_tool_calls(fake_llm):
+    response = agent_dispatch(
+        agent_name="{{ cookiecutter.agent_one_name }}",
+        message="Add two burgers to my order",
+        context={"identifier": "2"},
+    )
+
+    assert "error" not in response
+    called = [c["name"] for m in response["messages"] for c in getattr(m, "tool_calls", [])]
+    assert called == ["{{ cookiecutter.agent_one_tool_one }}", "{{ cookiecutter.agent_one_tool_two }}"]
+    assert response["messages"][-1].usage_metadata["total_tokens"] > 0
+
+
+def test_conversation_continues_for_the_same_identifier(fake_llm):
+    agent_dispatch("{{ cookiecutter.agent_one_name }}", "hello", {"identifier": "3"})
+    response = agent_dispatch("{{ cookiecutter.agent_one_name }}", "are you there?", {"identifier": "3"})
+
+    assert [m.content for m in response["messages"] if m.type == "human"] == ["hello", "are you there?"]
+
+
+@pytest.mark.parametrize("fake_llm", [{"flag_pattern": "overwhelmed"}], indirect=True)
+def test_flagged_messages_are_not_saved_to_the_conversation(fake_llm):
+    async def main():
+        flagged = await agent_dispatch_async("{{ cookiecutter.agent_one_name }}", "I'm overwhelmed", {"identifier": "4"})
+        streamed = [e async for e in agent_dispatch_stream("{{ cookiecutter.agent_one_name }}", "still overwhelmed", {"identifier": "4"})]
+        follow_up = await agent_dispatch_async("{{ cookiecutter.agent_one_name }}", "are you there?", {"identifier": "4"})
+        return flagged, streamed, follow_up
+
+    flagged, streamed, follow_up = asyncio.run(main())
+
+    assert flagged["error"] == "Message flagged by moderation"
+    assert streamed[-1]["event"] == "error"
+    assert [m.content for m in follow_up["messages"] if m.type == "human"] == ["are you there?"]
@@ -0,0 +1,54 @@
+from tools.common.utils.config import ConfigSnapshot, get_config, thaw
+from tools.common.utils.mcp import SEND_EMAIL_TOOL
+from tools.common.utils.response_cache import ResponseCache, cache_policy
+
+
+def test_lru_evicts_oldest_and_expires_entries():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == (True, {"v": 1})
+    cache.set("c", {"v": 3})  # evicts "b", the least recently used
+
+    assert cache.get("b") == (False, None)
+    cache.set("d", {"v": 4}, ttl_seconds=-1)
+    assert cache.get("d") == (False, None)
+    assert cache.stats()["hits"] == 1
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(sqlite_path=path).set("k", {"output": "cached"}, persist=True)
+
+    restarted = ResponseCache(sqlite_path=path)
+    assert restarted.get("k") == (False, None)
+    assert restarted.get("k", persist=True) == (True, {"output": "cached"})
+
+
+def test_side_effecting_tools_are_never_cached():
+    snapshot = ConfigSnapshot({
+        "tools": {"tools": [
+            {"name": "send_email", "function_path": "tools.x.send_email", "side_effects": True},
+            {"name": "recommend", "function_path": "tools.x.recommend"},
+        ]},
+        "openai": {
+            "send_email": {"cache": {"enabled": True}},
+            "recommend": {"cache": {"enabled": True, "ttl_seconds": 60}},
+            "search": {"input_template": "{{ query }}"},
+        },
+    }, "test")
+
+    assert cache_policy("send_email", snapshot) is None
+    assert cache_policy("search", snapshot) is None
+    assert cache_policy("recommend", snapshot)["ttl_seconds"] == 60
+
+
+def test_shipped_email_tool_is_never_cached():
+    shipped = get_config()
+    assert shipped.prompt(SEND_EMAIL_TOOL)  # the name send_email runs its prompt under
+    snapshot = ConfigSnapshot({
+        "tools": {"tools": thaw(shipped.tools)},
+        "openai": {**thaw(shipped.prompts), SEND_EMAIL_TOOL: {**thaw(shipped.prompt(SEND_EMAIL_TOOL)), "cache": {"enabled": True}}},
+    }, "test")
+
+    assert cache_policy(SEND_EMAIL_TOOL, snapshot) is None
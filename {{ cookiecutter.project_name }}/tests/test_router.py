@@ -0,0 +1,43 @@
+from agents.core.langgraph.router import IntentRouter
+from tools.common.utils.config import ConfigSnapshot
+
+
+def _snapshot(**router):
+    return ConfigSnapshot({
+        "graph": {"router": router},
+        "nodes": {"nodes": [
+            {"id": "supervisor", "type": "supervisor", "agents": ["orders", "kitchen"]},
+            {"id": "orders", "type": "react_agent", "routing": {
+                "keywords": ["order", "add", "cancel"],
+                "patterns": [r"\b(add|cancel)\b.*\border\b"],
+            }},
+            {"id": "kitchen", "type": "react_agent", "routing": {"keywords": ["recipe", "cook", "ingredients"]}},
+        ]},
+    }, "test")
+
+
+def test_confident_requests_skip_the_supervisor():
+    router, snapshot = IntentRouter(), _snapshot()
+
+    assert router.route("supervisor", "Add two burgers to my order", snapshot).agent == "orders"
+    assert router.route("supervisor", "Which ingredients do I need to cook this recipe?", snapshot).agent == "kitchen"
+
+    # Too little evidence, or evidence for both agents, falls back to the supervisor.
+    vague = router.route("supervisor", "What is in this recipe?", snapshot)
+    assert vague.target is None and vague.agent == "supervisor" and vague.confidence == 0.4
+    mixed = router.route("supervisor", "Cancel my order and send the recipe with its ingredients", snapshot)
+    assert mixed.target is None
+
+    # React agents are never routed.
+    assert router.route("orders", "Add to order", snapshot) is None
+    assert router.stats() == {"requests": 4, "routed": 2, "hit_rate": 0.5}
+
+
+def test_classifier_can_raise_confidence():
+    router, snapshot = IntentRouter(), _snapshot(classifier="local.intent.classify")
+    router._classifiers["local.intent.classify"] = lambda message, candidates: {"kitchen": 0.95, "unknown": 1.0}
+
+    decision = router.route("supervisor", "Is the soup vegan?", snapshot)
+
+    assert (decision.agent, decision.source, decision.confidence) == ("kitchen", "classifier", 0.95)
+    assert router.route("supervisor", "anything", _snapshot(enabled=False)) is None
@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from agents.core.langgraph.output import agent_output_model, agent_response, agent_response_json
+from agents.core.langgraph.streaming import PartialJSON, to_stream_event
+
+
+def test_partial_json_yields_fields_as_they_complete():
+    parser = PartialJSON()
+    chunks = ['{"out', 'put": "two bur', 'gers", "items": [1', ', 2], "note": "say \\"hi', '\\""}']
+
+    assert [parser.feed(chunk) for chunk in chunks] == [
+        None,
+        None,
+        {"output": "two burgers"},
+        {"output": "two burgers", "items": [1, 2]},
+        {"output": "two burgers", "items": [1, 2], "note": 'say "hi"'},
+    ]
+
+    class Chunk:
+        content = '{"output": "ok"}'
+
+    event = {"event": "on_chat_model_stream", "run_id": "r1", "data": {"chunk": Chunk()},
+             "metadata": {"langgraph_node": "generate_structured_response"}}
+    assert to_stream_event(event, "{{ cookiecutter.agent_two_name }}", partials={}) == {
+        "event": "partial", "data": {"agent": "{{ cookiecutter.agent_two_name }}", "output": {"output": "ok"}},
+    }
+
+
+def test_structured_response_is_validated_against_the_agent_model():
+    model = agent_output_model("{{ cookiecutter.agent_two_name }}")
+    state = {"structured_response": {"output": "Done", "summary": "s", "explanation": "e"}}
+
+    assert model.model_validate_json(agent_response_json(state, "{{ cookiecutter.agent_two_name }}")).output == "Done"
+    assert agent_response(state, "{{ cookiecutter.agent_two_name }}") == state["structured_response"]
+    with pytest.raises(ValueError):
+        agent_response_json({"structured_response": {"output": "Done"}}, "{{ cookiecutter.agent_two_name }}")
+    with pytest.raises(ValueError):
+        agent_response({"messages": []}, "{{ cookiecutter.agent_two_name }}")
+
+
+def test_api_returns_the_structured_response(fake_llm):
+    from web.main import app
+
+    response = TestClient(app).post("/api/agent", json={
+        "agent_name": "{{ cookiecutter.agent_two_name }}", "message": "How do I cook the recipe?", "identifier": "9",
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"output": "fake", "summary": "fake", "explanation": "fake"}
@@ -1,6 +1,24 @@
-from agents.core.langgraph.supervisor_agent_builder import create_configured_supervisor
+import pytest
+from langchain_core.messages import HumanMessage
 
-agent = create_configured_supervisor("{{ cookiecutter.supervisor_name }}")
-result = agent.invoke({"message": "I'm overwhelmed", "identifier": "2"})
+from agents.core.langgraph.agent_dispatcher import agent_dispatch
+from agents.core.langgraph.supervisor_agent_builder import create_supervisor_agent
 
-print(result)
+
+def test_supervisor_hands_off_to_the_scripted_agent(fake_llm):
+    agent = create_supervisor_agent("{{ cookiecutter.supervisor_name }}")
+    result = agent.invoke({"messages": [HumanMessage("How do I cook the recipe?")]}, config={"configurable": {"identifier": "2"}})
+
+    # Only the sub-agent's final answer is kept in the supervisor's history.
+    assert [m.name for m in result["messages"] if m.type == "tool"] == [
+        "transfer_to_{{ cookiecutter.agent_two_name }}",
+        "transfer_back_to_{{ cookiecutter.supervisor_name }}",
+    ]
+    assert "{{ cookiecutter.agent_two_name }}" in [m.name for m in result["messages"] if m.type == "ai"]
+
+
+@pytest.mark.parametrize("fake_llm", [{"flag_pattern": "overwhelmed"}], indirect=True)
+def test_flagged_messages_never_reach_the_agents(fake_llm):
+    response = agent_dispatch("{{ cookiecutter.supervisor_name }}", "I'm overwhelmed", {"identifier": "2"})
+
+    assert response == {"error": "Message flagged by moderation", "categories": ["harassment"]}
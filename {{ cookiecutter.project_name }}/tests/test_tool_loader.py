@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from tools.common.utils import tool_loader
+from tools.common.utils.tool_loader import ToolRegistry
+
+
+def test_async_tool_functions_are_awaited_in_async_runs(monkeypatch):
+    async def send_email(subject):
+        await asyncio.sleep(0)
+        return f"sent {subject}"
+
+    monkeypatch.setattr(tool_loader, "import_from_path", lambda path: send_email)
+    tool = ToolRegistry().get_tool({"name": "send_email", "function_path": "tools.email.send_email", "input_schema": {"subject": "string"}})
+
+    assert asyncio.run(tool.ainvoke({"subject": "order"})) == "sent order"
+
+
+def test_registry_tools_record_latency_and_failures(monkeypatch):
+    def lookup(order_id):
+        if order_id == "missing":
+            raise KeyError(order_id)
+        return {"order_id": order_id}
+
+    def sample(metric, status=None):
+        labels = {"tool": "lookup_order", "kind": "function", **({"status": status} if status else {})}
+        return REGISTRY.get_sample_value(metric, labels) or 0
+
+    monkeypatch.setattr(tool_loader, "import_from_path", lambda path: lookup)
+    tool = ToolRegistry().get_tool({"name": "lookup_order", "function_path": "tools.orders.lookup", "input_schema": {"order_id": "string"}})
+    calls, failures = sample("tool_call_duration_seconds_count", "ok"), sample("tool_failures_total")
+
+    assert tool.invoke({"order_id": "7"}) == {"order_id": "7"}
+    with pytest.raises(KeyError):
+        tool.invoke({"order_id": "missing"})
+
+    assert sample("tool_call_duration_seconds_count", "ok") == calls + 1
+    assert sample("tool_failures_total") == failures + 1
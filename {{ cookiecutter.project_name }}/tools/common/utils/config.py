@@ -1,7 +1,22 @@
 # tools/common/utils/config.py
 
+import hashlib
 import json
+import logging
 import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("config_registry")
+
+DEFAULT_CONFIG_PATHS = {
+    "nodes": "config/nodes.json",
+    "tools": "config/tools.json",
+    "openai": "config/openai_config.json",
+    "graph": "config/graph_config.json",
+}
+DEFAULT_RELOAD_INTERVAL_SECONDS = 2.0
 
 def load_json_config(path: str) -> dict:
     """Load a JSON configuration file from the given path."""
@@ -11,3 +26,182 @@ def load_json_config(path: str) -> dict:
     except Exception as e:
         print(f"Warning: Failed to load config {path}: {e}")
         return {}
+
+
+class FrozenDict(dict):
+    """A dict that refuses mutation; still JSON-serialisable and a drop-in for read access."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Config snapshots are read-only; copy the value before modifying it")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to FrozenDict and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+def thaw(value: Any) -> Any:
+    """Return a mutable deep copy of a frozen config value."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class ConfigSnapshot:
+    """
+    Immutable, pre-indexed view of the JSON configs at one version.
+
+    Indexes:
+        node_by_id        -- nodes.json entries by id
+        tool_by_name      -- tools.json entries by name (last definition wins, as before)
+        tool_by_function  -- tools.json entries by full function path and by bare function name
+        prompt_by_name    -- openai_config.json entries by agent/tool name
+        agent_types       -- id -> type for dispatchable nodes (react_agent, supervisor)
+    """
+
+    __slots__ = (
+        "version", "nodes", "tools", "prompts", "graph",
+        "node_by_id", "tool_by_name", "tool_by_function", "prompt_by_name", "agent_types",
+    )
+
+    def __init__(self, raw: Dict[str, dict], version: str):
+        set_ = object.__setattr__
+        set_(self, "version", version)
+        set_(self, "nodes", freeze(raw.get("nodes", {}).get("nodes", [])))
+        set_(self, "tools", freeze(raw.get("tools", {}).get("tools", [])))
+        set_(self, "prompts", freeze(raw.get("openai", {})))
+        set_(self, "graph", freeze(raw.get("graph", {})))
+
+        set_(self, "node_by_id", FrozenDict((n["id"], n) for n in self.nodes if "id" in n))
+
+        tool_by_name = {}
+        tool_by_function = {}
+        for tool in self.tools:
+            if tool.get("name"):
+                tool_by_name[tool["name"]] = tool
+            function_path = tool.get("function_path") or tool.get("function")
+            if function_path:
+                tool_by_function.setdefault(function_path, tool)
+                tool_by_function.setdefault(function_path.rsplit(".", 1)[-1], tool)
+        set_(self, "tool_by_name", FrozenDict(tool_by_name))
+        set_(self, "tool_by_function", FrozenDict(tool_by_function))
+
+        set_(self, "prompt_by_name", FrozenDict(
+            (name, cfg) for name, cfg in self.prompts.items() if isinstance(cfg, dict)
+        ))
+        set_(self, "agent_types", FrozenDict(
+            (n["id"], n["type"]) for n in self.nodes
+            if n.get("type") in {"react_agent", "supervisor"}
+        ))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def node(self, node_id: str) -> Optional[dict]:
+        return self.node_by_id.get(node_id)
+
+    def tool(self, name: str) -> Optional[dict]:
+        return self.tool_by_name.get(name)
+
+    def prompt(self, name: str) -> Optional[dict]:
+        return self.prompt_by_name.get(name)
+
+
+class ConfigRegistry:
+    """
+    Holds the current ConfigSnapshot and swaps it atomically when a config file changes.
+
+    File mtimes are checked at most once per ``config_reload_interval_seconds`` (from
+    graph_config.json), so the hot path is a single attribute read. A file that fails to
+    parse keeps the previous snapshot in place.
+    """
+
+    def __init__(self, paths: Dict[str, str] = None):
+        self.paths = dict(paths or DEFAULT_CONFIG_PATHS)
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        signature = []
+        for key, path in sorted(self.paths.items()):
+            try:
+                stat = os.stat(path)
+                signature.append((key, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((key, None, None))
+        return tuple(signature)
+
+    def _load(self) -> ConfigSnapshot:
+        raw = {}
+        digest = hashlib.sha256()
+        for key, path in sorted(self.paths.items()):
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                raw[key] = {}
+                continue
+            raw[key] = json.loads(data)
+            digest.update(key.encode("utf-8") + b"\0" + data + b"\0")
+        return ConfigSnapshot(raw, digest.hexdigest()[:12])
+
+    def _reload_interval(self) -> float:
+        if self._snapshot is None:
+            return DEFAULT_RELOAD_INTERVAL_SECONDS
+        return float(self._snapshot.graph.get("config_reload_interval_seconds", DEFAULT_RELOAD_INTERVAL_SECONDS))
+
+    def current(self) -> ConfigSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+        return self.refresh()
+
+    def refresh(self, force: bool = False) -> ConfigSnapshot:
+        with self._lock:
+            signature = self._file_signature()
+            if force or self._snapshot is None or signature != self._signature:
+                try:
+                    snapshot = self._load()
+                    if self._snapshot is not None and snapshot.version != self._snapshot.version:
+                        logger.info(f"[config] Reloaded configuration {self._snapshot.version} -> {snapshot.version}")
+                    self._snapshot = snapshot
+                    self._signature = signature
+                except Exception as e:
+                    if self._snapshot is None:
+                        logger.error(f"[config] Failed to load configuration: {e}")
+                        self._snapshot = ConfigSnapshot({}, "invalid")
+                    else:
+                        logger.error(f"[config] Keeping configuration {self._snapshot.version}; reload failed: {e}")
+                    self._signature = signature
+            self._next_check = time.monotonic() + self._reload_interval()
+            return self._snapshot
+
+
+default_registry = ConfigRegistry()
+
+_env_loaded = False
+
+def load_env() -> None:
+    """Load ``.env`` into the environment once, on first use rather than at import."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def get_config() -> ConfigSnapshot:
+    """Return the current process-wide config snapshot (reloaded when files change)."""
+    return default_registry.current()
@@ -0,0 +1,268 @@
+# tools/common/utils/fake_llm.py
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+DEFAULT_FAKE_SETTINGS = {
+    "seed": 0,
+    # {"distribution": "constant", "ms": 0} | "uniform" (min_ms, max_ms) | "normal" (mean_ms, stddev_ms)
+    # | "lognormal" (median_ms, sigma)
+    "latency": {"distribution": "constant", "ms": 0},
+    "chars_per_token": 4,
+    # Streamed responses are split into chunks of this many characters.
+    "stream_chunk_chars": 16,
+    # Text of the final answer when no script rule sets one.
+    "response": "{\"output\": \"ok\", \"explanation\": \"\", \"summary\": \"\"}",
+    # Rules matched (regex, case-insensitive) against the latest user message, first match wins:
+    # {"match": "recipe", "tool_calls": [{"name": "fetch_recipe", "args": {...}}], "response": "...",
+    #  "structured": {...}}. Tool calls are only made with tools bound to the model, once per turn.
+    "script": [],
+    # Moderation: messages matching this regex are flagged (category "harassment").
+    "flag_pattern": None,
+}
+
+_PLACEHOLDERS = {"string": "fake", "integer": 0, "number": 0, "boolean": False, "array": [], "object": {}}
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content or [])
+
+
+def placeholder(schema: dict) -> Any:
+    """A value that validates against a JSON schema: every property filled with a typed placeholder."""
+    if not isinstance(schema, dict):
+        return None
+    if "properties" in schema:
+        return {name: placeholder(prop) for name, prop in schema["properties"].items()}
+    for key in ("anyOf", "oneOf", "allOf"):
+        if schema.get(key):
+            return placeholder(schema[key][0])
+    if "enum" in schema:
+        return schema["enum"][0]
+    schema_type = schema.get("type", "string")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "string")
+    return _PLACEHOLDERS.get(schema_type)
+
+
+def _tool_spec(tool: Any) -> Tuple[str, dict]:
+    """(name, parameters schema) for a bound tool; provider-native tools get an empty schema."""
+    if isinstance(tool, dict) and tool.get("type") not in (None, "function"):
+        return tool.get("name") or tool["type"], {}
+    spec = convert_to_openai_tool(tool)["function"]
+    return spec["name"], spec.get("parameters") or {}
+
+
+def sample_latency(latency: dict, rng: random.Random) -> float:
+    """Seconds drawn from a latency distribution setting."""
+    distribution = latency.get("distribution", "constant")
+    if distribution == "uniform":
+        ms = rng.uniform(latency.get("min_ms", 0), latency.get("max_ms", 0))
+    elif distribution == "normal":
+        ms = rng.gauss(latency.get("mean_ms", 0), latency.get("stddev_ms", 0))
+    elif distribution == "lognormal":
+        ms = rng.lognormvariate(0, latency.get("sigma", 0.5)) * latency.get("median_ms", 0)
+    else:
+        ms = latency.get("ms", 0)
+    return max(0.0, ms) / 1000
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for ChatOpenAI, selected with graph_config.json
+    ``"llm_backend": {"provider": "fake"}`` (or ``LLM_BACKEND=fake``).
+
+    Answers follow the ``script`` rules in the ``fake`` settings: a rule whose ``match``
+    hits the latest user message makes the listed tool calls (those bound to this model,
+    with placeholder arguments unless the rule gives them) and, once their results are in,
+    answers with the rule's ``response``. Latency is sampled from the configured
+    distribution with a seed derived from the prompt, so the same prompt always takes the
+    same time, and responses carry approximate token usage for the LLM metrics.
+    """
+
+    model_name: str = "fake"
+    settings: dict = {}
+    bound_tools: List[Tuple[str, dict]] = []
+    tool_choice: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _settings(self) -> dict:
+        return {**DEFAULT_FAKE_SETTINGS, **self.settings}
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs) -> "FakeChatModel":
+        return self.model_copy(update={"bound_tools": [_tool_spec(t) for t in tools], "tool_choice": tool_choice})
+
+    def with_structured_output(self, schema, **kwargs):
+        json_schema = schema if isinstance(schema, dict) else schema.model_json_schema()
+
+        def respond(messages):
+            rule = self._rule(self._latest_user_text(messages)) or {}
+            value = {**placeholder(json_schema), **rule.get("structured", {})}
+            return value if isinstance(schema, dict) else schema.model_validate(value)
+
+        return RunnableLambda(respond, name="FakeStructuredOutput")
+
+    # -- scripted responses ---------------------------------------------------------
+
+    @staticmethod
+    def _latest_user_text(messages) -> str:
+        if hasattr(messages, "to_messages"):
+            messages = messages.to_messages()
+        if isinstance(messages, dict):
+            messages = messages.get("messages", [])
+        for message in reversed(list(messages)):
+            if isinstance(message, HumanMessage):
+                return _text(message)
+            if isinstance(message, dict) and message.get("role") == "user":
+                return str(message.get("content", ""))
+        return ""
+
+    def _rule(self, text: str) -> Optional[dict]:
+        for rule in self._settings["script"]:
+            if re.search(rule.get("match", ""), text, re.IGNORECASE):
+                return rule
+        return None
+
+    def _respond(self, messages: List[BaseMessage]) -> Tuple[AIMessage, float]:
+        settings = self._settings
+        digest = hashlib.sha256(
+            json.dumps([(m.type, _text(m)) for m in messages], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        rng = random.Random(f"{settings['seed']}:{digest}")
+
+        turn_start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+        called = {m.name for m in messages[turn_start + 1:] if isinstance(m, ToolMessage)}
+        rule = self._rule(self._latest_user_text(messages)) or {}
+        bound = dict(self.bound_tools)
+
+        tool_calls = []
+        for i, call in enumerate(rule.get("tool_calls", [])):
+            name = call["name"]
+            if name in bound and name not in called:
+                args = call.get("args")
+                if args is None:
+                    args = placeholder(bound[name]) or {}
+                tool_calls.append({"id": f"call_{digest[:12]}_{i}", "name": name, "args": args, "type": "tool_call"})
+
+        content = "" if tool_calls else rule.get("response", settings["response"])
+        chars_per_token = settings["chars_per_token"]
+        input_tokens = count_tokens_approximately(messages, chars_per_token=chars_per_token)
+        output_tokens = max(1, int((len(content) + len(json.dumps([c["args"] for c in tool_calls]))) / chars_per_token))
+        message = AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens},
+            response_metadata={"model_name": self.model_name},
+        )
+        return message, sample_latency(settings["latency"], rng)
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        size = self._settings["stream_chunk_chars"]
+        text = message.content
+        for start in range(0, len(text), size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text[start:start + size]))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"id": c["id"], "name": c["name"], "args": json.dumps(c["args"]), "index": i, "type": "tool_call_chunk"}
+                for i, c in enumerate(message.tool_calls)
+            ],
+            usage_metadata=message.usage_metadata,
+            response_metadata=message.response_metadata,
+        ))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, latency = self._respond(messages)
+        time.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, latency = self._respond(messages)
+        await asyncio.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        message, latency = self._respond(messages)
+        time.sleep(latency)
+        for chunk in self._chunks(message):
+            if run_manager and chunk.message.content:
+                run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        message, latency = self._respond(messages)
+        await asyncio.sleep(latency)
+        for chunk in self._chunks(message):
+            if run_manager and chunk.message.content:
+                await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+
+# -- OpenAI SDK surface used outside LangChain (moderation, warmup) -------------------
+
+class _FakeModerations:
+    def __init__(self, settings: dict):
+        pattern = {**DEFAULT_FAKE_SETTINGS, **settings}["flag_pattern"]
+        self._flag = re.compile(pattern, re.IGNORECASE) if pattern else None
+
+    def _result(self, text: str):
+        flagged = bool(self._flag and self._flag.search(text))
+        return SimpleNamespace(
+            flagged=flagged,
+            categories={"harassment": flagged},
+            category_scores={"harassment": 1.0 if flagged else 0.0},
+        )
+
+    def create(self, model: str, input):
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(model=model, results=[self._result(text) for text in texts])
+
+
+class _AsyncFakeModerations(_FakeModerations):
+    async def create(self, model: str, input):
+        return super().create(model, input)
+
+
+class _FakeModels:
+    def list(self):
+        return SimpleNamespace(data=[])
+
+
+class _AsyncFakeModels:
+    async def list(self):
+        return SimpleNamespace(data=[])
+
+
+class FakeOpenAIClient:
+    """The parts of ``openai.OpenAI`` this project calls directly, answered locally."""
+
+    def __init__(self, settings: Optional[dict] = None):
+        self.moderations = _FakeModerations(settings or {})
+        self.models = _FakeModels()
+
+
+class AsyncFakeOpenAIClient:
+    """Async counterpart of FakeOpenAIClient."""
+
+    def __init__(self, settings: Optional[dict] = None):
+        self.moderations = _AsyncFakeModerations(settings or {})
+        self.models = _AsyncFakeModels()
@@ -0,0 +1,250 @@
+# tools/common/utils/llm_clients.py
+
+import importlib.util
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+import httpx
+from tools.common.utils.config import get_config, load_env, thaw
+from tools.common.utils.metrics import LLMMetricsCallbackHandler
+from tools.common.utils.rate_limiter import AsyncRateLimitedTransport, RateLimitedTransport, get_rate_limiter
+from tools.common.utils.schema_cache import schema_hash
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger("llm_clients")
+
+DEFAULT_POOL_SETTINGS = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry_seconds": 30,
+    "http2": True,
+    "connect_timeout_seconds": 5,
+    "read_timeout_seconds": 60,
+    "write_timeout_seconds": 30,
+    "pool_timeout_seconds": 10,
+    "max_retries": 2,
+    "stats_log_interval_seconds": 60,
+}
+
+DEFAULT_BACKEND_SETTINGS = {
+    # "openai" or "fake" (tools.common.utils.fake_llm); the LLM_BACKEND env var overrides it.
+    "provider": "openai",
+    "fake": {},
+}
+
+
+class LLMClientPool:
+    """
+    Process-wide pool of OpenAI / ChatOpenAI clients sharing one keep-alive HTTP pool.
+
+    Chat models are created once per (model, temperature, bound tools, options) and reused,
+    so repeated calls skip both client construction and TLS handshakes. All clients go
+    through the same httpx.Client / httpx.AsyncClient, configured from the ``llm_pool``
+    section of graph_config.json (limits, timeouts, HTTP/2 when the ``h2`` package is
+    installed). Hit/miss and request counts are logged every ``stats_log_interval_seconds``.
+
+    When rate limiting is enabled (graph_config.json "rate_limits"), both transports go
+    through the shared RPM/TPM limiter, which also owns retries; the SDK's own retries are
+    then turned off so a request is never retried twice over.
+
+    With the ``fake`` backend (graph_config.json "llm_backend") every client is a local,
+    deterministic stand-in and no request leaves the process.
+    """
+
+    def __init__(self, settings: Optional[dict] = None, backend: Optional[dict] = None):
+        self.settings = {**DEFAULT_POOL_SETTINGS, **(settings or {})}
+        self.backend = {**DEFAULT_BACKEND_SETTINGS, **(backend or {})}
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self._openai_client: Optional["OpenAI"] = None
+        self._async_openai_client: Optional["AsyncOpenAI"] = None
+        self._models: Dict[Tuple, Any] = {}
+        # Re-entrant: building a chat model also initialises the shared HTTP clients.
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "requests": 0}
+        self._next_stats_log = time.monotonic() + self.settings["stats_log_interval_seconds"]
+
+    # -- HTTP layer -----------------------------------------------------------------
+
+    def _transport_options(self) -> dict:
+        s = self.settings
+        http2 = bool(s["http2"]) and importlib.util.find_spec("h2") is not None
+        return {
+            "limits": httpx.Limits(
+                max_connections=s["max_connections"],
+                max_keepalive_connections=s["max_keepalive_connections"],
+                keepalive_expiry=s["keepalive_expiry_seconds"],
+            ),
+            "http2": http2,
+        }
+
+    def _rate_limited(self) -> bool:
+        return bool(get_rate_limiter().settings["enabled"])
+
+    def max_retries(self) -> int:
+        """SDK-level retries; zero when the rate-limited transport retries instead."""
+        return 0 if self._rate_limited() else self.settings["max_retries"]
+
+    def timeout(self) -> httpx.Timeout:
+        s = self.settings
+        return httpx.Timeout(
+            connect=s["connect_timeout_seconds"],
+            read=s["read_timeout_seconds"],
+            write=s["write_timeout_seconds"],
+            pool=s["pool_timeout_seconds"],
+        )
+
+    def _count_request(self, request: httpx.Request) -> None:
+        self._stats["requests"] += 1
+
+    async def _acount_request(self, request: httpx.Request) -> None:
+        self._stats["requests"] += 1
+
+    def http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    options = self._transport_options()
+                    transport = httpx.HTTPTransport(**options)
+                    if self._rate_limited():
+                        transport = RateLimitedTransport(transport, get_rate_limiter())
+                    self._http_client = httpx.Client(transport=transport, timeout=self.timeout(), event_hooks={"request": [self._count_request]})
+                    logger.info(f"🔌 [llm_pool] Shared HTTP client ready (http2={options['http2']}, max_connections={self.settings['max_connections']}, rate_limited={self._rate_limited()})")
+        return self._http_client
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        if self._async_http_client is None:
+            with self._lock:
+                if self._async_http_client is None:
+                    transport = httpx.AsyncHTTPTransport(**self._transport_options())
+                    if self._rate_limited():
+                        transport = AsyncRateLimitedTransport(transport, get_rate_limiter())
+                    self._async_http_client = httpx.AsyncClient(transport=transport, timeout=self.timeout(), event_hooks={"request": [self._acount_request]})
+        return self._async_http_client
+
+    # -- Clients --------------------------------------------------------------------
+
+    @property
+    def fake(self) -> bool:
+        return self.backend["provider"] == "fake"
+
+    # openai / langchain_openai are imported on first use: together they cost most of a
+    # second at import, which CLI tools and tests that never call a model should not pay.
+
+    def openai_client(self) -> "OpenAI":
+        if self._openai_client is None:
+            with self._lock:
+                if self._openai_client is None and self.fake:
+                    from tools.common.utils.fake_llm import FakeOpenAIClient
+                    self._openai_client = FakeOpenAIClient(self.backend["fake"])
+                elif self._openai_client is None:
+                    from openai import OpenAI
+                    self._openai_client = OpenAI(http_client=self.http_client(), max_retries=self.max_retries())
+        return self._openai_client
+
+    def async_openai_client(self) -> "AsyncOpenAI":
+        if self._async_openai_client is None:
+            with self._lock:
+                if self._async_openai_client is None and self.fake:
+                    from tools.common.utils.fake_llm import AsyncFakeOpenAIClient
+                    self._async_openai_client = AsyncFakeOpenAIClient(self.backend["fake"])
+                elif self._async_openai_client is None:
+                    from openai import AsyncOpenAI
+                    self._async_openai_client = AsyncOpenAI(http_client=self.async_http_client(), max_retries=self.max_retries())
+        return self._async_openai_client
+
+    def _new_chat_model(self, model: str, temperature: float, **kwargs):
+        if self.fake:
+            from tools.common.utils.fake_llm import FakeChatModel
+            return FakeChatModel(model_name=model, settings=self.backend["fake"], callbacks=[LLMMetricsCallbackHandler(model)])
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            use_responses_api=True,
+            http_client=self.http_client(),
+            http_async_client=self.async_http_client(),
+            timeout=self.timeout(),
+            max_retries=self.max_retries(),
+            callbacks=[LLMMetricsCallbackHandler(model)],
+            **kwargs,
+        )
+
+    def chat_model(self, model: str, temperature: float = 0.3, tools: Optional[list] = None, **kwargs):
+        """
+        Return a shared ChatOpenAI (Responses API) for these settings, with ``tools`` bound
+        when given. The returned runnable is immutable and safe to use concurrently.
+        """
+        tools = thaw(tools) if tools else None
+        key = (model, temperature, schema_hash(tools) if tools else None, schema_hash(kwargs) if kwargs else None)
+        llm = self._models.get(key)
+        if llm is not None:
+            self._stats["hits"] += 1
+        else:
+            with self._lock:
+                llm = self._models.get(key)
+                if llm is None:
+                    llm = self._new_chat_model(model, temperature, **kwargs)
+                    if tools:
+                        llm = llm.bind_tools(tools)
+                    self._models[key] = llm
+                    self._stats["misses"] += 1
+                    logger.info(f"🧩 [llm_pool] New chat model {model} (temperature={temperature}, tools={len(tools or [])}); {len(self._models)} pooled")
+                else:
+                    self._stats["hits"] += 1
+        self._maybe_log_stats()
+        return llm
+
+    # -- Stats ----------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        return {**self._stats, "models": len(self._models)}
+
+    def log_stats(self) -> None:
+        s = self.stats()
+        total = s["hits"] + s["misses"]
+        hit_rate = s["hits"] / total if total else 0.0
+        logger.info(
+            f"📊 [llm_pool] models={s['models']} hits={s['hits']} misses={s['misses']} "
+            f"hit_rate={hit_rate:.1%} http_requests={s['requests']}"
+        )
+
+    def _maybe_log_stats(self) -> None:
+        now = time.monotonic()
+        if now >= self._next_stats_log:
+            self._next_stats_log = now + self.settings["stats_log_interval_seconds"]
+            self.log_stats()
+
+
+_pool: Optional[LLMClientPool] = None
+_pool_lock = threading.Lock()
+
+def get_llm_pool() -> LLMClientPool:
+    """Return the process-wide pool, configured from graph_config.json on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                load_env()
+                graph = get_config().graph
+                backend = thaw(graph.get("llm_backend", {}))
+                if os.environ.get("LLM_BACKEND"):
+                    backend["provider"] = os.environ["LLM_BACKEND"]
+                _pool = LLMClientPool(thaw(graph.get("llm_pool", {})), backend)
+                if _pool.fake:
+                    logger.info("🧪 [llm_pool] Using the fake LLM backend; no requests reach OpenAI")
+    return _pool
+
+
+def get_chat_model(model: str, temperature: float = 0.3, tools: Optional[list] = None, **kwargs):
+    return get_llm_pool().chat_model(model, temperature, tools, **kwargs)
+
+def get_openai_client() -> "OpenAI":
+    return get_llm_pool().openai_client()
+
+def get_async_openai_client() -> "AsyncOpenAI":
+    return get_llm_pool().async_openai_client()
@@ -1,16 +1,47 @@
-import logging
+import atexit
 import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Dict, Optional
+from tools.common.utils.config import get_config
+
+try:
+    import orjson
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+except ImportError:  # optional fast encoder
+    orjson = None
 
 LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
+
+DEFAULT_LOG_SETTINGS = {
+    "queue_size": 10000,
+    "batch_size": 256,
+    "flush_interval_seconds": 1.0,
+    "max_bytes": 50 * 1024 * 1024,
+    "rotate_interval_seconds": 86400,
+    "backup_count": 7,
+    "max_event_bytes": 64 * 1024,
+    "max_field_chars": 2000,
+    "large_payload_sample_rate": 0.01,
+}
+
+# Fields holding request/response bodies; the only ones capped when an event is too large.
+PAYLOAD_FIELDS = ("request", "response", "context", "output")
+
+internal_logger = logging.getLogger("jsonl_logger")
 
 def setup_logger(name: str, filename: str) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
     if not logger.handlers:
+        LOG_DIR.mkdir(exist_ok=True)
         handler = logging.FileHandler(LOG_DIR / filename, mode='a', encoding='utf-8')
         formatter = logging.Formatter('%(message)s')
         handler.setFormatter(formatter)
@@ -18,10 +49,205 @@ def setup_logger(name: str, filename: str) -> logging.Logger:
 
     return logger
 
-tool_logger = setup_logger("tool_logger", "tool_logs.jsonl")
-agent_logger = setup_logger("agent_logger", "agent_logs.jsonl")
 
-def log_tool_event(tool_name: str, request: dict, response: dict, start_time: datetime, end_time: datetime):
+def encode_event(entry: dict) -> bytes:
+    """Serialize one event to a JSON line in a single pass (orjson when installed)."""
+    if orjson is not None:
+        # datetimes and dataclasses go through default=str, as with json.dumps, so logged
+        # values do not depend on whether orjson is installed.
+        return orjson.dumps(entry, default=str, option=_ORJSON_OPTIONS)
+    return json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def cap_payload(value: Any, max_chars: int) -> Any:
+    """Return ``value`` with every string longer than ``max_chars`` truncated."""
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}…[truncated {len(value) - max_chars} chars]"
+        return value
+    if isinstance(value, dict):
+        return {str(k): cap_payload(v, max_chars) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [cap_payload(v, max_chars) for v in value]
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    return cap_payload(str(value), max_chars)
+
+
+class JsonlWriter:
+    """
+    Append-only JSONL file written by a background thread.
+
+    ``write`` encodes the event once and enqueues the line, so the request path never
+    touches the file and can keep using its dicts. The writer thread writes in batches of
+    up to ``batch_size`` lines (or every ``flush_interval_seconds``), and rotates the file when it
+    exceeds ``max_bytes`` or is older than ``rotate_interval_seconds`` (keeping
+    ``backup_count`` files as ``name.1`` ... ``name.N``). Events larger than
+    ``max_event_bytes`` keep their full payload for a ``large_payload_sample_rate`` sample
+    and otherwise have long strings in their payload fields truncated. When the queue is
+    full, events are dropped and counted rather than blocking the caller.
+
+    Rotation is decided by each process from its own view of the file, so it assumes a
+    single writer process per file. With several uvicorn workers, a writer whose file was
+    rotated away by another worker reopens the path before its next batch, but two
+    workers can still rotate in quick succession; set ``max_bytes`` and
+    ``rotate_interval_seconds`` to 0 and rotate externally if exact sizes matter.
+    """
+
+    def __init__(self, path: Path, settings: Optional[dict] = None):
+        self.path = Path(path)
+        self.settings = {**DEFAULT_LOG_SETTINGS, **(settings or {})}
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=self.settings["queue_size"])
+        self._file = None
+        self._opened_at = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"jsonl-writer:{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, entry: dict) -> None:
+        if self._closed:
+            return
+        try:
+            line = encode_event(entry)
+        except Exception as e:
+            internal_logger.error(f"[logger] Could not serialize event for {self.path.name}: {e}")
+            return
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                internal_logger.warning(f"⚠️ [logger] {self.path.name} queue full; {self.dropped} events dropped")
+
+    def flush(self) -> None:
+        """Block until every event enqueued so far has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    # -- writer thread --------------------------------------------------------------
+
+    def _cap(self, line: bytes) -> bytes:
+        s = self.settings
+        if len(line) > s["max_event_bytes"] and random.random() >= s["large_payload_sample_rate"]:
+            entry = json.loads(line)
+            capped = {
+                key: cap_payload(value, s["max_field_chars"]) if key in PAYLOAD_FIELDS else value
+                for key, value in entry.items()
+            }
+            line = encode_event(capped)
+        return line + b"\n"
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._opened_at = time.time()
+
+    def _replaced(self) -> bool:
+        """True when the path no longer names this writer's file (rotated by another process)."""
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _should_rotate(self, incoming: int) -> bool:
+        s = self.settings
+        size = self._file.tell()
+        if size == 0:
+            return False
+        if s["max_bytes"] and size + incoming > s["max_bytes"]:
+            return True
+        return bool(s["rotate_interval_seconds"]) and time.time() - self._opened_at >= s["rotate_interval_seconds"]
+
+    def _rotate(self):
+        self._file.close()
+        backups = int(self.settings["backup_count"])
+        if backups > 0:
+            for i in range(backups - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._open()
+
+    def _write_batch(self, batch: list):
+        lines = []
+        for line in batch:
+            try:
+                lines.append(self._cap(line))
+            except Exception as e:
+                internal_logger.error(f"[logger] Could not cap event for {self.path.name}: {e}")
+        data = b"".join(lines)
+        if not data:
+            return
+        if self._file is not None and self._replaced():
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            self._open()
+        if self._should_rotate(len(data)):
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+
+    def _run(self):
+        batch_size = self.settings["batch_size"]
+        interval = self.settings["flush_interval_seconds"]
+        stop = False
+        while not stop:
+            try:
+                first = self._queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stop = True
+            try:
+                self._write_batch([line for line in batch if line is not None])
+            except Exception as e:
+                internal_logger.error(f"[logger] Failed to write {self.path.name}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if self._file is not None:
+            self._file.close()
+
+
+_writers: Dict[str, JsonlWriter] = {}
+_writers_lock = threading.Lock()
+
+def get_writer(filename: str) -> JsonlWriter:
+    """Return the shared writer for ``logs/<filename>`` (settings from graph_config.json "logging")."""
+    writer = _writers.get(filename)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(filename)
+            if writer is None:
+                settings = dict(get_config().graph.get("logging", {}))
+                writer = JsonlWriter(Path(settings.pop("directory", LOG_DIR)) / filename, settings)
+                _writers[filename] = writer
+    return writer
+
+@atexit.register
+def close_writers():
+    for writer in list(_writers.values()):
+        writer.close()
+
+
+def log_tool_event(tool_name: str, request: dict, response: dict, start_time: datetime, end_time: datetime, cache: Optional[dict] = None):
     log_entry = {
         "type": "tool",
         "tool_name": tool_name,
@@ -31,7 +257,10 @@ def log_tool_event(tool_name: str, request: dict, response: dict, start_time: da
         "request": request,
         "response": response
     }
-    tool_logger.info(json.dumps(log_entry, ensure_ascii=False))
+    # Only present for tools with response caching enabled: {"status": "hit"|"miss", "hits": n, "misses": n}
+    if cache is not None:
+        log_entry["cache"] = cache
+    get_writer("tool_logs.jsonl").write(log_entry)
 
 def log_agent_event(agent_name: str, message: str, context: dict, output: dict, start_time: datetime, end_time: datetime):
     log_entry = {
@@ -44,4 +273,4 @@ def log_agent_event(agent_name: str, message: str, context: dict, output: dict,
         "context": context,
         "output": output
     }
-    agent_logger.info(json.dumps(log_entry, ensure_ascii=False))
+    get_writer("agent_logs.jsonl").write(log_entry)
@@ -1,4 +1,7 @@
-from tools.common.utils.prompt import run_openai_tool_prompt
+from tools.common.utils.prompt import run_openai_tool_prompt, run_openai_tool_prompt_async
+
+# Prompt (openai_config.json) and tool definition (tools.json, "side_effects": true) name
+SEND_EMAIL_TOOL = "openai_mcp_send_email_tool"
 
 def send_email(subject: str, body: str) -> dict:
     """
@@ -13,8 +16,18 @@ def send_email(subject: str, body: str) -> dict:
     Returns:
         str: The response from the Zapier MCP tool.
     """
-    return run_openai_tool_prompt( 
-        tool_name="send_email",
+    return run_openai_tool_prompt(
+        tool_name=SEND_EMAIL_TOOL,
+        variables={
+            "subject": subject,
+            "body": body
+        }
+    )
+
+async def send_email_async(subject: str, body: str) -> dict:
+    """Async variant of send_email for async callers; awaits run_openai_tool_prompt_async."""
+    return await run_openai_tool_prompt_async(
+        tool_name=SEND_EMAIL_TOOL,
         variables={
             "subject": subject,
             "body": body
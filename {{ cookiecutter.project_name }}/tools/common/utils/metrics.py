@@ -0,0 +1,200 @@
+# tools/common/utils/metrics.py
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Tuple
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger("metrics")
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # metrics become no-ops when prometheus_client is not installed
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+    class _NoopMetric:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def labels(self, *args, **kwargs):
+            return self
+
+        def inc(self, amount=1):
+            pass
+
+        def dec(self, amount=1):
+            pass
+
+        def set(self, value):
+            pass
+
+        def observe(self, value):
+            pass
+
+    Counter = Gauge = Histogram = _NoopMetric
+
+
+# LLM-backed requests take seconds, not milliseconds.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+AGENT_REQUEST_SECONDS = Histogram(
+    "agent_request_duration_seconds", "Agent dispatch latency",
+    ["agent_name", "mode", "status"], buckets=LATENCY_BUCKETS,
+)
+AGENT_REQUESTS_IN_FLIGHT = Gauge(
+    "agent_requests_in_flight", "Agent dispatches currently running",
+    ["agent_name"], multiprocess_mode="livesum",
+)
+AGENT_RESPONSE_PARSE_FAILURES = Counter(
+    "agent_response_parse_failures_total", "Agent responses (/api/agent, stream, batch) that did not validate against the agent's output schema",
+    ["agent_name"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response starts",
+    ["method", "path", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled",
+    ["path"], multiprocess_mode="livesum",
+)
+TOOL_CALL_SECONDS = Histogram(
+    "tool_call_duration_seconds", "Tool execution latency",
+    ["tool", "kind", "status"], buckets=LATENCY_BUCKETS,
+)
+TOOL_FAILURES = Counter(
+    "tool_failures_total", "Failed tool calls, including calls answered with the fallback all-None output",
+    ["tool", "kind"],
+)
+LLM_CALLS = Counter(
+    "llm_calls_total", "Chat model calls",
+    ["model", "status"],
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens reported by chat model responses",
+    ["model", "type"],
+)
+LLM_RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "llm_rate_limit_wait_seconds", "Time OpenAI requests waited for RPM/TPM budget",
+    ["model"], buckets=LATENCY_BUCKETS,
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total", "OpenAI requests retried after a 429, 5xx or connection error",
+    ["model", "reason"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds", "Time agent requests spent queued before admission",
+    ["agent_name", "priority"], buckets=LATENCY_BUCKETS,
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Agent requests waiting for admission",
+    ["priority"], multiprocess_mode="livesum",
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total", "Agent requests turned away by admission control",
+    ["agent_name", "priority", "reason"],
+)
+ROUTER_DECISIONS = Counter(
+    "router_decisions_total", "Supervisor requests sent straight to a sub-agent (routed) or left to the supervisor (fallback)",
+    ["supervisor", "target", "outcome"],
+)
+ROUTER_CONFIDENCE = Histogram(
+    "router_confidence", "Confidence of the intent router's best match",
+    ["supervisor", "outcome"], buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+BATCH_ITEMS = Counter(
+    "batch_items_total", "Items processed by /api/agent/batch",
+    ["agent_name", "status"],
+)
+FAN_OUT_BRANCH_SECONDS = Histogram(
+    "fan_out_branch_seconds", "Duration of sub-agent branches dispatched concurrently by a supervisor",
+    ["agent_name", "status"], buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def track_agent_request(agent_name: str, mode: str):
+    """Count an agent dispatch as in flight and record its latency; set ``outcome["status"]`` on failure."""
+    outcome = {"status": "ok"}
+    in_flight = AGENT_REQUESTS_IN_FLIGHT.labels(agent_name)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        outcome["status"] = "error"
+        raise
+    finally:
+        in_flight.dec()
+        AGENT_REQUEST_SECONDS.labels(agent_name, mode, outcome["status"]).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_tool_call(tool: str, kind: str):
+    """Record a tool call's latency; a raised error or ``outcome["status"] = "error"`` counts as a failure."""
+    outcome = {"status": "ok"}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        outcome["status"] = "error"
+        raise
+    finally:
+        TOOL_CALL_SECONDS.labels(tool, kind, outcome["status"]).observe(time.perf_counter() - start)
+        if outcome["status"] != "ok":
+            TOOL_FAILURES.labels(tool, kind).inc()
+
+
+class LLMMetricsCallbackHandler(BaseCallbackHandler):
+    """Counts calls and prompt/completion/cached tokens for one pooled chat model."""
+
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def on_llm_end(self, response, **kwargs):
+        LLM_CALLS.labels(self.model, "ok").inc()
+        usage = {}
+        try:
+            usage = response.generations[0][0].message.usage_metadata or {}
+        except (AttributeError, IndexError):
+            pass
+        if not usage:
+            return
+        LLM_TOKENS.labels(self.model, "prompt").inc(usage.get("input_tokens") or 0)
+        LLM_TOKENS.labels(self.model, "completion").inc(usage.get("output_tokens") or 0)
+        cached = (usage.get("input_token_details") or {}).get("cache_read")
+        if cached:
+            LLM_TOKENS.labels(self.model, "cached").inc(cached)
+
+    def on_llm_error(self, error, **kwargs):
+        LLM_CALLS.labels(self.model, "error").inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Return (body, content type) for the /metrics endpoint.
+
+    Under a multi-worker server set ``PROMETHEUS_MULTIPROC_DIR`` (an empty directory shared
+    by the workers) so every worker's samples are aggregated.
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client is not installed\n", CONTENT_TYPE_LATEST
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,45 +1,235 @@
-import openai
+import asyncio
+import hashlib
 import logging
-import os
-from openai import OpenAI
-
-# Ensure logs directory exists
-os.makedirs("logs", exist_ok=True)
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from tools.common.utils.config import get_config, thaw
+from tools.common.utils.llm_clients import get_async_openai_client, get_openai_client
+from tools.common.utils.tracing import span
 
 # Use shared logging config (configured in graph_builder.py)
 logger = logging.getLogger(__name__)
 
-# Initialize the OpenAI client
-client = OpenAI()
+DEFAULT_MODERATION_SETTINGS = {
+    "model": "omni-moderation-latest",
+    "batch_window_ms": 20,
+    "max_batch_size": 32,
+    "cache_ttl_seconds": 3600,
+    "cache_max_entries": 10000,
+}
+
+def not_flagged() -> dict:
+    """A fresh fail-open result, so no caller can alter the default for the others."""
+    return {"flagged": False, "categories": {}, "category_scores": {}}
+
+def _moderation_result(response, index: int = 0) -> dict:
+    # Correctly access moderation results
+    flagged = response.results[index].flagged
+    categories = response.results[index].categories
+    category_scores = response.results[index].category_scores
+
+    # Log the moderation results
+    logger.info(f"Moderation result: Flagged={flagged}, Categories={categories}, Scores={category_scores}")
+
+    return {
+        "flagged": flagged,
+        "categories": categories,
+        "category_scores": category_scores
+    }
+
+def flagged_categories(result: dict) -> List[str]:
+    """Names of the categories a moderation result was flagged for."""
+    categories = result.get("categories") or {}
+    if hasattr(categories, "model_dump"):
+        categories = categories.model_dump()
+    return sorted(name for name, value in categories.items() if value)
+
+
+class ModerationBatcher:
+    """
+    Coalesces moderation checks into batched ``moderations.create`` calls.
+
+    Texts submitted within ``batch_window_ms`` of each other (up to ``max_batch_size``) are
+    sent as one input array, and identical texts share a single in-flight request. Results
+    are cached by content hash for ``cache_ttl_seconds``. Errors fail open (not flagged)
+    and are not cached, as before.
+
+    The async path batches per event loop; the sync path batches across threads, with the
+    first caller of a window sending the request for everyone in it. A sync check that
+    finds no other check in flight is sent at once rather than waiting out the window.
+    """
+
+    def __init__(self, settings: Optional[dict] = None):
+        self.settings = {**DEFAULT_MODERATION_SETTINGS, **(settings or {})}
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # async state (per event loop)
+        self._loop = None
+        self._pending: Dict[str, str] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._flush_handle = None
+        # sync state
+        self._sync_lock = threading.Lock()
+        self._sync_batch: Optional[dict] = None
+        self._sync_in_flight = 0
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    # -- cache ----------------------------------------------------------------------
+
+    def _cached(self, key: str) -> Optional[dict]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return result
+
+    def _store(self, key: str, result: dict) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self.settings["cache_ttl_seconds"], result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.settings["cache_max_entries"]:
+                self._cache.popitem(last=False)
+
+    def _results(self, response, keys: List[str]) -> List[dict]:
+        results = []
+        for index, key in enumerate(keys):
+            result = _moderation_result(response, index)
+            self._store(key, result)
+            results.append(result)
+        return results
+
+    # -- async path -----------------------------------------------------------------
+
+    async def check(self, text: str) -> dict:
+        key = self.content_hash(text)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._pending, self._futures, self._flush_handle = loop, {}, {}, None
+
+        future = self._futures.get(key)
+        if future is None:
+            future = loop.create_future()
+            self._futures[key] = future
+            self._pending[key] = text
+            if len(self._pending) >= self.settings["max_batch_size"]:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.settings["batch_window_ms"] / 1000, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        futures = {key: self._futures.pop(key) for key in batch}
+        self._loop.create_task(self._send(batch, futures))
+
+    async def _send(self, batch: Dict[str, str], futures: Dict[str, asyncio.Future]) -> None:
+        keys = list(batch)
+        try:
+            with span("moderation.batch", root=False, batch_size=len(keys)):
+                response = await get_async_openai_client().moderations.create(
+                    model=self.settings["model"],
+                    input=[batch[key] for key in keys]
+                )
+            results = self._results(response, keys)
+        except Exception as e:
+            logger.error(f"Error during moderation check: {e}")
+            results = [not_flagged() for _ in keys]
+        for key, result in zip(keys, results):
+            if not futures[key].done():
+                futures[key].set_result(result)
+
+    # -- sync path ------------------------------------------------------------------
+
+    def check_sync(self, text: str) -> dict:
+        key = self.content_hash(text)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        with self._sync_lock:
+            batch = self._sync_batch
+            leader = batch is None or batch["sent"] or len(batch["texts"]) >= self.settings["max_batch_size"]
+            if leader:
+                batch = {"texts": {}, "results": {}, "done": threading.Event(), "sent": False}
+                self._sync_batch = batch
+            batch["texts"].setdefault(key, text)
+            # Only open a window when other checks are running, i.e. when others may join
+            wait_for_others = leader and self._sync_in_flight > 0
+            self._sync_in_flight += 1
+
+        try:
+            return self._check_sync(key, batch, leader, wait_for_others)
+        finally:
+            with self._sync_lock:
+                self._sync_in_flight -= 1
+
+    def _check_sync(self, key: str, batch: dict, leader: bool, wait_for_others: bool) -> dict:
+        if leader:
+            if wait_for_others:
+                time.sleep(self.settings["batch_window_ms"] / 1000)
+            with self._sync_lock:
+                batch["sent"] = True
+                if self._sync_batch is batch:
+                    self._sync_batch = None
+            keys = list(batch["texts"])
+            try:
+                with span("moderation.batch", root=False, batch_size=len(keys)):
+                    response = get_openai_client().moderations.create(
+                        model=self.settings["model"],
+                        input=[batch["texts"][k] for k in keys]
+                    )
+                batch["results"] = dict(zip(keys, self._results(response, keys)))
+            except Exception as e:
+                logger.error(f"Error during moderation check: {e}")
+            finally:
+                batch["done"].set()
+        else:
+            batch["done"].wait()
+        return batch["results"].get(key) or not_flagged()
+
+
+_batcher: Optional[ModerationBatcher] = None
+_batcher_lock = threading.Lock()
+
+def get_moderation_batcher() -> ModerationBatcher:
+    """Return the process-wide batcher, configured from graph_config.json "moderation"."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = ModerationBatcher(thaw(get_config().graph.get("moderation", {})))
+    return _batcher
+
 
 # Helper function for moderation check
 def check_moderation(text: str) -> dict:
     """Check if the input text violates OpenAI's content policy using the Moderation API."""
-    try:
-        # Use the omni-moderation-latest model for moderation check
-        response = client.moderations.create(
-            model="omni-moderation-latest",
-            input=text
-        )
-
-        # Correctly access moderation results
-        flagged = response.results[0].flagged
-        categories = response.results[0].categories
-        category_scores = response.results[0].category_scores
-
-        # Log the moderation results
-        logger.info(f"Moderation result: Flagged={flagged}, Categories={categories}, Scores={category_scores}")
-
-        return {
-            "flagged": flagged,
-            "categories": categories,
-            "category_scores": category_scores
-        }
-    except Exception as e:
-        logger.error(f"Error during moderation check: {e}")
-        return {"flagged": False, "categories": {}, "category_scores": {}}
+    return get_moderation_batcher().check_sync(text)
+
+async def check_moderation_async(text: str) -> dict:
+    """Async variant of check_moderation that does not block the event loop."""
+    return await get_moderation_batcher().check(text)
 
 if __name__ == "__main__":
     test_text = "This is a test message. Please check if this contains any harmful content."
     moderation_result = check_moderation(test_text)
-    logger.info(f"Moderation result: {moderation_result}")
\ No newline at end of file
+    logger.info(f"Moderation result: {moderation_result}")
@@ -1,20 +1,26 @@
-import openai
 import os
-from tools.common.utils.config import load_json_config
-from tools.common.utils.responder import responder
+from tools.common.utils.config import get_config
+from tools.common.utils.responder import get_responder
 from tools.common.utils.moderation import check_moderation
 from tools.common.utils.logger import log_tool_event
+from tools.common.utils.metrics import track_tool_call
+from tools.common.utils.response_cache import cache_policy, get_response_cache
+from tools.common.utils.tracing import span
+from contextlib import contextmanager
 from typing import Optional, Callable
 import re
 import json
 import logging
 from datetime import datetime
-from openai import OpenAI
 
-# Optional fallback log
-logging.basicConfig(filename='luna_tool_log.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+_fallback_log_configured = False
 
-client = OpenAI()
+def _configure_fallback_log():
+    # Optional fallback log, set up by the first tool call rather than at import
+    global _fallback_log_configured
+    if not _fallback_log_configured:
+        logging.basicConfig(filename='luna_tool_log.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        _fallback_log_configured = True
 
 # Helper function to parse rationale section from LLM response
 def parse_rationale(response: str) -> tuple:
@@ -23,20 +29,9 @@ def parse_rationale(response: str) -> tuple:
         return parts[0].strip(), parts[1].strip()
     return response.strip(), "No explanation provided."
 
-# Main prompt runner that supports LLM-based tool execution using config-driven schema
-# Applies moderation, input filtering, and logs complete metadata
-
-def run_openai_tool_prompt(
-    tool_name: str,
-    variables: Optional[dict] = None,
-    output_parser: Optional[Callable[[str], any]] = None
-) -> dict:
-    config = load_json_config("config/graph_config.json")
-    moderation_enabled = config.get("moderation_enabled", True)
-
+def _filter_tool_variables(tool_name: str, variables: Optional[dict]) -> dict:
     # Extract and filter input variables for the tool based on schema
-    message = (variables or {}).get("message", "")
-    tool_config = responder.config.get(tool_name, {})
+    tool_config = get_responder().config.get(tool_name, {})
     allowed_keys = tool_config.get("input_schema", [])
     output_schema = tool_config.get("output_schema", {})
 
@@ -44,42 +39,112 @@ def run_openai_tool_prompt(
     expected_output_schema = json.dumps(output_schema, indent=2) if output_schema else ""
     filtered_vars = {k: v for k, v in (variables or {}).items() if not allowed_keys or k in allowed_keys}
     filtered_vars["expected_output_schema"] = expected_output_schema
+    return filtered_vars
+
+def _cache_info(cache_status: Optional[str]) -> Optional[dict]:
+    if cache_status is None:
+        return None
+    stats = get_response_cache().stats()
+    return {"status": cache_status, "hits": stats["hits"], "misses": stats["misses"]}
+
+def _finalize_tool_response(tool_name: str, filtered_vars: dict, response, start_time: datetime, cache_status: Optional[str] = None):
+    cache = _cache_info(cache_status)
+
+    # If structured LangGraph tool call
+    if hasattr(response, "tool_calls") and response.tool_calls:
+        log_tool_event(tool_name, filtered_vars, {"tool_calls": response.tool_calls}, start_time, datetime.utcnow(), cache=cache)
+        return response
+
+    # If parsed dict-style result
+    if isinstance(response, dict):
+        log_tool_event(tool_name, filtered_vars, response, start_time, datetime.utcnow(), cache=cache)
+        return response
+
+    # If string result, strip Markdown and parse as JSON
+    if isinstance(response, str):
+        raw_output = response.strip()
+    else:
+        raise TypeError(f"Unexpected response type: {type(response).__name__}")
+
+    if raw_output.startswith('```json'):
+        raw_output = raw_output[7:-3].strip()
+
+    output_json = json.loads(raw_output)
+    message = output_json.get("output", "No message provided.")
+    explanation = output_json.get("explanation", "No explanation provided.")
+
+    final_response = {"llm_output": message, "llm_explanation": explanation}
+    log_tool_event(tool_name, filtered_vars, final_response, start_time, datetime.utcnow(), cache=cache)
+
+    return final_response
+
+def _tool_error_response(tool_name: str, filtered_vars: dict, error: Exception, start_time: datetime) -> dict:
+    error_response = {"output": {"error": str(error)}}
+    log_tool_event(tool_name, filtered_vars, error_response, start_time, datetime.utcnow())
+    logging.error(f"[run_luna_prompt] Tool '{tool_name}' failed: {error}", exc_info=True)
+    return error_response
+
+class _ToolPromptCall:
+    """One tool prompt run: the state shared by the sync and async runners."""
+
+    __slots__ = ("tool_name", "filtered_vars", "start_time", "policy", "span", "result")
+
+    def __init__(self, tool_name: str, filtered_vars: dict):
+        self.tool_name = tool_name
+        self.filtered_vars = filtered_vars
+        self.start_time = datetime.utcnow()
+        self.policy = None
+        self.span = None
+        self.result = None
+
+    def finish(self, response, cache_status: Optional[str] = None) -> None:
+        if cache_status is not None:
+            self.span.set_attribute("cache", cache_status)
+        self.result = _finalize_tool_response(self.tool_name, self.filtered_vars, response, self.start_time, cache_status)
+
+@contextmanager
+def _tool_prompt_call(tool_name: str, variables: Optional[dict]):
+    """
+    Filter the variables, look up the cache policy and run the body inside the tool's
+    span and metrics. A failure in the body is logged and becomes ``call.result``.
+    """
+    _configure_fallback_log()
+    call = _ToolPromptCall(tool_name, _filter_tool_variables(tool_name, variables))
+    with span("tool.prompt", tool=tool_name) as tool_span, track_tool_call(tool_name, "prompt") as outcome:
+        call.span = tool_span
+        try:
+            call.policy = cache_policy(tool_name)
+            yield call
+        except Exception as e:
+            tool_span.set_error(e)
+            outcome["status"] = "error"
+            call.result = _tool_error_response(tool_name, call.filtered_vars, e, call.start_time)
 
-    start_time = datetime.utcnow()
-    try:
-        # Invoke the tool via prompt
-        response = responder.run(tool_name=tool_name, variables=filtered_vars, message=message)
-
-        # If structured LangGraph tool call
-        if hasattr(response, "tool_calls") and response.tool_calls:
-            log_tool_event(tool_name, filtered_vars, {"tool_calls": response.tool_calls}, start_time, datetime.utcnow())
-            return response
-
-        # If parsed dict-style result
-        if isinstance(response, dict):
-            log_tool_event(tool_name, filtered_vars, response, start_time, datetime.utcnow())
-            return response
+# Main prompt runner that supports LLM-based tool execution using config-driven schema
+# Applies input filtering, caching and logs complete metadata
 
-        # If string result, strip Markdown and parse as JSON
-        if isinstance(response, str):
-            raw_output = response.strip()
+def run_openai_tool_prompt(
+    tool_name: str,
+    variables: Optional[dict] = None,
+    output_parser: Optional[Callable[[str], any]] = None
+) -> dict:
+    with _tool_prompt_call(tool_name, variables) as call:
+        # Invoke the tool via prompt; opted-in tools without side effects may be served from cache
+        if call.policy:
+            call.finish(*get_responder().run_cached(tool_name, call.policy, variables=call.filtered_vars))
         else:
-            raise TypeError(f"Unexpected response type: {type(response).__name__}")
-
-        if raw_output.startswith('```json'):
-            raw_output = raw_output[7:-3].strip()
-
-        output_json = json.loads(raw_output)
-        message = output_json.get("output", "No message provided.")
-        explanation = output_json.get("explanation", "No explanation provided.")
-
-        final_response = {"llm_output": message, "llm_explanation": explanation}
-        log_tool_event(tool_name, filtered_vars, final_response, start_time, datetime.utcnow())
+            call.finish(get_responder().run(tool_name=tool_name, variables=call.filtered_vars))
+    return call.result
 
-        return final_response
-
-    except Exception as e:
-        error_response = {"output": {"error": str(e)}}
-        log_tool_event(tool_name, filtered_vars, error_response, start_time, datetime.utcnow())
-        logging.error(f"[run_luna_prompt] Tool '{tool_name}' failed: {e}", exc_info=True)
-        return error_response
+async def run_openai_tool_prompt_async(
+    tool_name: str,
+    variables: Optional[dict] = None,
+    output_parser: Optional[Callable[[str], any]] = None
+) -> dict:
+    """Async variant of run_openai_tool_prompt; awaits the LLM call via responder.arun."""
+    with _tool_prompt_call(tool_name, variables) as call:
+        if call.policy:
+            call.finish(*await get_responder().arun_cached(tool_name, call.policy, variables=call.filtered_vars))
+        else:
+            call.finish(await get_responder().arun(tool_name=tool_name, variables=call.filtered_vars))
+    return call.result
@@ -0,0 +1,314 @@
+# tools/common/utils/rate_limiter.py
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+import httpx
+from tools.common.utils.config import get_config, thaw
+from tools.common.utils.metrics import LLM_RATE_LIMIT_WAIT_SECONDS, LLM_RETRIES
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; shared mode falls back to per-process budgets
+    fcntl = None
+
+logger = logging.getLogger("rate_limiter")
+
+DEFAULT_RATE_LIMIT_SETTINGS = {
+    "enabled": True,
+    # Per-model budgets; "default" applies to models without an entry.
+    "models": {"default": {"rpm": 500, "tpm": 200000}},
+    # "process": one budget per worker; "file": one budget per host via an fcntl-locked state file.
+    "shared": "process",
+    "state_file": ".cache/openai_rate_limits.json",
+    "max_wait_seconds": 30,
+    "max_retries": 4,
+    "backoff_base_seconds": 0.5,
+    "backoff_max_seconds": 20,
+    "chars_per_token": 4,
+    "default_max_output_tokens": 1024,
+}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _take(state: dict, key: str, capacity: float, amount: float, now: float) -> Tuple[float, Tuple[float, float]]:
+    """Return (seconds until ``amount`` is available, refilled bucket) for one per-minute bucket."""
+    level, updated = state.get(key, (capacity, now))
+    rate = capacity / 60.0
+    level = min(capacity, level + max(0.0, now - updated) * rate)
+    amount = min(amount, capacity)  # an oversized request waits for a full bucket, not forever
+    wait = 0.0 if level >= amount else (amount - level) / rate
+    return wait, (level, now)
+
+
+class _ProcessState:
+    """Bucket state shared by the threads of one process."""
+
+    def __init__(self):
+        self._state: dict = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self._state
+
+
+class _FileState:
+    """Bucket state shared by every process on the host through an fcntl-locked JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def transaction(self):
+        with self._lock, open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """
+    Token-bucket scheduler for OpenAI requests-per-minute and tokens-per-minute budgets.
+
+    Each model has an ``rpm`` and a ``tpm`` bucket that refill continuously; a request
+    takes one request and its estimated tokens from both at once, or waits until it can.
+    A 429 pauses the model for its Retry-After so every caller backs off together. With
+    ``"shared": "file"`` the buckets live in a locked state file, so all uvicorn workers
+    on the host draw from one budget.
+    """
+
+    def __init__(self, settings: Optional[dict] = None):
+        self.settings = {**DEFAULT_RATE_LIMIT_SETTINGS, **(settings or {})}
+        if self.settings["shared"] == "file" and fcntl is None:
+            logger.warning("⚠️ [rate_limiter] fcntl unavailable; falling back to per-process budgets")
+        if self.settings["shared"] == "file" and fcntl is not None:
+            self._state = _FileState(self.settings["state_file"])
+        else:
+            self._state = _ProcessState()
+
+    def limits(self, model: str) -> dict:
+        models = self.settings["models"]
+        return models.get(model) or models.get("default") or {}
+
+    def estimate_tokens(self, body: dict, body_size: int) -> int:
+        """Approximate prompt tokens from the request size plus the requested output budget."""
+        max_output = body.get("max_output_tokens") or body.get("max_tokens") or self.settings["default_max_output_tokens"]
+        return int(body_size / self.settings["chars_per_token"]) + int(max_output)
+
+    def try_acquire(self, model: str, tokens: int) -> float:
+        """Take one request and ``tokens`` from the model's buckets; return 0, or the seconds to wait."""
+        limits = self.limits(model)
+        now = time.time()
+        with self._state.transaction() as state:
+            paused = state.get(f"{model}:pause", 0) - now
+            if paused > 0:
+                return paused
+            waits, updates = [], []
+            for kind, amount in (("rpm", 1), ("tpm", tokens)):
+                capacity = limits.get(kind)
+                if not capacity:
+                    continue
+                key = f"{model}:{kind}"
+                wait, (level, updated) = _take(state, key, capacity, amount, now)
+                waits.append(wait)
+                updates.append((key, level - min(amount, capacity), updated))
+            wait = max(waits, default=0.0)
+            # Both buckets are debited together, or neither is.
+            if wait == 0:
+                for key, level, updated in updates:
+                    state[key] = [level, updated]
+            return wait
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Hold back every request for ``model`` for ``seconds`` (after a 429)."""
+        with self._state.transaction() as state:
+            state[f"{model}:pause"] = max(state.get(f"{model}:pause", 0), time.time() + seconds)
+
+    def acquire(self, model: str, tokens: int) -> float:
+        waited = 0.0
+        while waited < self.settings["max_wait_seconds"]:
+            wait = self.try_acquire(model, tokens)
+            if wait == 0:
+                break
+            wait = min(wait, self.settings["max_wait_seconds"] - waited)
+            time.sleep(wait)
+            waited += wait
+        else:
+            logger.warning(f"⏳ [rate_limiter] {model} budget still exhausted after {waited:.1f}s; sending anyway")
+        LLM_RATE_LIMIT_WAIT_SECONDS.labels(model).observe(waited)
+        return waited
+
+    async def _off_loop(self, fn, *args):
+        # The file state takes a thread lock shared with sync callers, an fcntl lock shared
+        # with other workers, and rewrites the file: none of that may block the event loop.
+        if isinstance(self._state, _FileState):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def apause(self, model: str, seconds: float) -> None:
+        await self._off_loop(self.pause, model, seconds)
+
+    async def aacquire(self, model: str, tokens: int) -> float:
+        waited = 0.0
+        while waited < self.settings["max_wait_seconds"]:
+            wait = await self._off_loop(self.try_acquire, model, tokens)
+            if wait == 0:
+                break
+            wait = min(wait, self.settings["max_wait_seconds"] - waited)
+            await asyncio.sleep(wait)
+            waited += wait
+        else:
+            logger.warning(f"⏳ [rate_limiter] {model} budget still exhausted after {waited:.1f}s; sending anyway")
+        LLM_RATE_LIMIT_WAIT_SECONDS.labels(model).observe(waited)
+        return waited
+
+    # -- retries --------------------------------------------------------------------
+
+    def backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait before retry ``attempt``: Retry-After when the server sent one, else full-jitter exponential."""
+        s = self.settings
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(s["backoff_max_seconds"], retry_after) + random.uniform(0, s["backoff_base_seconds"])
+        return random.uniform(0, min(s["backoff_max_seconds"], s["backoff_base_seconds"] * 2 ** attempt))
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse ``retry-after-ms`` / ``Retry-After`` (seconds or HTTP date) from a response."""
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _request_budget(limiter: RateLimiter, request: httpx.Request) -> Tuple[Optional[str], int]:
+    if request.method != "POST":
+        return None, 0
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return None, 0
+    model = body.get("model") if isinstance(body, dict) else None
+    if not model:
+        return None, 0
+    return model, limiter.estimate_tokens(body, len(request.content))
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Wraps an httpx transport with the rate limiter and 429/5xx/connection-error retries."""
+
+    def __init__(self, transport: httpx.BaseTransport, limiter: RateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens = _request_budget(self._limiter, request)
+        max_retries = self._limiter.settings["max_retries"]
+        for attempt in range(max_retries + 1):
+            if model:
+                self._limiter.acquire(model, tokens)
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                if attempt == max_retries:
+                    raise
+                LLM_RETRIES.labels(model or "unknown", type(e).__name__).inc()
+                time.sleep(self._limiter.backoff(attempt))
+                continue
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+            delay = self._limiter.backoff(attempt, response)
+            response.close()
+            LLM_RETRIES.labels(model or "unknown", str(response.status_code)).inc()
+            logger.warning(f"🔁 [rate_limiter] {response.status_code} from {request.url.path}; retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+            if model and response.status_code == 429:
+                self._limiter.pause(model, delay)
+            else:
+                time.sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of RateLimitedTransport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: RateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens = _request_budget(self._limiter, request)
+        max_retries = self._limiter.settings["max_retries"]
+        for attempt in range(max_retries + 1):
+            if model:
+                await self._limiter.aacquire(model, tokens)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                if attempt == max_retries:
+                    raise
+                LLM_RETRIES.labels(model or "unknown", type(e).__name__).inc()
+                await asyncio.sleep(self._limiter.backoff(attempt))
+                continue
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+            delay = self._limiter.backoff(attempt, response)
+            await response.aclose()
+            LLM_RETRIES.labels(model or "unknown", str(response.status_code)).inc()
+            logger.warning(f"🔁 [rate_limiter] {response.status_code} from {request.url.path}; retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+            if model and response.status_code == 429:
+                await self._limiter.apause(model, delay)
+            else:
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter, configured from graph_config.json "rate_limits"."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(thaw(get_config().graph.get("rate_limits", {})))
+    return _limiter
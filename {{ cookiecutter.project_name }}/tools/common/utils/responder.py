@@ -1,6 +1,24 @@
 # tools/common/utils/responder.py
 
+import threading
+from typing import Optional
 from tools.openai.response_engine import OpenAIResponder
 
-# Initialize responder instance with config
-responder = OpenAIResponder(config_path="config/openai_config.json")
+_responder: Optional[OpenAIResponder] = None
+_responder_lock = threading.Lock()
+
+def get_responder() -> OpenAIResponder:
+    """Return the shared responder instance, created on first use."""
+    global _responder
+    if _responder is None:
+        with _responder_lock:
+            if _responder is None:
+                _responder = OpenAIResponder(config_path="config/openai_config.json")
+    return _responder
+
+def __getattr__(name: str):
+    # Keeps ``from tools.common.utils.responder import responder`` working without
+    # creating the responder at import time.
+    if name == "responder":
+        return get_responder()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
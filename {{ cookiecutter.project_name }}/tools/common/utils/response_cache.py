@@ -0,0 +1,143 @@
+# tools/common/utils/response_cache.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from tools.common.utils.config import ConfigSnapshot, get_config
+
+logger = logging.getLogger("response_cache")
+
+DEFAULT_CACHE_SETTINGS = {
+    "max_entries": 1024,
+    "sqlite_path": "database/response_cache.sqlite3",
+}
+DEFAULT_TTL_SECONDS = 300
+
+
+def cache_policy(tool_name: str, snapshot: ConfigSnapshot = None) -> Optional[dict]:
+    """
+    Return the tool's ``cache`` settings from openai_config.json when caching applies.
+
+    Caching is opt-in per tool (``"cache": {"enabled": true, "ttl_seconds": 300,
+    "persist": false}``) and never applies to tools marked ``"side_effects": true`` in
+    tools.json or openai_config.json, whatever their cache settings say.
+    """
+    snapshot = snapshot or get_config()
+    prompt_cfg = snapshot.prompt(tool_name) or {}
+    policy = prompt_cfg.get("cache")
+    if not policy or not policy.get("enabled", True):
+        return None
+    tool_def = snapshot.tool(tool_name) or snapshot.tool_by_function.get(tool_name) or {}
+    if tool_def.get("side_effects") or prompt_cfg.get("side_effects"):
+        return None
+    return policy
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM tool responses: an in-memory LRU with per-entry TTL, backed
+    by an optional SQLite table so entries survive restarts.
+
+    Values must be JSON-serialisable. Expired SQLite rows are ignored on read and pruned
+    when newer values are written for the same key.
+    """
+
+    def __init__(self, max_entries: int = 1024, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.sqlite_path = sqlite_path
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.sqlite_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db = db
+        return self._db
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str, persist: bool = False) -> Tuple[bool, Any]:
+        """Return ``(hit, value)``; ``persist`` also consults the SQLite tier."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._memory[key]
+
+        if persist and self.sqlite_path:
+            try:
+                with self._db_lock:
+                    row = self._connection().execute(
+                        "SELECT value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                        (key, now),
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"[response_cache] SQLite read failed: {e}")
+                row = None
+            if row is not None:
+                value = json.loads(row[0])
+                self._remember(key, row[1], value)
+                with self._lock:
+                    self.hits += 1
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def set(self, key: str, value: Any, ttl_seconds: float = DEFAULT_TTL_SECONDS, persist: bool = False) -> None:
+        expires_at = time.time() + ttl_seconds
+        self._remember(key, expires_at, value)
+        if persist and self.sqlite_path:
+            try:
+                payload = json.dumps(value, ensure_ascii=False)
+                with self._db_lock:
+                    self._connection().execute(
+                        "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, payload, expires_at),
+                    )
+            except (TypeError, ValueError, sqlite3.Error) as e:
+                logger.warning(f"[response_cache] SQLite write skipped: {e}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory)}
+
+
+_response_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide cache, configured from graph_config.json "response_cache"."""
+    global _response_cache
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                settings = {**DEFAULT_CACHE_SETTINGS, **get_config().graph.get("response_cache", {})}
+                _response_cache = ResponseCache(settings["max_entries"], settings.get("sqlite_path"))
+    return _response_cache
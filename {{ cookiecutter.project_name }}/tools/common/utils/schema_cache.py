@@ -0,0 +1,93 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Type
+from pydantic import BaseModel, Field, create_model
+
+logger = logging.getLogger("schema_cache")
+
+_models: Dict[str, Type[BaseModel]] = {}
+_lock = threading.Lock()
+
+
+def parse_type(type_str: Any) -> type:
+    if isinstance(type_str, str):
+        return {
+            "str": str,
+            "string": str,
+            "int": int,
+            "integer": int,
+            "float": float,
+            "number": float,
+            "bool": bool,
+            "boolean": bool,
+            "list": list,
+            "array": list,
+            "dict": dict,
+            "object": dict,
+        }.get(type_str.lower(), Any)
+    return Any
+
+
+def schema_hash(spec: Any) -> str:
+    """Canonical hash of a JSON-like schema spec (key order does not matter)."""
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def memoized_model(name: str, spec: Any, factory: Callable[[], Type[BaseModel]]) -> Type[BaseModel]:
+    """
+    Return the model class built by ``factory`` for this (name, spec), creating it only once.
+
+    Reusing the class (instead of calling ``create_model`` per request) keeps pydantic's
+    compiled validators and serializers warm and avoids rebuilding the JSON schema.
+    """
+    key = f"{name}:{schema_hash(spec)}"
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = factory()
+            _models[key] = model
+            logger.debug(f"Compiled model {name} ({key})")
+    return model
+
+
+def model_from_type_map(name: str, type_map: Any, doc: str = None) -> Type[BaseModel]:
+    """
+    Build (once) a model whose fields are all required, from ``{"field": "string", ...}``
+    or a list of field names (all typed ``str``), as used in tools.json.
+    """
+    if isinstance(type_map, (list, tuple)):
+        type_map = {field_name: "str" for field_name in type_map}
+    elif not isinstance(type_map, dict):
+        raise ValueError(f"Unsupported schema type for '{name}': {type(type_map)}")
+
+    def factory():
+        fields = {
+            k: (parse_type(v), Field(..., description=k))
+            for k, v in type_map.items()
+        }
+        model = create_model(name, **fields, __base__=BaseModel)
+        if doc:
+            model.__doc__ = doc
+        return model
+
+    return memoized_model(name, {"type_map": type_map, "doc": doc}, factory)
+
+
+def model_from_json_schema(name: str, json_schema: dict) -> Type[BaseModel]:
+    """Build (once) a flat model from a JSON schema with ``properties``/``required``."""
+    def factory():
+        required_fields = set(json_schema.get("required", []))
+        fields = {}
+        for field_name, subschema in json_schema.get("properties", {}).items():
+            default = ... if field_name in required_fields else None
+            fields[field_name] = (parse_type(subschema.get("type")), default)
+        return create_model(name, **fields)
+
+    return memoized_model(name, {"json_schema": json_schema}, factory)
+
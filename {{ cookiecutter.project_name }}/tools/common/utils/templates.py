@@ -0,0 +1,145 @@
+# tools/common/utils/templates.py
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, Optional, Set
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FunctionLoader,
+    StrictUndefined,
+    Template,
+    TemplateSyntaxError,
+    Undefined,
+    meta,
+)
+from tools.common.utils.config import ConfigSnapshot, get_config
+from tools.common.utils.tracing import span
+
+logger = logging.getLogger("prompt_templates")
+
+PROMPT_FIELDS = ("prompt", "input_template")
+
+# Variables supplied at render time by the dispatcher / prompt helpers rather than by a
+# tool's input_schema. Anything else referenced by a template is reported at load time.
+RUNTIME_VARIABLES = frozenset({
+    "message", "identifier", "user_input", "user_id", "customer_id", "context",
+    "expected_output_schema", "agent_output_schema",
+})
+
+
+class PromptTemplates:
+    """
+    Shared Jinja environment for the prompts in openai_config.json.
+
+    Templates are content-addressed: each distinct source string is parsed and compiled
+    once per process (and its bytecode cached on disk when ``bytecode_cache_dir`` is set),
+    so rendering a prompt is a dict lookup plus ``Template.render``. When a new config
+    version is seen, every prompt in it is compiled up front and checked for syntax errors
+    and for variables nothing will provide.
+
+    Settings come from the ``templates`` section of graph_config.json:
+        bytecode_cache_dir  -- directory for compiled bytecode (omit or null to disable)
+        strict_undefined    -- raise on undefined variables at render time (default false)
+    """
+
+    def __init__(self, bytecode_cache_dir: Optional[str] = None, strict_undefined: bool = False):
+        self._sources: Dict[str, str] = {}
+        self._templates: Dict[str, Template] = {}
+        self._checked_versions: Set[str] = set()
+        self._lock = threading.Lock()
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+        self.env = Environment(
+            loader=FunctionLoader(self._load_source),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir) if bytecode_cache_dir else None,
+            undefined=StrictUndefined if strict_undefined else Undefined,
+            auto_reload=False,
+            cache_size=-1,
+        )
+
+    def _load_source(self, name: str):
+        source = self._sources.get(name)
+        if source is None:
+            return None
+        # Names are content hashes, so a loaded template can never go stale.
+        return source, None, lambda: True
+
+    @staticmethod
+    def _name(source: str) -> str:
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def get(self, source: str) -> Template:
+        """Return the compiled template for ``source``, compiling it on first use."""
+        name = self._name(source)
+        template = self._templates.get(name)
+        if template is not None:
+            return template
+        with self._lock:
+            template = self._templates.get(name)
+            if template is None:
+                self._sources[name] = source
+                template = self.env.get_template(name)
+                self._templates[name] = template
+        return template
+
+    def render(self, source: str, **variables) -> str:
+        return self.get(source).render(**variables)
+
+    def undeclared_variables(self, source: str) -> Set[str]:
+        """Variables referenced by ``source`` that the template does not set itself."""
+        return meta.find_undeclared_variables(self.env.parse(source))
+
+    def precompile(self, snapshot: ConfigSnapshot) -> None:
+        """Compile and check every prompt of ``snapshot``; runs once per config version."""
+        if snapshot.version in self._checked_versions:
+            return
+        for name, prompt_cfg in snapshot.prompt_by_name.items():
+            tool_def = snapshot.tool(name) or {}
+            known = RUNTIME_VARIABLES | set(tool_def.get("input_schema") or ())
+            for field in PROMPT_FIELDS:
+                source = prompt_cfg.get(field)
+                if not isinstance(source, str):
+                    continue
+                try:
+                    self.get(source)
+                    unknown = self.undeclared_variables(source) - known
+                except TemplateSyntaxError as e:
+                    logger.error(f"❌ [templates] {name}.{field} line {e.lineno}: {e.message}")
+                    continue
+                if unknown:
+                    logger.warning(f"⚠️ [templates] {name}.{field} references undefined variables: {sorted(unknown)}")
+        self._checked_versions.add(snapshot.version)
+        logger.info(f"[templates] Compiled prompts for config {snapshot.version} ({len(self._templates)} templates)")
+
+
+_prompt_templates: Optional[PromptTemplates] = None
+_init_lock = threading.Lock()
+
+def get_prompt_templates() -> PromptTemplates:
+    """Return the process-wide PromptTemplates, created from graph_config.json on first use."""
+    global _prompt_templates
+    if _prompt_templates is None:
+        with _init_lock:
+            if _prompt_templates is None:
+                settings = get_config().graph.get("templates", {})
+                _prompt_templates = PromptTemplates(
+                    bytecode_cache_dir=settings.get("bytecode_cache_dir"),
+                    strict_undefined=settings.get("strict_undefined", False),
+                )
+    return _prompt_templates
+
+
+def compile_prompt(source: str, snapshot: ConfigSnapshot = None) -> Template:
+    """Return the compiled template for a prompt, checking the whole config version first."""
+    templates = get_prompt_templates()
+    templates.precompile(snapshot or get_config())
+    return templates.get(source)
+
+
+def render_prompt(source: str, variables: dict, snapshot: ConfigSnapshot = None) -> str:
+    template = compile_prompt(source, snapshot)
+    with span("template.render", root=False, template=template.name):
+        return template.render(**variables)
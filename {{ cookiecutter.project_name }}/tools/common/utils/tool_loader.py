@@ -1,11 +1,27 @@
+import asyncio
+import hashlib
 import importlib
+import inspect
+import json
 import logging
-from typing import Callable, Dict
-from langchain_core.tools import StructuredTool
-from tools.common.utils.config import load_json_config
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool, ToolException
+from tools.common.utils.config import DEFAULT_CONFIG_PATHS, ConfigSnapshot, get_config, load_json_config
+from tools.common.utils.metrics import track_tool_call
+from tools.common.utils.schema_cache import model_from_type_map
+from tools.common.utils.tracing import span
 
 logger = logging.getLogger("tool_loader")
 
+SLOW_IMPORT_WARNING_SECONDS = 0.5
+
+# ``configurable`` key for a run that starts before its moderation verdict: the pending
+# check (a future resolving to the moderation result), which tools wait on before running.
+MODERATION_GATE = "moderation_gate"
+
 
 def import_from_path(path: str) -> Callable:
     """
@@ -16,27 +32,139 @@ def import_from_path(path: str) -> Callable:
     return getattr(module, func_name)
 
 
+def tool_function_path(tool_def: dict) -> Optional[str]:
+    """Return the import path of a tool definition (``function_path``, or legacy ``function``)."""
+    return tool_def.get("function_path") or tool_def.get("function")
+
+
+class ToolRegistry:
+    """
+    Process-wide registry of tools declared in tools.json.
+
+    Each tool is wrapped once per definition: its schema and description come from
+    tools.json, so building an agent never imports tool code. The implementing module is
+    imported the first time the tool is actually called and the resolved function is
+    shared by every agent. Import time is recorded per function path (see ``load_times``).
+    """
+
+    def __init__(self):
+        self._functions: Dict[str, Callable] = {}
+        self._load_times: Dict[str, float] = {}
+        self._tools: Dict[str, StructuredTool] = {}
+        self._import_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, function_path: str) -> Callable:
+        """Import the function behind ``function_path`` on first use and cache it."""
+        func = self._functions.get(function_path)
+        if func is not None:
+            return func
+
+        # One lock per function path: a slow module only delays callers of that tool.
+        with self._lock:
+            import_lock = self._import_locks.setdefault(function_path, threading.Lock())
+
+        with import_lock:
+            func = self._functions.get(function_path)
+            if func is not None:
+                return func
+
+            start = time.perf_counter()
+            func = import_from_path(function_path)
+            elapsed = time.perf_counter() - start
+            self._functions[function_path] = func
+            self._load_times[function_path] = elapsed
+
+        log = logger.warning if elapsed >= SLOW_IMPORT_WARNING_SECONDS else logger.info
+        log(f"✅ Imported tool function {function_path} in {elapsed * 1000:.1f} ms")
+        return func
+
+    def lazy_function(self, function_path: str) -> Callable:
+        """Return a callable that resolves ``function_path`` on its first invocation."""
+        def call_tool(**kwargs):
+            return self.resolve(function_path)(**kwargs)
+        return call_tool
+
+    def load_times(self) -> Dict[str, float]:
+        """Seconds spent importing each resolved tool function, keyed by function path."""
+        return dict(self._load_times)
+
+    def _build_tool(self, tool_def: dict) -> StructuredTool:
+        name = tool_def["name"]
+        function_path = tool_function_path(tool_def)
+        args_schema = model_from_type_map(f"{name}_Args", tool_def.get("input_schema") or {})
+        lazy_call = self.lazy_function(function_path)
+
+        def call_tool(**kwargs):
+            with track_tool_call(name, "function"), span("tool.execute", tool=name):
+                return lazy_call(**kwargs)
+
+        async def acall_tool(config: RunnableConfig, **kwargs):
+            gate = config.get("configurable", {}).get(MODERATION_GATE)
+            if gate is not None and (await asyncio.shield(gate)).get("flagged"):
+                raise ToolException(f"Tool '{name}' not run: the message was flagged by moderation")
+            with track_tool_call(name, "function"), span("tool.execute", tool=name):
+                func = self._functions.get(function_path)
+                if func is None:
+                    func = await asyncio.to_thread(self.resolve, function_path)
+                if inspect.iscoroutinefunction(func):
+                    return await func(**kwargs)
+                return await asyncio.to_thread(func, **kwargs)
+
+        return StructuredTool.from_function(
+            func=call_tool,
+            coroutine=acall_tool,
+            name=name,
+            description=tool_def.get("description") or f"Tool {name}",
+            args_schema=args_schema,
+        )
+
+    def get_tool(self, tool_def: dict) -> StructuredTool:
+        """Return the wrapped tool for a tools.json definition, building it once per definition."""
+        key = hashlib.sha1(json.dumps(tool_def, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        tool = self._tools.get(key)
+        if tool is None:
+            with self._lock:
+                tool = self._tools.get(key)
+                if tool is None:
+                    tool = self._build_tool(tool_def)
+                    self._tools[key] = tool
+        return tool
+
+    def get_tools(self, names: Iterable[str], snapshot: ConfigSnapshot = None) -> List[StructuredTool]:
+        """Return wrapped tools for the given names, skipping unknown or invalid definitions."""
+        snapshot = snapshot or get_config()
+        tools = []
+        for name in names:
+            tool_def = snapshot.tool(name)
+            if not tool_def or not tool_function_path(tool_def):
+                logger.warning(f"Skipping invalid tool definition: {name}")
+                continue
+            tools.append(self.get_tool(tool_def))
+        return tools
+
+
+tool_registry = ToolRegistry()
+
+def get_tool_registry() -> ToolRegistry:
+    return tool_registry
+
+
 def load_native_tools_from_config(config_path: str) -> Dict[str, StructuredTool]:
     """
     Load and wrap tool functions using import paths in tools.json as StructuredTool instances.
+    Tool modules are imported lazily by the shared registry on first call.
     """
-    config = load_json_config(config_path)
-    tools = {}
+    if config_path == DEFAULT_CONFIG_PATHS["tools"]:
+        tool_defs = get_config().tools
+    else:
+        tool_defs = load_json_config(config_path).get("tools", [])
 
-    for tool_def in config.get("tools", []):
+    tools = {}
+    for tool_def in tool_defs:
         name = tool_def.get("name")
-        function_path = tool_def.get("function")
-
-        if not name or not function_path:
+        if not name or not tool_function_path(tool_def):
             logger.warning(f"Skipping invalid tool definition: {tool_def}")
             continue
-
-        try:
-            raw_fn = import_from_path(function_path)
-            wrapped_tool = StructuredTool.from_function(raw_fn)
-            tools[name] = wrapped_tool
-            logger.info(f"✅ Loaded and wrapped native tool: {name} → {function_path}")
-        except Exception as e:
-            logger.error(f"❌ Failed to import or wrap tool '{name}': {e}")
-
+        tools[name] = tool_registry.get_tool(tool_def)
     return tools
@@ -0,0 +1,379 @@
+# tools/common/utils/tracing.py
+
+import contextvars
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger("tracing")
+
+DEFAULT_TRACING_SETTINGS = {
+    "enabled": True,
+    "sample_rate": 1.0,
+    "exporter": "file",  # "file", "otlp" or "none"
+    "file": "traces.jsonl",
+    "otlp_endpoint": "http://localhost:4318/v1/traces",
+    "service_name": "{{ cookiecutter.project_name }}",
+    "debug_payload_sample_rate": 0.01,
+}
+
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+SPAN_KIND_INTERNAL, SPAN_KIND_CLIENT = 1, 3
+
+_current_span: contextvars.ContextVar[Optional[Any]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation; finished spans are exported with the rest of their trace."""
+
+    __slots__ = ("name", "trace", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, trace: "_Trace", parent_id: Optional[str], attributes: dict, kind: int = SPAN_KIND_INTERNAL):
+        self.name = name
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        trace.opened()
+
+    sampled = True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.status == STATUS_UNSET:
+            self.status = STATUS_OK
+        self.trace.finish(self)
+
+
+class _NoopSpan:
+    """Stand-in for spans of unsampled traces; every operation is free."""
+
+    sampled = False
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Collects the spans of one trace so they are exported together when it completes."""
+
+    def __init__(self, tracer: "Tracer"):
+        self.tracer = tracer
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.finished: List[Span] = []
+        self.open_spans = 0
+        self._lock = threading.Lock()
+
+    def opened(self) -> None:
+        with self._lock:
+            self.open_spans += 1
+
+    def finish(self, span: Span) -> None:
+        with self._lock:
+            self.finished.append(span)
+            self.open_spans -= 1
+            if self.open_spans > 0:
+                return
+            spans, self.finished = self.finished, []
+        self.tracer.export(spans)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """
+    Minimal span tracer exporting OTLP/JSON (``ExportTraceServiceRequest``) documents.
+
+    With ``exporter: "file"`` each completed trace is appended as one line to
+    ``logs/<file>`` through the shared JSONL writer; with ``"otlp"`` batches are POSTed to
+    ``otlp_endpoint`` (an OpenTelemetry collector's OTLP/HTTP receiver) from a background
+    thread. Root spans are sampled at ``sample_rate`` and children follow their root.
+    """
+
+    def __init__(self, settings: Optional[dict] = None):
+        self.settings = {**DEFAULT_TRACING_SETTINGS, **(settings or {})}
+        self.enabled = bool(self.settings["enabled"]) and self.settings["exporter"] != "none"
+        self._otlp_queue: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent=None, kind: int = SPAN_KIND_INTERNAL, root: bool = True, **attributes):
+        """
+        Start a span under ``parent`` (default: the current span); call ``end()`` on it.
+        Without a parent a new trace is sampled, unless ``root`` is False.
+        """
+        if parent is None:
+            parent = _current_span.get()
+        if parent is not None:
+            if not parent.sampled:
+                return NOOP_SPAN
+            return Span(name, parent.trace, parent.span_id, attributes, kind)
+        if not root or not self.enabled or random.random() >= self.settings["sample_rate"]:
+            return NOOP_SPAN
+        return Span(name, _Trace(self), None, attributes, kind)
+
+    # -- export ---------------------------------------------------------------------
+
+    def to_otlp(self, spans: List[Span]) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.settings["service_name"]}}]},
+            "scopeSpans": [{
+                "scope": {"name": "{{ cookiecutter.project_name }}.tracing"},
+                "spans": [{
+                    "traceId": s.trace.trace_id,
+                    "spanId": s.span_id,
+                    **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                    "name": s.name,
+                    "kind": s.kind,
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                    "status": {"code": s.status, **({"message": s.status_message} if s.status_message else {})},
+                } for s in spans],
+            }],
+        }]}
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            if self.settings["exporter"] == "otlp":
+                self._otlp_export(spans)
+            else:
+                from tools.common.utils.logger import get_writer
+                get_writer(self.settings["file"]).write(self.to_otlp(spans))
+        except Exception as e:
+            logger.error(f"[tracing] Export failed: {e}")
+
+    def _otlp_export(self, spans: List[Span]) -> None:
+        with self._lock:
+            if self._otlp_queue is None:
+                self._otlp_queue = queue.Queue(maxsize=1000)
+                threading.Thread(target=self._otlp_worker, name="otlp-exporter", daemon=True).start()
+        try:
+            self._otlp_queue.put_nowait(spans)
+        except queue.Full:
+            logger.warning("[tracing] OTLP export queue full; dropping trace")
+
+    def _otlp_worker(self) -> None:
+        import httpx
+        with httpx.Client(timeout=5.0) as client:
+            while True:
+                batch = self._otlp_queue.get()
+                while len(batch) < 512:
+                    try:
+                        batch.extend(self._otlp_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    client.post(self.settings["otlp_endpoint"], json=self.to_otlp(batch)).raise_for_status()
+                except Exception as e:
+                    logger.warning(f"[tracing] OTLP export to {self.settings['otlp_endpoint']} failed: {e}")
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, configured from graph_config.json "tracing" on first use."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                from tools.common.utils.config import get_config
+                _tracer = Tracer(dict(get_config().graph.get("tracing", {})))
+    return _tracer
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, root: bool = True, **attributes):
+    """
+    Run the block inside a child of the current span, or of a new sampled root span.
+    Stages that only matter within a request pass ``root=False`` and are not traced alone.
+    """
+    s = get_tracer().start_span(name, kind=kind, root=root, **attributes)
+    # Unsampled spans are made current too, so their children are not sampled as new roots.
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        s.end()
+
+
+def log_sampled(log: logging.Logger, message: str, payload: Callable[[], Any]) -> None:
+    """
+    Log ``message % payload()`` at DEBUG for a sample of calls.
+
+    ``payload`` is only evaluated when the line is actually emitted, so large dumps cost
+    nothing when DEBUG is off or the call is not sampled.
+    """
+    if not log.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= get_tracer().settings["debug_payload_sample_rate"]:
+        return
+    try:
+        log.debug(message, payload())
+    except Exception as e:
+        log.debug(f"{message} (unavailable: {e})", None)
+
+
+def _usage_attributes(response) -> dict:
+    usage = {}
+    try:
+        message = response.generations[0][0].message
+        usage = getattr(message, "usage_metadata", None) or {}
+    except (AttributeError, IndexError):
+        pass
+    if not usage and isinstance(getattr(response, "llm_output", None), dict):
+        token_usage = response.llm_output.get("token_usage") or {}
+        usage = {
+            "input_tokens": token_usage.get("prompt_tokens"),
+            "output_tokens": token_usage.get("completion_tokens"),
+            "total_tokens": token_usage.get("total_tokens"),
+        }
+    return {
+        "gen_ai.usage.input_tokens": usage.get("input_tokens"),
+        "gen_ai.usage.output_tokens": usage.get("output_tokens"),
+        "gen_ai.usage.total_tokens": usage.get("total_tokens"),
+    }
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler turning a graph run into spans under ``parent``.
+
+    Emits ``agent.hop`` for every LangGraph node (supervisor turns, sub-agent runs, tool
+    nodes), ``llm.call`` for each chat model call with model and token usage,
+    ``agent.handoff`` for ``transfer_to_*`` tools and ``tool.call`` for other tools.
+    """
+
+    run_inline = True
+
+    def __init__(self, parent: Span):
+        self.parent = parent
+        self._spans: Dict[UUID, Span] = {}
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+
+    def _parent_for(self, parent_run_id: Optional[UUID]) -> Span:
+        run_id = parent_run_id
+        while run_id is not None:
+            if run_id in self._spans:
+                return self._spans[run_id]
+            run_id = self._parents.get(run_id)
+        return self.parent
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+        self._parents[run_id] = parent_run_id
+        self._spans[run_id] = get_tracer().start_span(name, parent=self._parent_for(parent_run_id), kind=kind, **attributes)
+
+    def _end(self, run_id: UUID, error: BaseException = None, **attributes):
+        self._parents.pop(run_id, None)
+        s = self._spans.pop(run_id, None)
+        if s is None:
+            return
+        for key, value in attributes.items():
+            s.set_attribute(key, value)
+        if error is not None:
+            s.set_error(error)
+        s.end()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        parent = self._parent_for(parent_run_id)
+        # A sub-agent graph runs inside a node of the same name; one span covers both.
+        nested = isinstance(parent, Span) and parent.name == "agent.hop" and parent.attributes.get("node") == node
+        if node and kwargs.get("name") == node and not nested:
+            namespace = (metadata.get("langgraph_checkpoint_ns") or "").split("|")[0].split(":")[0]
+            self._start(run_id, parent_run_id, "agent.hop", node=node, step=metadata.get("langgraph_step"),
+                        agent=namespace if namespace and namespace != node else None)
+        else:
+            self._parents[run_id] = parent_run_id
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        self._start(run_id, parent_run_id, "llm.call", kind=SPAN_KIND_CLIENT,
+                    **{"gen_ai.system": "openai",
+                       "gen_ai.request.model": params.get("model") or params.get("model_name") or metadata.get("ls_model_name"),
+                       "gen_ai.request.temperature": params.get("temperature"),
+                       "llm.message_count": sum(len(batch) for batch in messages)})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id, **_usage_attributes(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        if name.startswith("transfer_to_"):
+            self._start(run_id, parent_run_id, "agent.handoff", target=name[len("transfer_to_"):])
+        elif name.startswith("transfer_back_to_"):
+            self._start(run_id, parent_run_id, "agent.handoff", target=name[len("transfer_back_to_"):])
+        else:
+            self._start(run_id, parent_run_id, "tool.call", tool=name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+def tracing_callbacks(parent=None) -> list:
+    """Callbacks to pass in a RunnableConfig so LangChain runs are traced under ``parent``."""
+    parent = parent or _current_span.get()
+    if parent is None or not parent.sampled:
+        return []
+    return [TracingCallbackHandler(parent)]
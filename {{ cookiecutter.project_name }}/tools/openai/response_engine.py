@@ -1,54 +1,61 @@
-from langchain_openai import ChatOpenAI
+import copy
+import hashlib
 import json
-from jinja2 import Template
+import logging
 import os
-from dotenv import load_dotenv
-load_dotenv()
+from tools.common.utils.config import DEFAULT_CONFIG_PATHS, ConfigRegistry, default_registry, thaw
+from tools.common.utils.llm_clients import get_chat_model
+from tools.common.utils.response_cache import DEFAULT_TTL_SECONDS, get_response_cache
+from tools.common.utils.schema_cache import schema_hash
+from tools.common.utils.templates import render_prompt
+from tools.common.utils.tracing import log_sampled, tracing_callbacks
+logger = logging.getLogger("openai_responder")
 
 
 class OpenAIResponder:
     def __init__(self, config_path="config/openai_config.json", tools_path="config/tools.json"):
-        self.config = self._load_config(config_path)
-        self.tools = self._load_config(tools_path)
+        paths = {**DEFAULT_CONFIG_PATHS, "openai": config_path, "tools": tools_path}
+        self.registry = default_registry if paths == DEFAULT_CONFIG_PATHS else ConfigRegistry(paths)
 
-    def _load_config(self, path: str) -> dict:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+    @property
+    def config(self) -> dict:
+        return self.registry.current().prompts
+
+    @property
+    def tools(self) -> dict:
+        return {"tools": self.registry.current().tools}
 
     def render_template(self, template_str: str, variables: dict) -> str:
-        template = Template(template_str)
-        return template.render(**variables)
+        return render_prompt(template_str, variables, self.registry.current())
 
     def get_tool_schema(self, tool_name: str) -> dict:
-        for tool in self.tools.get("tools", []):
-            func_name = tool.get("function", "")
-            if func_name.split(".")[-1] == tool_name:
-                raw_schema = tool.get("output_schema", {})
-                if "structure" in raw_schema:
-                    flattened = raw_schema["structure"]
-                    if isinstance(flattened, dict) and "output" in flattened:
-                        output_fields = flattened["output"]
-                        explanation_field = {"explanation": "string"} if "explanation" in flattened else {}
-                        return {"output": output_fields, **explanation_field}
-                    return flattened
-                return raw_schema
-        return {}
+        tool = self.registry.current().tool_by_function.get(tool_name)
+        if not tool:
+            return {}
+        raw_schema = tool.get("output_schema", {})
+        if "structure" in raw_schema:
+            flattened = raw_schema["structure"]
+            if isinstance(flattened, dict) and "output" in flattened:
+                output_fields = flattened["output"]
+                explanation_field = {"explanation": "string"} if "explanation" in flattened else {}
+                return {"output": output_fields, **explanation_field}
+            return flattened
+        return raw_schema
 
     
 
-    def run(self, tool_name: str, variables=None, vector_store_ids=None) -> dict:
-        print("\n🛠️ [DEBUG] inside run:")
+    def _prepare(self, tool_name: str, variables=None, vector_store_ids=None):
+        """Render the tool prompt and bind its tools; shared by run and arun."""
         cfg = self.config.get(tool_name)
         if not cfg:
             raise ValueError(f"Tool '{tool_name}' not found in config")
 
         variables = variables or {}
-        
-        print("\n🔍 [DEBUG] Tool:", tool_name)
-        for k, v in variables.items():
-            print(f"   {k}: ({type(v).__name__}) {repr(v)[:300]}")
 
-        
+        log_sampled(logger, f"🔍 [DEBUG] Tool: {tool_name}\n%s", lambda: "\n".join(
+            f"   {k}: ({type(v).__name__}) {repr(v)[:300]}" for k, v in variables.items()
+        ))
+
         # Schema injection for debugging context
         output_schema = self.get_tool_schema(tool_name)
         variables["expected_output_schema"] = json.dumps(output_schema, indent=2) if output_schema else ""
@@ -58,25 +65,24 @@ class OpenAIResponder:
         if not isinstance(input_text, str):
             input_text = str(input_text)
 
-        print("\n📝 [DEBUG] Rendered Prompt:\n", input_text[:1000])
+        log_sampled(logger, "📝 [DEBUG] Rendered Prompt:\n%s", lambda: input_text[:1000])
 
         model_name = cfg.get("model", "gpt-4o-mini")
-        tools = cfg.get("tools", [])
-        print("\n🛠️ [DEBUG] Tools to Pass:", json.dumps(tools, indent=2))
+        tools = thaw(cfg.get("tools", []))
 
         if vector_store_ids:
             for tool in tools:
                 if isinstance(tool, dict) and tool.get("type") == "file_search":
                     tool["vector_store_ids"] = vector_store_ids
-        print("\n🛠️ [DEBUG] before llm:")
-        llm = ChatOpenAI(model=model_name, temperature=0.3, use_responses_api=True)
+        log_sampled(logger, "🛠️ [DEBUG] Tools to Pass: %s", lambda: json.dumps(tools, indent=2))
+        llm_with_tools = get_chat_model(model_name, temperature=0.3, tools=tools)
         config = {"tools": tools}
         config["tool_choice"] = cfg.get("tool_choice")
-        llm_with_tools = llm.bind_tools(tools)
-        print("\n🛠️ [DEBUG] after Tools to Pass:", json.dumps(tools, indent=2))
-        response = llm_with_tools.invoke([{"role": "user", "content": input_text}], config=config)
+        config["callbacks"] = tracing_callbacks()
+        return llm_with_tools, [{"role": "user", "content": input_text}], config
 
-        print("\n✅ [DEBUG] Raw response content:", response.content)
+    def _parse_response(self, response) -> dict:
+        log_sampled(logger, "✅ [DEBUG] Raw response content: %s", lambda: response.content)
 
         # Extract fallback or structured content
         if isinstance(response.content, list):
@@ -88,3 +94,49 @@ class OpenAIResponder:
             return {"output": {"fallback_message": response.content}}
         else:
             return {"output": {"fallback_message": str(response)}}
+
+    def cache_key(self, tool_name: str, messages: list, config: dict) -> str:
+        """Key a tool call on the tool, its model and bound tools, and a hash of the rendered prompt."""
+        prompt = messages[0]["content"]
+        return schema_hash({
+            "tool": tool_name,
+            "model": self.config.get(tool_name, {}).get("model"),
+            "tools": config.get("tools"),
+            "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        })
+
+    def run(self, tool_name: str, variables=None, vector_store_ids=None) -> dict:
+        llm_with_tools, messages, config = self._prepare(tool_name, variables, vector_store_ids)
+        response = llm_with_tools.invoke(messages, config=config)
+        return self._parse_response(response)
+
+    async def arun(self, tool_name: str, variables=None, vector_store_ids=None) -> dict:
+        """Async variant of run; awaits the LLM call instead of blocking the event loop."""
+        llm_with_tools, messages, config = self._prepare(tool_name, variables, vector_store_ids)
+        response = await llm_with_tools.ainvoke(messages, config=config)
+        return self._parse_response(response)
+
+    def run_cached(self, tool_name: str, policy: dict, variables=None, vector_store_ids=None):
+        """
+        Like run, but serve repeated calls from the response cache (see
+        tools.common.utils.response_cache). Returns ``(response, "hit" | "miss")``.
+        """
+        llm_with_tools, messages, config = self._prepare(tool_name, variables, vector_store_ids)
+        cache, key, persist = get_response_cache(), self.cache_key(tool_name, messages, config), policy.get("persist", False)
+        hit, cached = cache.get(key, persist=persist)
+        if hit:
+            return copy.deepcopy(cached), "hit"
+        response = self._parse_response(llm_with_tools.invoke(messages, config=config))
+        cache.set(key, copy.deepcopy(response), policy.get("ttl_seconds", DEFAULT_TTL_SECONDS), persist=persist)
+        return response, "miss"
+
+    async def arun_cached(self, tool_name: str, policy: dict, variables=None, vector_store_ids=None):
+        """Async variant of run_cached."""
+        llm_with_tools, messages, config = self._prepare(tool_name, variables, vector_store_ids)
+        cache, key, persist = get_response_cache(), self.cache_key(tool_name, messages, config), policy.get("persist", False)
+        hit, cached = cache.get(key, persist=persist)
+        if hit:
+            return copy.deepcopy(cached), "hit"
+        response = self._parse_response(await llm_with_tools.ainvoke(messages, config=config))
+        cache.set(key, copy.deepcopy(response), policy.get("ttl_seconds", DEFAULT_TTL_SECONDS), persist=persist)
+        return response, "miss"
@@ -1,87 +1,182 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
+from starlette.routing import Match
+import asyncio
 import logging
 import json
-import re
+import time
 
 # Import the restaurant agent dispatcher
-from agents.core.langgraph.agent_dispatcher import agent_dispatch
+from agents.core.langgraph.admission import AdmissionRejected, get_admission_controller
+from agents.core.langgraph.agent_dispatcher import agent_dispatch_async, agent_dispatch_stream
+from agents.core.langgraph.batch import batch_settings, run_batch
+from agents.core.langgraph.output import agent_response_json
+from agents.core.langgraph.warmup import Warmup
+from tools.common.utils.metrics import (
+    AGENT_RESPONSE_PARSE_FAILURES,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    render_metrics,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+warmup = Warmup()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: the worker serves /ready (503) and /metrics meanwhile
+    task = asyncio.create_task(warmup.arun())
+    yield
+    task.cancel()
+
+app = FastAPI(lifespan=lifespan)
 templates = Jinja2Templates(directory="web/templates")
-JSON_FENCE_REGEX = re.compile(r'```json\s*(\{.*?\})\s*```', re.S)
 
 class AgentRequest(BaseModel):
     agent_name: str
     message: str
     identifier: str | None = None
+    # Admission lane ("interactive" or "batch"); defaults to the agent's lane in nodes.json
+    priority: str | None = None
+
+class BatchRequest(BaseModel):
+    items: list[AgentRequest]
+    # Optional tighter bounds than graph_config.json "batch"
+    max_concurrency: int | None = None
+    timeout_seconds: float | None = None
+
+def route_path(request: Request) -> str:
+    # Label by route template rather than raw URL to keep metric cardinality bounded
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+@app.middleware("http")
+async def http_metrics(request: Request, call_next):
+    path = route_path(request)
+    if path == "/metrics":
+        return await call_next(request)
+    in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(path)
+    in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        in_flight.dec()
+        HTTP_REQUEST_SECONDS.labels(request.method, path, str(status)).observe(time.perf_counter() - start)
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/ready")
+async def ready():
+    status = "ready" if warmup.ready else "warming_up"
+    return JSONResponse(status_code=200 if warmup.ready else 503, content={"status": status, "stages": warmup.stages})
 
 @app.get("/")
 async def root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 @app.post("/api/agent")
 async def call_agent(req: AgentRequest):
     try:
         logger.info(f"[agent_dispatch] Dispatching {req.agent_name} for identifier: {req.identifier}")
-        
-        context = {
-            "identifier": req.identifier,
-        }
-        
-        raw = agent_dispatch(
-            agent_name=req.agent_name,
-            message=req.message,
-            context=context
-        )
-        
-        # Log the raw response
-        logger.info(f"Raw agent response: {raw}")
-        
-        # Extract the JSON content from the response
-        content = None
-        if hasattr(raw, 'content'):
-            logger.info(f"Response has content attribute: {raw.content}")
-            if isinstance(raw.content, list):
-                # Get the text from the first content item
-                text = raw.content[0].get('text', '') if raw.content else ''
-                logger.info(f"Extracted text from content: {text}")
-                # Try to find JSON in the text
-                match = JSON_FENCE_REGEX.search(text)
-                if match:
-                    logger.info(f"Found JSON in code fence: {match.group(1)}")
-                    content = json.loads(match.group(1))
-                elif "{" in text and "}" in text:
-                    try:
-                        json_str = text[text.index("{"):text.rindex("}")+1]
-                        logger.info(f"Attempting to parse JSON from text: {json_str}")
-                        content = json.loads(json_str)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse JSON from text: {e}")
-                        pass
-            else:
-                try:
-                    logger.info(f"Attempting to parse content directly as JSON: {raw.content}")
-                    content = json.loads(raw.content)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse content as JSON: {e}")
-                    pass
-        
-        if content:
-            return JSONResponse(content)
-        else:
-            logger.error("Could not parse any JSON from the response")
-            return JSONResponse({"error": "Could not parse agent response"})
-            
+
+        async with get_admission_controller().admit(req.agent_name, req.priority):
+            output = await agent_dispatch_async(
+                agent_name=req.agent_name,
+                message=req.message,
+                context={"identifier": req.identifier}
+            )
+
+        if output.get("error"):
+            # Flagged messages are the caller's to fix; anything else failed in the agent
+            return JSONResponse(status_code=400 if output.get("categories") else 500, content=output)
+
+        # The final state carries the agent's validated structured_response; serialize it once
+        try:
+            body = agent_response_json(output, req.agent_name)
+        except ValueError as e:
+            logger.error(f"❌ [agent_dispatch] {e}")
+            AGENT_RESPONSE_PARSE_FAILURES.labels(req.agent_name).inc()
+            return JSONResponse(status_code=502, content={"error": "Agent returned an invalid response"})
+        return Response(content=body, media_type="application/json")
+
+    except AdmissionRejected as e:
+        return rejected_response(e)
     except Exception as e:
         logger.error("Agent dispatch failed", exc_info=True)
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+def rejected_response(e: AdmissionRejected) -> JSONResponse:
+    return JSONResponse(status_code=e.status_code, content={"error": e.detail}, headers=e.headers)
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+@app.post("/api/agent/stream")
+async def stream_agent(req: AgentRequest):
+    logger.info(f"[agent_dispatch_stream] Streaming {req.agent_name} for identifier: {req.identifier}")
+
+    # Admit before the response starts so a rejection can still set the status code
+    try:
+        ticket = await get_admission_controller().acquire(req.agent_name, req.priority)
+    except AdmissionRejected as e:
+        return rejected_response(e)
+
+    async def event_source():
+        try:
+            async for item in agent_dispatch_stream(
+                agent_name=req.agent_name,
+                message=req.message,
+                context={"identifier": req.identifier}
+            ):
+                yield format_sse(item["event"], item["data"])
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also covers clients that disconnect before the stream is iterated
+        background=BackgroundTask(ticket.release) if ticket is not None else None
+    )
+
+@app.post("/api/agent/batch")
+async def batch_agent(req: BatchRequest):
+    max_items = batch_settings()["max_items"]
+    if not req.items:
+        return JSONResponse(status_code=400, content={"error": "No items"})
+    if len(req.items) > max_items:
+        return JSONResponse(status_code=413, content={"error": f"At most {max_items} items per batch"})
+    logger.info(f"[agent_batch] Running {len(req.items)} items")
+
+    async def results():
+        # One JSON object per line, in completion order; "index" refers back to the item
+        async for result in run_batch(
+            [item.model_dump() for item in req.items],
+            max_concurrency=req.max_concurrency,
+            timeout_seconds=req.timeout_seconds,
+        ):
+            yield json.dumps(result, default=str, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting FastAPI server on 127.0.0.1:8000")